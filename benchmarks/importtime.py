@@ -0,0 +1,64 @@
+import typing as t
+import sys
+import os.path
+import subprocess
+import logging
+
+logger = logging.getLogger(__name__)
+
+# checking the cold start of the cli (python -X importtime),
+# the cumulative import time of schemalint.cli is within the budget.
+# (the modules which must not be imported are checked by schemalint/tests/test_importtime.py)
+
+DEFAULT_BUDGET = 0.05  # seconds
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def importtime(args: t.List[str]) -> t.Dict[str, float]:
+    # module name -> cumulative import time (seconds)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.dirname(HERE), *filter(None, [env.get("PYTHONPATH")])]
+    )
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    r = {}
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        r[name.strip()] = int(cumulative) / 1e6
+    return r
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="import time budget of the cli")
+    parser.print_usage = parser.print_help
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    # the minimum of several runs (the first run includes compiling .pyc)
+    elapsed = min(
+        importtime(["-c", "import schemalint.cli"]).get("schemalint.cli", 0)
+        for _ in range(args.repeat)
+    )
+    print(f"schemalint.cli: {elapsed * 1000:.1f}ms (budget {args.budget * 1000:.0f}ms)")
+    if elapsed > args.budget:
+        print(
+            f"REGRESSION import time ({elapsed:.3f}s > {args.budget}s)",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import typing as t
+import sys
+import os.path
+import json
+import time
+import logging
+import tempfile
+
+from schemalint.entity import ErrorEvent, Context
+from schemalint.formatter import get_formatter
+from schemalint.loader import get_loader
+from schemalint.loader._fragment import FragmentCache, roots
+from schemalint.validator import get_validator, ValidatorRegistry
+
+from workloads import WORKLOADS, Workload
+
+logger = logging.getLogger(__name__)
+
+PHASES = ["load", "resolve", "validate", "format"]
+
+DEFAULT_THRESHOLD = 1.5  # ratio to the baseline
+DEFAULT_SLACK = 0.005  # seconds, ignoring the noise of tiny phases
+
+Result = t.Dict[str, t.Any]
+
+
+def measure(workload: Workload, *, repeat: int, codegen: bool = False) -> Result:
+    timings: t.Dict[str, t.List[float]] = {phase: [] for phase in PHASES}
+    registry = ValidatorRegistry(codegen=True) if codegen else None
+    validator = get_validator(workload.schema, check_schema=True, registry=registry)
+
+    for _ in range(repeat):
+        # not sharing the parsed files between iterations
+        roots.clear()
+        loader = get_loader(workload.filename, fragments=FragmentCache())
+
+        st = time.perf_counter()
+        loader.resolver.doc
+        timings["load"].append(time.perf_counter() - st)
+
+        st = time.perf_counter()
+        doc = loader.load()
+        timings["resolve"].append(time.perf_counter() - st)
+
+        st = time.perf_counter()
+        errors = list(validator.iter_errors(doc))
+        timings["validate"].append(time.perf_counter() - st)
+
+        st = time.perf_counter()
+        formatter = get_formatter(
+            workload.filename, lookup=loader.store, output_type="json"
+        )
+        ctx = Context(filename=workload.filename, doc=doc, lookup=loader.store)
+        for err in [*loader.errors, *errors]:
+            formatter.format(ErrorEvent(error=err, context=ctx))
+        timings["format"].append(time.perf_counter() - st)
+
+    root_size = os.path.getsize(workload.filename)
+    total_size = sum(
+        os.path.getsize(name) for name in loader.filenames if os.path.exists(name)
+    )
+    nerrors = len(loader.errors) + len(errors)
+    best = {phase: min(xs) for phase, xs in timings.items()}
+    return {
+        "name": workload.name,
+        "bytes": total_size,
+        "errors": nerrors,
+        "files": len(loader.filenames),
+        "seconds": best,
+        "throughput": {
+            "load": _per_second(root_size / 1e6, best["load"]),  # MB/s
+            "resolve": _per_second((total_size - root_size) / 1e6, best["resolve"]),
+            "validate": _per_second(total_size / 1e6, best["validate"]),
+            "format": _per_second(nerrors, best["format"]),  # errors/s
+        },
+    }
+
+
+def _per_second(amount: float, seconds: float) -> float:
+    return amount / seconds if seconds > 0 else 0.0
+
+
+def compare(
+    results: t.List[Result],
+    baseline: t.Dict[str, Result],
+    *,
+    threshold: float,
+    slack: float = DEFAULT_SLACK,
+) -> t.List[str]:
+    regressions = []
+    for r in results:
+        base = baseline.get(r["name"])
+        if base is None:
+            continue
+        for phase in PHASES:
+            actual = r["seconds"][phase]
+            expected = base["seconds"].get(phase)
+            if expected is None:
+                continue
+            if actual > expected * threshold + slack:
+                regressions.append(
+                    f"{r['name']}.{phase}: {actual:.4f}s > {expected:.4f}s * {threshold}"
+                )
+    return regressions
+
+
+def report(results: t.List[Result], *, out: t.IO[str]) -> None:
+    units = {"load": "MB/s", "resolve": "MB/s", "validate": "MB/s", "format": "err/s"}
+    for r in results:
+        print(
+            f"{r['name']:<12} {r['bytes'] / 1e6:7.2f}MB {r['files']:4d} files {r['errors']:6d} errors",
+            file=out,
+        )
+        for phase in PHASES:
+            print(
+                f"  {phase:<8} {r['seconds'][phase]:9.4f}s {r['throughput'][phase]:12.1f} {units[phase]}",
+                file=out,
+            )
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="schemalint benchmarks")
+    parser.print_usage = parser.print_help
+    parser.add_argument(
+        "--logging", choices=list(logging._nameToLevel.keys()), default="WARNING"
+    )
+    parser.add_argument(
+        "-w", "--workload", action="append", choices=list(WORKLOADS.keys())
+    )
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", help="compare with the stored baseline (json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--save", help="store the results as a new baseline (json)")
+    parser.add_argument(
+        "--codegen", action="store_true", help="validate with the compiled schema"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.logging)
+
+    results = []
+    with tempfile.TemporaryDirectory() as dirpath:
+        for name in args.workload or list(WORKLOADS.keys()):
+            workload = WORKLOADS[name](dirpath, scale=args.scale)
+            results.append(measure(workload, repeat=args.repeat, codegen=args.codegen))
+    report(results, out=sys.stdout)
+
+    if args.save:
+        with open(args.save, "w") as wf:
+            json.dump(
+                {"scale": args.scale, "results": {r["name"]: r for r in results}},
+                wf,
+                indent=2,
+                sort_keys=True,
+            )
+            wf.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as rf:
+            stored = json.load(rf)
+        if stored.get("scale") != args.scale:
+            print(
+                f"warning: baseline scale is {stored.get('scale')} (not {args.scale})",
+                file=sys.stderr,
+            )
+        regressions = compare(results, stored["results"], threshold=args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import typing as t
+import sys
+import time
+import logging
+import tempfile
+
+from schemalint.entity import ErrorEvent, Context
+from schemalint.formatter import get_formatter
+from schemalint.loader import get_loader
+from schemalint.validator import get_validator
+
+from workloads import error_heavy
+
+logger = logging.getLogger(__name__)
+
+# checking that the cost per error doesn't grow with the number of errors
+
+DEFAULT_SIZES = [1000, 2000, 4000, 8000, 16000]
+DEFAULT_THRESHOLD = 2.0  # ratio of the cost per error (largest / smallest)
+
+
+def measure(n: int, *, dirpath: str, repeat: int) -> t.Dict[str, float]:
+    workload = error_heavy(dirpath, n=n)
+    loader = get_loader(workload.filename)
+    doc = loader.load()
+    validator = get_validator(workload.schema, check_schema=True)
+
+    validate_time = format_time = float("inf")
+    for _ in range(repeat):
+        st = time.perf_counter()
+        errors = list(validator.iter_errors(doc))
+        validate_time = min(validate_time, time.perf_counter() - st)
+
+        formatter = get_formatter(
+            workload.filename, lookup=loader.store, output_type="ltsv"
+        )
+        ctx = Context(filename=workload.filename, doc=doc, lookup=loader.store)
+        st = time.perf_counter()
+        for err in errors:
+            formatter.format(ErrorEvent(error=err, context=ctx))
+        format_time = min(format_time, time.perf_counter() - st)
+    return {"errors": len(errors), "validate": validate_time, "format": format_time}
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="errors vs time (linear scaling)")
+    parser.print_usage = parser.print_help
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as dirpath:
+        for n in args.sizes:
+            rows.append(measure(n, dirpath=dirpath, repeat=args.repeat))
+
+    print(f"{'errors':>8} {'validate':>10} {'format':>10} {'us/error':>10}")
+    for row in rows:
+        per_error = (row["validate"] + row["format"]) / row["errors"] * 1e6
+        print(
+            f"{row['errors']:8d} {row['validate']:9.4f}s {row['format']:9.4f}s {per_error:10.2f}"
+        )
+
+    first, last = rows[0], rows[-1]
+    ratio = ((last["validate"] + last["format"]) / last["errors"]) / (
+        (first["validate"] + first["format"]) / first["errors"]
+    )
+    print(f"cost per error, {last['errors']} / {first['errors']} errors: x{ratio:.2f}")
+    if ratio > args.threshold:
+        print(
+            f"REGRESSION not linear (x{ratio:.2f} > x{args.threshold})", file=sys.stderr
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import typing as t
+import json
+import os.path
+
+
+class Workload(t.NamedTuple):
+    name: str
+    filename: str  # root file
+    schema: t.Dict[str, t.Any]
+
+
+def _write(path: str, lines: t.Iterable[str]) -> None:
+    with open(path, "w") as wf:
+        for line in lines:
+            wf.write(line)
+            wf.write("\n")
+
+
+def flat_map(dirpath: str, *, scale: float = 1.0) -> Workload:
+    n = int(20000 * scale)
+    filename = os.path.join(dirpath, "flat.yaml")
+    _write(filename, (f"key{i}: {i}" for i in range(n)))
+    schema = {"type": "object", "additionalProperties": {"type": "integer"}}
+    return Workload("flat-map", filename, schema)
+
+
+def nested_tree(dirpath: str, *, scale: float = 1.0) -> Workload:
+    width = int(150 * scale)
+    depth = 40
+
+    def _lines():
+        yield "nodes:"
+        for i in range(width):
+            indent = "  "
+            yield f"{indent}- name: n{i}"
+            indent += "  "
+            for d in range(depth):
+                yield f"{indent}value: {d}"
+                yield f"{indent}child:"
+                indent += "  "
+                yield f"{indent}name: n{i}-{d}"
+            yield f"{indent}value: {depth}"
+
+    filename = os.path.join(dirpath, "nested.yaml")
+    _write(filename, _lines())
+    schema = {
+        "type": "object",
+        "properties": {
+            "nodes": {"type": "array", "items": {"$ref": "#/definitions/node"}}
+        },
+        "definitions": {
+            "node": {
+                "type": "object",
+                "required": ["name"],
+                "properties": {
+                    "name": {"type": "string"},
+                    "value": {"type": "integer"},
+                    "child": {"$ref": "#/definitions/node"},
+                },
+            }
+        },
+    }
+    return Workload("nested-tree", filename, schema)
+
+
+def wide_refs(dirpath: str, *, scale: float = 1.0) -> Workload:
+    nfiles = max(1, int(20 * scale))
+    ndefs = 50
+    for j in range(nfiles):
+        _write(
+            os.path.join(dirpath, f"defs{j}.yaml"),
+            _definitions_lines(j, ndefs),
+        )
+
+    def _lines():
+        yield "items:"
+        for i in range(nfiles * ndefs):
+            j, k = divmod(i, ndefs)
+            yield f"  item{i}:"
+            yield f'    $ref: "./defs{j}.yaml#/definitions/item{k}"'
+
+    filename = os.path.join(dirpath, "refs.yaml")
+    _write(filename, _lines())
+    schema = {
+        "type": "object",
+        "properties": {
+            "items": {
+                "type": "object",
+                "additionalProperties": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer"},
+                        "tags": {"type": "array"},
+                    },
+                },
+            }
+        },
+    }
+    return Workload("wide-refs", filename, schema)
+
+
+def _definitions_lines(j: int, ndefs: int) -> t.Iterator[str]:
+    yield "definitions:"
+    for k in range(ndefs):
+        yield f"  item{k}:"
+        yield f"    id: {j * ndefs + k}"
+        yield f"    name: item-{j}-{k}"
+        yield "    tags: [a, b, c]"
+
+
+def error_heavy(
+    dirpath: str, *, scale: float = 1.0, n: t.Optional[int] = None
+) -> Workload:
+    n = n if n is not None else int(5000 * scale)
+
+    def _lines():
+        yield "items:"
+        for i in range(n):
+            yield f"  - id: x{i}"  # type error
+            yield f"    name: {i}"  # type error
+
+    filename = os.path.join(dirpath, f"errors{n}.yaml")
+    _write(filename, _lines())
+    schema = {
+        "type": "object",
+        "properties": {
+            "items": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer"},
+                        "name": {"type": "string"},
+                    },
+                },
+            }
+        },
+    }
+    return Workload("error-heavy", filename, schema)
+
+
+def json_spec(dirpath: str, *, scale: float = 1.0) -> Workload:
+    # e.g. generated api spec (the json loader is used)
+    n = int(2000 * scale)
+    doc = {
+        "paths": {
+            f"/items{i}": {
+                "get": {
+                    "operationId": f"getItem{i}",
+                    "tags": ["items", f"group{i % 10}"],
+                    "parameters": [
+                        {"name": "id", "in": "path", "required": True},
+                        {"name": "limit", "in": "query", "required": False},
+                    ],
+                    "responses": {"200": {"description": "ok", "size": i}},
+                }
+            }
+            for i in range(n)
+        }
+    }
+    filename = os.path.join(dirpath, "spec.json")
+    with open(filename, "w") as wf:
+        json.dump(doc, wf, indent=2)
+    schema = {
+        "type": "object",
+        "properties": {
+            "paths": {
+                "type": "object",
+                "additionalProperties": {
+                    "type": "object",
+                    "additionalProperties": {
+                        "type": "object",
+                        "required": ["operationId"],
+                        "properties": {
+                            "operationId": {"type": "string"},
+                            "tags": {"type": "array", "items": {"type": "string"}},
+                        },
+                    },
+                },
+            }
+        },
+    }
+    return Workload("json-spec", filename, schema)
+
+
+WORKLOADS = {
+    "flat-map": flat_map,
+    "nested-tree": nested_tree,
+    "wide-refs": wide_refs,
+    "error-heavy": error_heavy,
+    "json-spec": json_spec,
+}
@@ -0,0 +1,143 @@
+import typing as t
+import os.path
+import logging
+import threading
+
+from schemalint import streams
+from schemalint.errors import MessageError, ParseError
+from schemalint.formatter import get_formatter
+from schemalint.loader import get_loader
+
+if t.TYPE_CHECKING:
+    from schemalint.formatter import OutputDict
+    from schemalint.loader import Loader
+    from schemalint.validator import Validator
+
+logger = logging.getLogger(__name__)
+
+Buffer = t.Union[bytes, str]
+
+# linting the buffers in memory, without disk i/o (e.g. inside a service)
+#
+# - the files referenced via $ref are found in `files` (virtual filesystem), never on disk
+# - the loading state (NodeStore, resolver, ...) is created per call, only the validator is shared.
+#   so lint() can be called concurrently from threads
+
+ROOT = os.path.abspath(os.sep)  # the names of the buffers are relative to it
+
+
+def _path(name: str) -> str:
+    return os.path.normpath(os.path.join(ROOT, name))
+
+
+class Linter:
+    def __init__(
+        self,
+        *,
+        schema: t.Union[None, str, dict] = None,
+        max_errors: t.Optional[int] = None,
+        cache_dir: t.Optional[str] = None,
+        offline: bool = False,
+        codegen: bool = False,
+        memoize_validation: bool = False,
+    ) -> None:
+        self.schema = schema  # dict, or path or url (loaded once)
+        self.max_errors = max_errors
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.codegen = codegen
+        self.memoize_validation = memoize_validation
+        self._validator: t.Optional["Validator"] = None
+        self._lock = threading.Lock()
+
+    @property
+    def validator(self) -> t.Optional["Validator"]:
+        if self.schema is None:
+            return None
+        with self._lock:
+            if self._validator is None:
+                self._validator = self._load_validator(self.schema)
+        return self._validator
+
+    def _load_validator(self, schema: t.Union[str, dict]) -> "Validator":
+        from schemalint import remote
+        from schemalint.validator import get_validator, get_registry, load_validator
+
+        registry = get_registry(
+            self.cache_dir, memoize=self.memoize_validation, codegen=self.codegen
+        )
+        if isinstance(schema, str):
+            remote_cache = remote.get_remote_cache(self.cache_dir, offline=self.offline)
+            return load_validator(schema, remote_cache=remote_cache, registry=registry)
+        return get_validator(schema, check_schema=True, registry=registry)
+
+    def lint(
+        self,
+        name: str,
+        data: Buffer,
+        *,
+        files: t.Optional[t.Mapping[str, Buffer]] = None,
+    ) -> t.List["OutputDict"]:
+        path = _path(name)
+        overlay = {_path(k): v for k, v in (files or {}).items()}
+        overlay[path] = data
+
+        loader = get_loader(
+            path,
+            overlay=overlay,
+            overlay_only=True,
+            fragments=None,  # not shared with the other calls
+            max_errors=self.max_errors,
+        )
+        s = streams.from_loader(loader)
+        validator = self.validator
+        if validator is not None and not _is_broken(loader):
+            s = streams.with_validator(s, validator)
+        formatter = get_formatter(
+            path, lookup=s.context.lookup, output_type="json", cwd=ROOT
+        )
+
+        records = []
+        nerrors = 0
+        for ev in s:
+            if not ev.has_soft_error:
+                nerrors += 1
+            records.append(formatter.to_dict(ev))
+            if self.max_errors is not None and nerrors >= self.max_errors:
+                message = MessageError(
+                    f"stopped, the number of errors reached {nerrors}"
+                )
+                records.append(
+                    formatter.build_message_error(message, context=s.context)
+                )
+                break
+        return records
+
+    def lint_many(
+        self,
+        buffers: t.Sequence[t.Tuple[str, Buffer]],
+        *,
+        files: t.Optional[t.Mapping[str, Buffer]] = None,
+    ) -> t.Dict[str, t.List["OutputDict"]]:
+        # the buffers can $ref each other
+        files = {**(files or {}), **dict(buffers)}
+        return {name: self.lint(name, data, files=files) for name, data in buffers}
+
+
+def _is_broken(loader: "Loader") -> bool:
+    # the root document cannot be parsed (the positions of its nodes are unknown)
+    return any(
+        isinstance(err, ParseError) and err.history == [loader.filename]
+        for err in loader.errors
+    )
+
+
+def lint(
+    name: str,
+    data: Buffer,
+    *,
+    files: t.Optional[t.Mapping[str, Buffer]] = None,
+    schema: t.Union[None, str, dict] = None,
+    max_errors: t.Optional[int] = None,
+) -> t.List["OutputDict"]:
+    return Linter(schema=schema, max_errors=max_errors).lint(name, data, files=files)
@@ -0,0 +1,162 @@
+import typing as t
+import sys
+import os
+import os.path
+import json
+import hashlib
+import logging
+import functools
+
+from schemalint import remote
+from schemalint.cachedir import write_atomic
+from schemalint.errors import OfflineError
+
+logger = logging.getLogger(__name__)
+
+INDEX = "index.json"
+VERSION = 1
+
+
+# the remote schemas (and their remote $ref) vendored into a directory
+# - <directory>/index.json (url -> filename)
+# - <directory>/objects/<sha256 of url>.json
+class Bundle:
+    def __init__(
+        self, directory: str, *, documents: t.Optional[t.Dict[str, t.Any]] = None
+    ) -> None:
+        self.directory = directory
+        self.documents: t.Dict[str, t.Any] = documents or {}  # url -> document
+
+    @classmethod
+    def load(cls, directory: str) -> "Bundle":
+        with open(os.path.join(directory, INDEX)) as rf:
+            data = json.load(rf)
+        if data.get("version") != VERSION:
+            raise ValueError(f"unsupported bundle version {data.get('version')!r}")
+        documents = {}
+        for url, filename in data["documents"].items():
+            with open(os.path.join(directory, filename)) as rf:
+                documents[url] = json.load(rf)
+        return cls(directory, documents=documents)
+
+    def save(self) -> None:
+        os.makedirs(os.path.join(self.directory, "objects"), exist_ok=True)
+        index = {}
+        for url, doc in sorted(self.documents.items()):
+            filename = index[url] = _filename(url)
+            body = json.dumps(doc, indent=2, ensure_ascii=False)
+            write_atomic(
+                os.path.join(self.directory, filename), (body + "\n").encode("utf-8")
+            )
+
+        # the documents, not included anymore
+        objects_dir = os.path.join(self.directory, "objects")
+        used = {os.path.basename(filename) for filename in index.values()}
+        for name in os.listdir(objects_dir):
+            if name.endswith(".json") and name not in used:
+                os.remove(os.path.join(objects_dir, name))
+
+        body = json.dumps(
+            {"version": VERSION, "documents": index}, indent=2, ensure_ascii=False
+        )
+        write_atomic(os.path.join(self.directory, INDEX), (body + "\n").encode("utf-8"))
+
+    def fetch_json(self, url: str) -> t.Any:
+        # never access the network
+        doc = self.documents.get(url)
+        if doc is None:
+            raise OfflineError(f"{url} is not found in bundle {self.directory}")
+        return doc
+
+
+def _filename(url: str) -> str:
+    return os.path.join(
+        "objects", hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_bundle(directory: str) -> Bundle:
+    return Bundle.load(directory)
+
+
+def crawl(
+    bundle: Bundle, schemas: t.Sequence[str], *, prefetcher: remote.Prefetcher
+) -> t.Set[str]:
+    # the remote schemas and the remote $ref (transitively) are added.
+    # the local schema files are not included (only their remote $ref).
+    # returning the urls failed to fetch
+    failed: t.Set[str] = set()
+    refs: t.Set[str] = set()
+    for schema in schemas:
+        if remote.is_remote(schema):
+            prefetcher.submit(schema)  # fetching concurrently
+    for schema in schemas:
+        try:
+            if remote.is_remote(schema):
+                doc = bundle.documents[schema] = prefetcher.fetch_json(schema)
+                base = schema
+            else:
+                from dictknife import loading
+
+                doc = loading.loadfile(schema)
+                base = ""
+        except (OSError, ValueError, OfflineError) as e:
+            logger.error("bundle, load failed %s (%r)", schema, e)
+            failed.add(schema)
+            continue
+        refs.update(remote.remote_refs(doc, base))
+        for url, sub in prefetcher.prefetch(doc, base=base).items():
+            bundle.documents[url] = sub
+            refs.update(remote.remote_refs(sub, url))
+    return failed | (refs - set(bundle.documents))
+
+
+def main(argv=None):
+    import argparse
+    from schemalint import management
+
+    parser = argparse.ArgumentParser(
+        prog="schemalint bundle",
+        description="vendor schemas and their $ref into a directory, for validation without network (--bundle)",
+    )
+    parser.print_usage = parser.print_help
+    parser.add_argument(
+        "--logging", choices=list(logging._nameToLevel.keys()), default="INFO"
+    )
+    parser.add_argument("schemas", nargs="*", metavar="schema", help="path or url")
+    parser.add_argument("-d", "--directory", required=True, help="bundle directory")
+    parser.add_argument(
+        "--builtin",
+        action="store_true",
+        help="include the schemas of the builtin resources (all versions)",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="use only cached remote schemas, never access the network",
+    )
+    parser.add_argument(
+        "--cache-dir", help="cache directory (default: ~/.cache/schemalint)"
+    )
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.logging)
+
+    schemas = list(args.schemas)
+    if args.builtin:
+        schemas.extend(management.iterate_urls())
+    if not schemas:
+        parser.error("schema is required (or --builtin)")
+
+    prefetcher = remote.get_prefetcher(
+        remote.get_remote_cache(args.cache_dir, offline=args.offline)
+    )
+    bundle = Bundle(args.directory)
+    failed = crawl(bundle, schemas, prefetcher=prefetcher)
+    bundle.save()
+    logger.info("bundle, %d documents in %s", len(bundle.documents), args.directory)
+
+    for url in sorted(failed):
+        logger.error("bundle, not included %s", url)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,24 @@
+import typing as t
+import os
+import os.path
+import threading
+
+
+def get_cache_dir(path: t.Optional[str] = None) -> str:
+    if path:
+        return path
+    path = os.environ.get("SCHEMALINT_CACHE_DIR")
+    if path:
+        return path
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "schemalint")
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmppath = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmppath, "wb") as wf:
+        wf.write(data)
+    os.replace(tmppath, path)
@@ -1,66 +1,299 @@
 import typing as t
 import sys
 import os.path
+import json
 import logging
-from schemalint import streams
-from schemalint.entity import LoggerWithCollectMessage
-from schemalint.validator import get_validator
-from schemalint.formatter import get_formatter, OutputType
-from schemalint import guess
+import functools
+from schemalint import profiling
+from schemalint import remote
+
+# the other modules are imported lazily (on the code path that needs them),
+# the cost of importing (e.g. jsonschema) is dominant for linting a few files.
+# (checked by schemalint/tests/test_importtime.py and benchmarks/importtime.py)
+if t.TYPE_CHECKING:
+    from schemalint.formatter import OutputType
+    from schemalint.streams import Stream
 
 logger = logging.getLogger(__name__)
 
 
+def _open_stream(
+    filepath: str, *, multi_document: bool, max_errors: t.Optional[int]
+) -> "Stream":
+    from schemalint import streams
+
+    if multi_document:
+        return streams.from_filename_documents(filepath, max_errors=max_errors)
+    return streams.from_filename(filepath, max_errors=max_errors)
+
+
 def run(
     filename: str,
     *,
     schema: t.Union[None, str, dict] = None,
     guess_schema: bool,
     always_success: bool,
-    output: OutputType,
+    output: "OutputType",
+    offline: bool = False,
+    cache_dir: t.Optional[str] = None,
+    cache_ttl: float = remote.DEFAULT_TTL,
+    multi_document: bool = False,
+    max_errors: t.Optional[int] = None,
+    bundle: t.Optional[str] = None,
+    cache_results: bool = False,
+    cache_schemas: bool = False,
+    memoize_validation: bool = False,
+    codegen: bool = False,
+    printer: t.Callable[[str], None] = print,
+    on_loaded: t.Optional[t.Callable[[t.List[str]], None]] = None,
+    on_schema: t.Optional[t.Callable[[t.Union[None, str, dict]], None]] = None,
 ) -> int:
+    from schemalint import streams
+    from schemalint.errors import MessageError
+    from schemalint.formatter import get_formatter
+
+    profile = profiling.get_profile()
+    profile.count("files")
     filepath = os.path.abspath(filename)
-    s = streams.from_filename(filepath)
 
+    base = s = None
+    if not cache_results:
+        # parsed before guessing, the guess reuses the parsed document (get-version)
+        base = s = _open_stream(
+            filepath, multi_document=multi_document, max_errors=max_errors
+        )
+
+    messages = None
     if guess_schema:
+        from schemalint import guess
+        from schemalint.entity import LoggerWithCollectMessage
+
         wlogger = LoggerWithCollectMessage(logger, {})
-        schema = guess.guess_schema(
+        with profile.phase("guess"):
+            schema = guess.guess_schema(
+                filepath,
+                code=".schemalint.py",
+                current=os.path.dirname(filename),
+                logger=wlogger,
+            )
+        messages = wlogger.messages
+    if on_schema is not None:  # the schema used for linting (e.g. for --watch)
+        on_schema(schema)
+
+    result_cache = None
+    if cache_results:
+        from schemalint import resultcache
+
+        result_cache = resultcache.get_result_cache(cache_dir)
+        remote_cache = remote.get_remote_cache(
+            cache_dir, ttl=cache_ttl, offline=offline
+        )
+        key = resultcache.make_key(
             filepath,
-            code=".schemalint.py",
-            current=os.path.dirname(filename),
-            logger=wlogger,
+            schema=resultcache.schema_fingerprint(
+                schema, remote_cache=remote_cache, bundle=bundle
+            ),
+            options={
+                "guess_schema": guess_schema,
+                "multi_document": multi_document,
+                "max_errors": max_errors,
+            },
         )
-        s = streams.append_messages(s, messages=wlogger.messages)
+        entry = result_cache.get(key)
+        if entry is not None:
+            profile.count("result_hits")
+            layout = get_formatter(filepath, lookup=None, output_type=output).layout
+            for record in entry["records"]:
+                printer(layout.layout(record))
+            if on_loaded is not None:
+                on_loaded(list(entry["files"]))
+            return 0 if always_success or entry["errors"] == 0 else 1
+
+    if s is None:
+        base = s = _open_stream(
+            filepath, multi_document=multi_document, max_errors=max_errors
+        )
+    if messages is not None:
+        s = streams.append_messages(s, messages=messages)
 
     if schema is not None:
-        if isinstance(schema, str):
-            if schema.startswith(("https://", "http://")):
-                import requests
+        from schemalint.bundle import get_bundle
+        from schemalint.validator import get_validator, get_registry, load_validator
 
-                schema = requests.get(schema).json()
+        with profile.phase("schema"):
+            registry = get_registry(
+                cache_dir,
+                persistent=cache_schemas,
+                memoize=memoize_validation,
+                codegen=codegen,
+            )
+            vendored = get_bundle(bundle) if bundle is not None else None
+            if isinstance(schema, str):
+                remote_cache = remote.get_remote_cache(
+                    cache_dir, ttl=cache_ttl, offline=offline
+                )
+                validator = load_validator(
+                    schema,
+                    remote_cache=remote_cache,
+                    registry=registry,
+                    bundle=vendored,
+                )
+            elif vendored is not None:
+                validator = get_validator(
+                    schema,
+                    check_schema=True,
+                    registry=registry,
+                    resources=vendored.documents,
+                    fetch=vendored.fetch_json,
+                )
             else:
-                from dictknife import loading
-
-                schema = loading.loadfile(schema)
-
-        validator = get_validator(schema, check_schema=True)  # TODO: skip_check option
+                validator = get_validator(schema, check_schema=True, registry=registry)
         s = streams.with_validator(s, validator)
     formatter = get_formatter(filepath, lookup=s.context.lookup, output_type=output)
 
     success = True
+    nerrors = 0
+    records = []  # for the result cache
     for ev in s:
-        if not always_success and not ev.has_soft_error:
-            success = False
-        print(formatter.format(ev))
+        if not ev.has_soft_error:
+            nerrors += 1
+            if not always_success:
+                success = False
+        profile.start()
+        record = formatter.to_dict(ev)
+        if result_cache is not None:
+            records.append(resultcache.snapshot(record))
+        line = formatter.layout.layout(record)
+        profile.stop("format")
+        printer(line)
+        if max_errors is not None and nerrors >= max_errors:
+            # the rest (loading and validation) is not evaluated, streams are lazy
+            message = MessageError(f"stopped, the number of errors reached {nerrors}")
+            record = formatter.build_message_error(message, context=s.context)
+            if result_cache is not None:
+                records.append(resultcache.snapshot(record))
+            printer(formatter.layout.layout(record))
+            break
+
+    if result_cache is not None:
+        result_cache.set(key, filenames=base.filenames, records=records, errors=nerrors)
+    if on_loaded is not None:  # the files used for linting (e.g. for --watch)
+        on_loaded(base.filenames)
     return 0 if success else 1
 
 
+def expand_filenames(patterns: t.Sequence[str]) -> t.List[str]:
+    import glob
+
+    filenames = []
+    seen = set()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            # not matched pattern is kept as is, reported as not found by run()
+            candidates = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        else:
+            candidates = [pattern]  # not found file is reported by run()
+        for filename in candidates:
+            if filename in seen:
+                continue
+            seen.add(filename)
+            filenames.append(filename)
+    return filenames
+
+
+def _run_one(
+    filename: str,
+    *,
+    run: t.Callable[..., int],
+    printer: t.Callable[[str], None],
+    **params: t.Any,
+) -> int:
+    # the error of a file (e.g. not found) is reported, and the rest of files are linted
+    try:
+        return run(filename, printer=printer, **params)
+    except Exception as e:
+        logger.debug("failed to lint %s (%r)", filename, e, exc_info=True)
+        from schemalint.formatter import get_formatter
+
+        formatter = get_formatter(filename, lookup=None, output_type=params["output"])
+        printer(formatter.format_message_error(e, context=None, status="ERROR"))
+        return 1
+
+
+def _run_captured(
+    filename: str, *, run: t.Callable[..., int], profile: bool, **params: t.Any
+) -> t.Tuple[int, t.List[str], t.Optional[t.Dict[str, t.Any]]]:
+    # in the worker process, only picklable values are returned (not exceptions)
+    lines: t.List[str] = []
+    if not profile:
+        status = _run_one(filename, run=run, printer=lines.append, **params)
+        return status, lines, None
+    with profiling.activate() as p:
+        status = _run_one(filename, run=run, printer=lines.append, **params)
+    return status, lines, p.to_dict()
+
+
+def run_many(
+    filenames: t.Sequence[str],
+    *,
+    jobs: int = 1,
+    run: t.Callable[..., int] = run,
+    printer: t.Callable[[str], None] = print,
+    fail_fast: bool = False,
+    **params: t.Any,
+) -> int:
+    status = 0
+    if jobs == 1 or len(filenames) <= 1:
+        for filename in filenames:
+            status = max(status, _run_one(filename, run=run, printer=printer, **params))
+            if fail_fast and status != 0:
+                break
+        return status
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = jobs or os.cpu_count() or 1
+    # chunking, so that each worker reuses loaded schemas for several files
+    chunksize = max(1, len(filenames) // (jobs * 4))
+    profile = profiling.get_profile()
+    fn = functools.partial(_run_captured, run=run, profile=profile.enabled, **params)
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+        # map() returns results in the order of filenames
+        for file_status, lines, d in ex.map(fn, filenames, chunksize=chunksize):
+            status = max(status, file_status)
+            for line in lines:
+                printer(line)
+            if d is not None:
+                profile.merge(d)
+            if fail_fast and status != 0:
+                if sys.version_info >= (3, 9):
+                    ex.shutdown(wait=False, cancel_futures=True)
+                break
+    return status
+
+
 def main(argv=None, *, run=run):
     import argparse
 
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "lsp":
+        from schemalint import lsp
+
+        return lsp.main(argv[1:])
+    if argv and argv[0] == "deps":
+        from schemalint import deps
+
+        return deps.main(argv[1:])
+    if argv and argv[0] == "bundle":
+        from schemalint import bundle
+
+        return bundle.main(argv[1:])
+
     parser = argparse.ArgumentParser(description=None)
     parser.print_usage = parser.print_help
-    parser.add_argument("filename")
+    parser.add_argument(
+        "filenames", nargs="+", metavar="filename", help="file paths or glob patterns"
+    )
     parser.add_argument(
         "--logging", choices=list(logging._nameToLevel.keys()), default="INFO"
     )
@@ -73,19 +306,101 @@ def main(argv=None, *, run=run):
     )
     parser.add_argument("-o", "--output", choices=["ltsv", "json"], default="ltsv")
     parser.add_argument("--always-success", action="store_true")
+    parser.add_argument(
+        "--multi-document",
+        action="store_true",
+        help="load, resolve and validate each '---' separated document one by one",
+    )
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        help="stop linting a file, when the number of errors reaches N",
+        metavar="N",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="stop at the first error (same as --max-errors=1, and skipping the rest of files)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes (0 means the number of CPUs)",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="use only cached remote schemas, never access the network",
+    )
+    parser.add_argument(
+        "--cache-dir", help="cache directory (default: ~/.cache/schemalint)"
+    )
+    parser.add_argument(
+        "--bundle",
+        help="resolve remote schemas from the bundle directory (see: schemalint bundle)",
+        metavar="DIRECTORY",
+    )
+    parser.add_argument(
+        "--cache-results",
+        action="store_true",
+        help="reuse the results of the files not changed (including the files referenced via $ref)",
+    )
+    parser.add_argument(
+        "--cache-schemas",
+        action="store_true",
+        help="record the checked schemas in the cache directory, and skip checking them again",
+    )
+    parser.add_argument(
+        "--memoize-validation",
+        action="store_true",
+        help="validate the identical subtrees (against the same sub schema) once",
+    )
+    parser.add_argument(
+        "--codegen",
+        action="store_true",
+        help="compile the schema to python code (cached on disk), for faster validation",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running, and relint the files affected by the changes (including the files referenced via $ref)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="report per-phase time and counters as json, on stderr",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=remote.DEFAULT_TTL,
+        help="seconds until a cached remote schema is revalidated",
+    )
 
     args = parser.parse_args(argv)
     params = vars(args)
 
     logging.basicConfig(level=params.pop("logging"))
-    try:
-        sys.exit(run(**params))
-    except Exception as e:
-        if not args.always_success:
-            raise
-        formatter = get_formatter(args.filename, lookup=None, output_type=args.output)
-        print(formatter.format_message_error(e, context=None, status="ERROR"))
-        sys.exit(1)
+    if params["fail_fast"]:
+        params["max_errors"] = 1
+    if params.pop("watch"):
+        from schemalint import watch
+
+        params.pop("profile")
+        sys.exit(watch.watch(params.pop("filenames"), run=run, **params))
+
+    filenames = expand_filenames(params.pop("filenames"))
+    if not params.pop("profile"):
+        sys.exit(run_many(filenames, run=run, **params))
+
+    with profiling.activate() as p:
+        try:
+            status = run_many(filenames, run=run, **params)
+        finally:
+            print(json.dumps({"profile": p.to_dict()}), file=sys.stderr)
+    sys.exit(status)
 
 
 if __name__ == "__main__":
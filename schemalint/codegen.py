@@ -0,0 +1,594 @@
+import typing as t
+import os.path
+import re
+import sys
+import types
+import marshal
+import hashlib
+import logging
+import threading
+import functools
+from importlib.util import MAGIC_NUMBER
+
+from jsonschema import validators
+
+if t.TYPE_CHECKING:
+    from jsonschema import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# compiling a (draft7) schema to the python code, in the spirit of fastjsonschema.
+#
+# the generated code is a specialized is_valid() function per sub schema, it never produces errors.
+# each keyword function of the validator is wrapped, and the interpreted keyword is evaluated
+# only if the compiled check fails. so the errors (message, instance, path, ...) are the same as
+# the interpreted one, and the valid subtrees (the most of the document) are skipped.
+#
+# the compiled check is exact, when it cannot decide (e.g. remote $ref), Undecided is raised
+# and the interpreter decides.
+
+VERSION = 2  # of the generated code (and the format of the cached file)
+
+
+class Unsupported(Exception):
+    pass
+
+
+class Undecided(Exception):
+    pass
+
+
+TYPE_CHECKS = {
+    "array": "isinstance(x, list)",
+    "boolean": "isinstance(x, bool)",
+    "integer": "(isinstance(x, int) and not isinstance(x, bool) or isinstance(x, float) and x.is_integer())",
+    "null": "x is None",
+    "number": "(isinstance(x, Number) and not isinstance(x, bool))",
+    "object": "isinstance(x, dict)",
+    "string": "isinstance(x, str)",
+}
+
+
+class _Generator:
+    def __init__(self, root: t.Any, *, keywords: t.Container[str]) -> None:
+        self.root = root
+        # the keywords of the validator (the others are ignored, like the interpreter)
+        self.keywords = keywords
+        self.names: t.Dict[int, str] = {}  # id(schema) -> function name
+        self.pending: t.List[t.Tuple[t.Any, str, str]] = []
+        self.consts: t.List[str] = []
+        self.functions: t.List[str] = []
+        self.table: t.List[str] = []
+
+    def generate(self) -> str:
+        self.function_name(self.root, "S")
+        while self.pending:
+            self.function(*self.pending.pop())
+
+        lines = [
+            f"# generated by schemalint.codegen (version {VERSION})",
+            "import re",
+            "from numbers import Number",
+            "from jsonschema._utils import equal, uniq",
+            "from schemalint.codegen import Undecided, _multiple",
+            "",
+            "",
+            "def build(S):",
+        ]
+        lines.extend("    " + line for line in self.consts)
+        lines.extend("    " + line for line in self.functions)
+        lines.append(f"    return [{', '.join(self.table)}]")
+        return "\n".join(lines) + "\n"
+
+    def const(self, expr: str) -> str:
+        name = f"c{len(self.consts)}"
+        self.consts.append(f"{name} = {expr}")
+        return name
+
+    def function_name(self, schema: t.Any, expr: str) -> str:
+        uid = id(schema)
+        name = self.names.get(uid)
+        if name is None:
+            name = self.names[uid] = f"v{len(self.names)}"
+            self.pending.append((schema, expr, name))
+        return name
+
+    def function(self, schema: t.Any, expr: str, name: str) -> None:
+        self.table.append(f"({self.const(expr)}, {name})")
+        if schema is True or schema == {}:
+            body = ["return True"]
+        elif schema is False:
+            body = ["return False"]
+        elif isinstance(schema, dict):
+            body = self.checks(schema, expr)
+            body.append("return True")
+        else:
+            raise Unsupported(f"schema {schema!r}")
+        self.functions.append(f"def {name}(x):")
+        self.functions.extend("    " + line for line in body)
+
+    def resolve(self, ref: str) -> t.Optional[t.Tuple[t.Any, str]]:
+        # only the local json pointer (the others are evaluated by the interpreter)
+        from urllib.parse import unquote
+
+        if ref == "#":
+            return self.root, "S"
+        if not ref.startswith("#/"):
+            return None
+        target, expr = self.root, "S"
+        for part in ref[2:].split("/"):
+            part = unquote(part).replace("~1", "/").replace("~0", "~")
+            if isinstance(target, list):
+                try:
+                    index = int(part)
+                    target = target[index]
+                except (ValueError, IndexError):
+                    return None
+                expr = f"{expr}[{index}]"
+            elif isinstance(target, dict) and part in target:
+                target = target[part]
+                expr = f"{expr}[{part!r}]"
+            else:
+                return None
+        return target, expr
+
+    def checks(self, schema: t.Dict[str, t.Any], expr: str) -> t.List[str]:
+        if "$ref" in schema:  # draft7, the siblings of $ref are ignored
+            resolved = self.resolve(schema["$ref"])
+            if resolved is None:
+                return ["raise Undecided"]
+            return [f"return {self.function_name(*resolved)}(x)"]
+
+        lines: t.List[str] = []
+        for k, v in schema.items():
+            if k not in self.keywords:
+                continue
+            fn = getattr(self, "keyword_" + k, None)
+            if fn is None:
+                raise Unsupported(f"keyword {k!r}")
+            lines.extend(fn(v, schema, expr))
+        return lines
+
+    def sub(self, schema: t.Any, expr: str) -> str:
+        return self.function_name(schema, expr)
+
+    def pattern(self, pattern: t.Any) -> str:
+        try:
+            re.compile(pattern)
+        except (re.error, TypeError):
+            raise Unsupported(f"pattern {pattern!r}")
+        return self.const(f"re.compile({pattern!r})")
+
+    def size(self, typ: str, op: str, v: t.Any) -> t.List[str]:
+        return [f"if isinstance(x, {typ}) and len(x) {op} {v!r}:", "    return False"]
+
+    def compare(self, op: str, expr: str) -> t.List[str]:
+        number = TYPE_CHECKS["number"]
+        return [f"if {number} and x {op} {self.const(expr)}:", "    return False"]
+
+    # keyword_<name>(value, schema, expression of the schema)
+
+    def keyword_format(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        return []  # the format_checker is not used
+
+    def keyword_type(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        types = [v] if isinstance(v, str) else v
+        if not all(isinstance(name, str) and name in TYPE_CHECKS for name in types):
+            return ["raise Undecided"]
+        cond = " or ".join(TYPE_CHECKS[name] for name in types)
+        return [f"if not ({cond}):", "    return False"]
+
+    def keyword_enum(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        if v and all(isinstance(x, str) for x in v):
+            c = self.const(f"frozenset({expr}['enum'])")
+            return [f"if not (isinstance(x, str) and x in {c}):", "    return False"]
+        c = self.const(f"{expr}['enum']")
+        return [f"if all(not equal(e, x) for e in {c}):", "    return False"]
+
+    def keyword_const(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        c = self.const(f"{expr}['const']")
+        return [f"if not equal(x, {c}):", "    return False"]
+
+    def keyword_properties(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        lines = []
+        for name, sub in v.items():
+            if sub is True or sub == {}:
+                continue
+            fn = self.sub(sub, f"{expr}['properties'][{name!r}]")
+            lines.append(f"    if {name!r} in x and not {fn}(x[{name!r}]):")
+            lines.append("        return False")
+        return ["if isinstance(x, dict):", *lines] if lines else []
+
+    def keyword_required(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        if not v:
+            return []
+        cond = " and ".join(f"{name!r} in x" for name in v)
+        return [f"if isinstance(x, dict) and not ({cond}):", "    return False"]
+
+    def keyword_additionalProperties(
+        self, v: t.Any, schema: t.Any, expr: str
+    ) -> t.List[str]:
+        if v is True or v == {}:
+            return []
+        lines = ["if isinstance(x, dict):", "    for k, v in x.items():"]
+        if schema.get("properties"):
+            c = self.const(f"frozenset({expr}['properties'])")
+            lines.extend([f"        if k in {c}:", "            continue"])
+        patterns = "|".join(schema.get("patternProperties", {}))
+        if patterns:
+            c = self.pattern(patterns)
+            lines.extend(
+                [
+                    "        if not isinstance(k, str):",
+                    "            raise Undecided",
+                    f"        if {c}.search(k):",
+                    "            continue",
+                ]
+            )
+        if v is False:
+            lines.append("        return False")
+        else:
+            fn = self.sub(v, f"{expr}['additionalProperties']")
+            lines.extend([f"        if not {fn}(v):", "            return False"])
+        return lines
+
+    def keyword_patternProperties(
+        self, v: t.Any, schema: t.Any, expr: str
+    ) -> t.List[str]:
+        lines = []
+        for pattern, sub in v.items():
+            c = self.pattern(pattern)
+            fn = self.sub(sub, f"{expr}['patternProperties'][{pattern!r}]")
+            lines.extend(
+                [
+                    "    for k, v in x.items():",
+                    "        if not isinstance(k, str):",
+                    "            raise Undecided",
+                    f"        if {c}.search(k) and not {fn}(v):",
+                    "            return False",
+                ]
+            )
+        return ["if isinstance(x, dict):", *lines] if lines else []
+
+    def keyword_propertyNames(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        fn = self.sub(v, f"{expr}['propertyNames']")
+        return [
+            "if isinstance(x, dict):",
+            "    for k in x:",
+            f"        if not {fn}(k):",
+            "            return False",
+        ]
+
+    def keyword_dependencies(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        lines = []
+        for name, dependency in v.items():
+            if isinstance(dependency, list):
+                if not dependency:
+                    continue
+                cond = " and ".join(f"{d!r} in x" for d in dependency)
+            else:
+                fn = self.sub(dependency, f"{expr}['dependencies'][{name!r}]")
+                cond = f"{fn}(x)"
+            lines.extend(
+                [f"    if {name!r} in x and not ({cond}):", "        return False"]
+            )
+        return ["if isinstance(x, dict):", *lines] if lines else []
+
+    def keyword_items(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        if isinstance(v, list):
+            lines = []
+            for i, sub in enumerate(v):
+                fn = self.sub(sub, f"{expr}['items'][{i}]")
+                lines.extend(
+                    [
+                        f"    if len(x) > {i} and not {fn}(x[{i}]):",
+                        "        return False",
+                    ]
+                )
+            return ["if isinstance(x, list):", *lines] if lines else []
+        if v is True or v == {}:
+            return []
+        fn = self.sub(v, f"{expr}['items']")
+        return [
+            "if isinstance(x, list):",
+            "    for v in x:",
+            f"        if not {fn}(v):",
+            "            return False",
+        ]
+
+    def keyword_additionalItems(
+        self, v: t.Any, schema: t.Any, expr: str
+    ) -> t.List[str]:
+        items = schema.get("items", {})
+        if isinstance(items, dict):
+            return []
+        if not isinstance(items, list):
+            return ["if isinstance(x, list):", "    raise Undecided"]
+        n = len(items)
+        if isinstance(v, dict):
+            fn = self.sub(v, f"{expr}['additionalItems']")
+            return [
+                "if isinstance(x, list):",
+                f"    for v in x[{n}:]:",
+                f"        if not {fn}(v):",
+                "            return False",
+            ]
+        if not v:
+            return [f"if isinstance(x, list) and len(x) > {n}:", "    return False"]
+        return []
+
+    def keyword_contains(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        fn = self.sub(v, f"{expr}['contains']")
+        return [
+            f"if isinstance(x, list) and not any({fn}(v) for v in x):",
+            "    return False",
+        ]
+
+    def keyword_minItems(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        return self.size("list", "<", v)
+
+    def keyword_maxItems(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        return self.size("list", ">", v)
+
+    def keyword_minLength(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        return self.size("str", "<", v)
+
+    def keyword_maxLength(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        return self.size("str", ">", v)
+
+    def keyword_minProperties(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        return self.size("dict", "<", v)
+
+    def keyword_maxProperties(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        return self.size("dict", ">", v)
+
+    def keyword_uniqueItems(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        if not v:
+            return []
+        return ["if isinstance(x, list) and not uniq(x):", "    return False"]
+
+    def keyword_pattern(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        c = self.pattern(v)
+        return [f"if isinstance(x, str) and not {c}.search(x):", "    return False"]
+
+    def keyword_minimum(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        return self.compare("<", f"{expr}['minimum']")
+
+    def keyword_maximum(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        return self.compare(">", f"{expr}['maximum']")
+
+    def keyword_exclusiveMinimum(
+        self, v: t.Any, schema: t.Any, expr: str
+    ) -> t.List[str]:
+        return self.compare("<=", f"{expr}['exclusiveMinimum']")
+
+    def keyword_exclusiveMaximum(
+        self, v: t.Any, schema: t.Any, expr: str
+    ) -> t.List[str]:
+        return self.compare(">=", f"{expr}['exclusiveMaximum']")
+
+    def keyword_multipleOf(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        number = TYPE_CHECKS["number"]
+        c = self.const(f"{expr}['multipleOf']")
+        return [f"if {number} and not _multiple(x, {c}):", "    return False"]
+
+    def keyword_allOf(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        lines = []
+        for i, sub in enumerate(v):
+            fn = self.sub(sub, f"{expr}['allOf'][{i}]")
+            lines.extend([f"if not {fn}(x):", "    return False"])
+        return lines
+
+    def keyword_anyOf(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        fns = [self.sub(sub, f"{expr}['anyOf'][{i}]") for i, sub in enumerate(v)]
+        cond = " or ".join(f"{fn}(x)" for fn in fns) or "False"
+        return [f"if not ({cond}):", "    return False"]
+
+    def keyword_oneOf(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        fns = [self.sub(sub, f"{expr}['oneOf'][{i}]") for i, sub in enumerate(v)]
+        calls = ", ".join(f"{fn}(x)" for fn in fns)
+        return [f"if [{calls}].count(True) != 1:", "    return False"]
+
+    def keyword_not(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        fn = self.sub(v, f"{expr}['not']")
+        return [f"if {fn}(x):", "    return False"]
+
+    def keyword_if(self, v: t.Any, schema: t.Any, expr: str) -> t.List[str]:
+        fn = self.sub(v, f"{expr}['if']")
+        lines = [f"if {fn}(x):"]
+        if "then" in schema:
+            fn = self.sub(schema["then"], f"{expr}['then']")
+            lines.extend([f"    if not {fn}(x):", "        return False"])
+        else:
+            lines.append("    pass")
+        if "else" in schema:
+            fn = self.sub(schema["else"], f"{expr}['else']")
+            lines.extend(["else:", f"    if not {fn}(x):", "        return False"])
+        return lines
+
+
+# the same as the interpreter (jsonschema._keywords.multipleOf)
+def _multiple(x: t.Any, dB: t.Any) -> bool:
+    if isinstance(dB, float):
+        quotient = x / dB
+        try:
+            return int(quotient) == quotient
+        except OverflowError:
+            from fractions import Fraction
+
+            return (Fraction(x) / Fraction(dB)).denominator == 1
+    return not x % dB
+
+
+def _has_id(schema: t.Any) -> bool:
+    # the nested $id changes the base uri of $ref
+    if isinstance(schema, dict):
+        return "$id" in schema or any(_has_id(v) for v in schema.values())
+    if isinstance(schema, list):
+        return any(_has_id(v) for v in schema)
+    return False
+
+
+def generate(schema: t.Any, *, keywords: t.Container[str]) -> str:
+    if isinstance(schema, dict) and any(_has_id(v) for v in schema.values()):
+        raise Unsupported("nested $id")
+    return _Generator(schema, keywords=keywords).generate()
+
+
+# the compiled checks, id(sub schema) -> (sub schema, is_valid)
+_checks: t.Dict[int, t.Tuple[t.Any, t.Callable[[t.Any], bool]]] = {}
+# id(schema) -> (fingerprint, ids of its sub schemas, the number of validators using them)
+_roots: t.Dict[int, t.Tuple[str, t.List[int], int]] = {}
+_lock = threading.Lock()  # shared by registries
+_local = threading.local()
+
+HEADER = MAGIC_NUMBER + VERSION.to_bytes(4, "little")
+
+
+def _digest(fp: str, payload: bytes) -> bytes:
+    # the file is for the schema, and not broken (e.g. truncated)
+    return hashlib.sha256(fp.encode("utf-8") + payload).digest()
+
+
+def _read_code(path: str, fp: str) -> t.Any:
+    # <header><sha256 of fingerprint + payload><payload (marshaled code object)>
+    with open(path, "rb") as rf:
+        data = rf.read()
+    if not data.startswith(HEADER):
+        raise ValueError("unsupported version")
+    n = len(HEADER)
+    digest, payload = data[n : n + 32], data[n + 32 :]
+    if digest != _digest(fp, payload):
+        raise ValueError("digest mismatch")
+    code = marshal.loads(payload)
+    if not isinstance(code, types.CodeType):
+        raise ValueError("not code object")
+    return code
+
+
+def _load_code(
+    schema: t.Any, fp: str, *, keywords: t.Container[str], directory: t.Optional[str]
+) -> t.Any:
+    # <directory>/<cache tag>/<fingerprint>.bin
+    from schemalint.cachedir import write_atomic
+
+    path = None
+    if directory is not None:
+        tag = sys.implementation.cache_tag or "python"
+        path = os.path.join(directory, tag, fp + ".bin")
+        try:
+            return _read_code(path, fp)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, EOFError, TypeError) as e:
+            logger.info("codegen, ignored the cached code %s (%r)", path, e)
+
+    source = generate(schema, keywords=keywords)
+    code = compile(source, f"<schemalint.codegen {path or 'memory'}>", "exec")
+    logger.debug("codegen, compiled %d lines", source.count("\n"))
+    if path is not None:
+        payload = marshal.dumps(code)
+        try:
+            write_atomic(path, HEADER + _digest(fp, payload) + payload)
+        except OSError as e:
+            logger.info("codegen, cannot write (%r)", e)
+    return code
+
+
+def compile_schema(
+    schema: t.Any,
+    *,
+    keywords: t.Container[str],
+    directory: t.Optional[str] = None,
+) -> bool:
+    # False, if the schema is not supported (validated by the interpreter only).
+    # if True, release() is called when the validator is not used anymore
+    from schemalint.validator import fingerprint
+
+    fp = fingerprint(schema)
+    with _lock:
+        compiled = _roots.get(id(schema))
+        if compiled is not None:
+            if compiled[0] == fp:
+                _roots[id(schema)] = (fp, compiled[1], compiled[2] + 1)
+                return True
+            _drop(schema)  # modified in place
+        try:
+            code = _load_code(schema, fp, keywords=keywords, directory=directory)
+        except Unsupported as e:
+            logger.info("codegen, fallback to the interpreter (%s)", e)
+            return False
+        namespace: t.Dict[str, t.Any] = {}
+        exec(code, namespace)
+        table = namespace["build"](schema)
+        for sub, fn in table:
+            _checks[id(sub)] = (sub, fn)
+        _roots[id(schema)] = (fp, [id(sub) for sub, _ in table], 1)
+        return True
+
+
+def release(schema: t.Any) -> None:
+    # the compiled checks are dropped, when no validator uses them
+    # (e.g. the same schema with the different resources, in the registry)
+    with _lock:
+        compiled = _roots.get(id(schema))
+        if compiled is None:
+            return
+        if compiled[2] > 1:
+            _roots[id(schema)] = (compiled[0], compiled[1], compiled[2] - 1)
+            return
+        _drop(schema)
+
+
+def _drop(schema: t.Any) -> None:
+    _, uids, _ = _roots.pop(id(schema), ("", [], 0))
+    for uid in uids:
+        _checks.pop(uid, None)
+
+
+def is_valid(schema: t.Any, instance: t.Any) -> bool:
+    entry = _checks.get(id(schema))
+    if entry is None or entry[0] is not schema:
+        return False
+    # each keyword of a schema is evaluated with the same instance
+    last = getattr(_local, "last", None)
+    if last is not None and last[0] is schema and last[1] is instance:
+        return t.cast(bool, last[2])
+    try:
+        ok = entry[1](instance)
+    except Exception:  # e.g. Undecided, the interpreter decides (or raises the same error)
+        ok = False
+    _local.last = (schema, instance, ok)
+    return ok
+
+
+def _compiled(fn: t.Callable[..., t.Any]) -> t.Callable[..., t.Any]:
+    @functools.wraps(fn)
+    def _keyword(validator, value, instance, schema):
+        if is_valid(schema, instance):
+            return None
+        return fn(validator, value, instance, schema)
+
+    return _keyword
+
+
+@functools.lru_cache(maxsize=None)
+def compiled(cls: t.Type[t.Any]) -> t.Type[t.Any]:
+    return validators.extend(
+        cls, validators={k: _compiled(fn) for k, fn in cls.VALIDATORS.items()}
+    )
+
+
+class CompiledValidator:
+    def __init__(self, validator: t.Any) -> None:
+        self.validator = validator
+
+    def __getattr__(self, name: str) -> t.Any:
+        return getattr(self.validator, name)
+
+    def iter_errors(self, instance: t.Any) -> t.Iterator["ValidationError"]:
+        # the instance may be modified, since the last validation
+        _local.last = None
+        return t.cast(
+            t.Iterator["ValidationError"], self.validator.iter_errors(instance)
+        )
@@ -0,0 +1,181 @@
+import typing as t
+import sys
+import os.path
+import json
+import logging
+
+from schemalint.cachedir import write_atomic
+from schemalint.loader import get_loader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX = ".schemalint-deps.json"
+VERSION = 1
+SUPPORT_EXTENSIONS = (".yaml", ".yml", ".json")  # for the files not in the index
+
+
+class DependencyIndex:
+    # root file -> files referenced via $ref (transitively), paths are relative to the index file
+    def __init__(
+        self, path: str, *, roots: t.Optional[t.Dict[str, t.List[str]]] = None
+    ):
+        self.path = os.path.abspath(path)
+        self.base = os.path.dirname(self.path)
+        self.roots: t.Dict[str, t.List[str]] = roots or {}
+
+    @classmethod
+    def load(cls, path: str) -> "DependencyIndex":
+        try:
+            with open(path) as rf:
+                data = json.load(rf)
+        except FileNotFoundError:
+            return cls(path)
+        if data.get("version") != VERSION:
+            logger.info("index version is changed, ignored %s", path)
+            return cls(path)
+        return cls(path, roots=data["roots"])
+
+    def save(self) -> None:
+        data = {"version": VERSION, "roots": self.roots}
+        body = json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False)
+        write_atomic(self.path, (body + "\n").encode("utf-8"))
+
+    def _key(self, filename: str) -> str:
+        return os.path.relpath(os.path.abspath(filename), start=self.base)
+
+    def _filename(self, key: str) -> str:
+        return os.path.normpath(os.path.join(self.base, key))
+
+    def update(self, root: str, filenames: t.Iterable[str]) -> None:
+        key = self._key(root)
+        self.roots[key] = sorted({self._key(name) for name in filenames} - {key})
+
+    def remove(self, root: str) -> None:
+        self.roots.pop(self._key(root), None)
+
+    def filenames(self) -> t.Set[str]:
+        # the root files and the files referenced via $ref
+        return {self._filename(k) for k in self.dependents()}
+
+    def prune(self) -> t.List[str]:
+        # removing the root files, which are not found
+        removed = [k for k in self.roots if not os.path.exists(self._filename(k))]
+        for k in removed:
+            del self.roots[k]
+        return removed
+
+    def dependents(self) -> t.Dict[str, t.Set[str]]:
+        # reverse index, file -> root files
+        r: t.Dict[str, t.Set[str]] = {}
+        for root, deps in self.roots.items():
+            r.setdefault(root, set()).add(root)
+            for dep in deps:
+                r.setdefault(dep, set()).add(root)
+        return r
+
+    def affected(self, changed: t.Iterable[str]) -> t.List[str]:
+        # the root files that need relinting (unknown yaml/json files are regarded as new root files)
+        dependents = self.dependents()
+        found: t.Set[str] = set()
+        for filename in changed:
+            key = self._key(filename)
+            roots = dependents.get(key)
+            if roots is not None:
+                found.update(roots)
+            elif filename.endswith(SUPPORT_EXTENSIONS) and os.path.exists(filename):
+                found.add(key)
+        return sorted(
+            self._filename(k) for k in found if os.path.exists(self._filename(k))
+        )
+
+
+def schema_files(schema: str) -> t.Set[str]:
+    # the local schema file, and the local files referenced via $ref (transitively)
+    import pathlib
+    import urllib.parse
+    from dictknife import loading
+    from schemalint import remote
+
+    files: t.Set[str] = set()
+    pending = [os.path.abspath(schema)]
+    while pending:
+        path = pending.pop()
+        if path in files:
+            continue
+        files.add(path)
+        try:
+            doc = loading.loadfile(path)
+        except Exception as e:  # not found, or broken (reported on linting)
+            logger.debug("schema files, cannot load %s (%r)", path, e)
+            continue
+        for url in remote.iterate_refs(doc, pathlib.Path(path).as_uri()):
+            if url.startswith("file://"):
+                parsed = urllib.parse.urlparse(url)
+                pending.append(os.path.normpath(urllib.parse.unquote(parsed.path)))
+    return files
+
+
+def update(index: DependencyIndex, filenames: t.Sequence[str]) -> None:
+    for filename in filenames:
+        loader = get_loader(os.path.abspath(filename))
+        try:
+            loader.load()
+        except Exception as e:
+            # the dependencies found until the failure, are recorded
+            logger.warning("load failed %s (%r)", filename, e)
+        index.update(filename, loader.filenames)
+
+
+def main(argv=None):
+    import argparse
+    from schemalint.cli import expand_filenames
+
+    parser = argparse.ArgumentParser(
+        prog="schemalint deps",
+        description="the index of $ref, for relinting only the files affected by changes",
+    )
+    parser.print_usage = parser.print_help
+    subparsers = parser.add_subparsers(dest="action")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--logging", choices=list(logging._nameToLevel.keys()), default="INFO"
+    )
+    common.add_argument("--index", default=DEFAULT_INDEX, help="(default: %(default)s)")
+
+    sparser = subparsers.add_parser(
+        "update", parents=[common], help="add (or update) root files"
+    )
+    sparser.add_argument(
+        "filenames", nargs="+", metavar="filename", help="file paths or glob patterns"
+    )
+    sparser.add_argument(
+        "--prune", action="store_true", help="remove the root files, not found"
+    )
+
+    sparser = subparsers.add_parser(
+        "affected",
+        parents=[common],
+        help="print the root files affected by the changed files",
+    )
+    sparser.add_argument(
+        "changed", nargs="*", help="changed files (if not given, read from stdin)"
+    )
+
+    args = parser.parse_args(argv)
+    if args.action is None:
+        parser.print_help()
+        sys.exit(2)
+    logging.basicConfig(level=args.logging)
+    index = DependencyIndex.load(args.index)
+
+    if args.action == "update":
+        update(index, expand_filenames(args.filenames))
+        if args.prune:
+            for k in index.prune():
+                logger.info("pruned %s", k)
+        index.save()
+    elif args.action == "affected":
+        changed = args.changed or [line.strip() for line in sys.stdin if line.strip()]
+        for filename in index.affected(changed):
+            print(os.path.relpath(filename))
@@ -2,6 +2,7 @@ from __future__ import annotations
 import typing as t
 import types
 import logging
+from array import array
 from dataclasses import dataclass, field
 
 from typing_extensions import Protocol
@@ -27,23 +28,124 @@ class Context:
 
 
 class Lookup(Protocol):
-    def lookup_node(self, data: object) -> object:
+    def lookup_node(self, data: object) -> Node:
         ...
 
+    def lookup_kvpair(self, data: object, k: object) -> t.Tuple[Node, Node]:
+        ...
+
+
+class Mark(t.NamedTuple):
+    # light weight version of yaml.error.Mark
+    name: str
+    line: int
+    column: int
 
-class NodeStore(Lookup):
-    def __init__(self):
-        self.cache = {}
 
-    def add_node(self, name, node, r):
-        logger.debug("add_node %s", name)
-        if r is None:
-            return r
-        self.cache[id(r)] = node
-        return r
+class Node(t.NamedTuple):
+    start_mark: Mark
+    end_mark: Mark
 
-    def lookup_node(self, data: object) -> object:
-        return self.cache[id(data)]
+
+class NodeStore(Lookup):
+    # positions of containers, and their members (key/value pairs or items).
+    # only line and column are stored, the node graph of yaml is not retained.
+    def __init__(self):
+        self.names: t.List[str] = []
+        self._name_index: t.Dict[str, int] = {}
+        # rows of (name, start line, start column, end line, end column)
+        self.positions = array("l")
+        self.containers: t.Dict[int, int] = {}  # id(container) -> row
+        # (id(container), key or index) -> row of value (row of key is row - 1)
+        self.members: t.Dict[t.Tuple[int, t.Any], int] = {}
+        self.aliases: t.Dict[int, object] = {}  # id(copied container) -> original
+        self.stores: t.List[NodeStore] = []  # stores of shared fragments
+
+    def attach(self, store: NodeStore) -> None:
+        if store is not self and store not in self.stores:
+            self.stores.append(store)
+
+    def add_alias(self, data: object, original: object) -> None:
+        self.aliases[id(data)] = original
+
+    def _name(self, name: str) -> int:
+        i = self._name_index.get(name)
+        if i is None:
+            i = self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def _add_row(self, start: Mark, end: Mark) -> int:
+        i = self._name(start.name)
+        row = len(self.positions) // 5
+        self.positions.extend((i, start.line, start.column, end.line, end.column))
+        return row
+
+    def add_rows(self, name: str, marks: array) -> int:
+        # bulk version of _add_row(), marks are flattened (line, column) pairs, two marks per row.
+        # the first row is returned
+        n = len(marks) // 4
+        rows = array("l", [0]) * (5 * n)
+        rows[0::5] = array("l", [self._name(name)]) * n
+        rows[1::5] = marks[0::4]
+        rows[2::5] = marks[1::4]
+        rows[3::5] = marks[2::4]
+        rows[4::5] = marks[3::4]
+        row = len(self.positions) // 5
+        self.positions.extend(rows)
+        return row
+
+    def add_container(self, data: object, start: Mark, end: Mark) -> None:
+        self.containers[id(data)] = self._add_row(start, end)
+
+    def add_kvpair(
+        self,
+        data: object,
+        k: object,
+        key: t.Tuple[Mark, Mark],
+        value: t.Tuple[Mark, Mark],
+    ) -> None:
+        self._add_row(*key)
+        self.members[(id(data), k)] = self._add_row(*value)
+
+    def add_item(self, data: object, i: int, value: t.Tuple[Mark, Mark]) -> None:
+        self.members[(id(data), i)] = self._add_row(*value)
+
+    def clear(self) -> None:
+        self.names.clear()
+        self._name_index.clear()
+        del self.positions[:]
+        self.containers.clear()
+        self.members.clear()
+        self.aliases.clear()
+        self.stores.clear()
+
+    def _node(self, row: int) -> Node:
+        i = row * 5
+        name = self.names[self.positions[i]]
+        sl, sc, el, ec = self.positions[i + 1 : i + 5]
+        return Node(start_mark=Mark(name, sl, sc), end_mark=Mark(name, el, ec))
+
+    def _find(self, index: str, key: t.Any) -> t.Tuple[NodeStore, int]:
+        for store in (self, *self.stores):
+            row = getattr(store, index).get(key)
+            if row is not None:
+                return store, row
+        raise KeyError(key)
+
+    def lookup_node(self, data: object) -> Node:
+        data = self.aliases.get(id(data), data)
+        store, row = self._find("containers", id(data))
+        return store._node(row)
+
+    def lookup_kvpair(self, data: object, k: object) -> t.Tuple[Node, Node]:
+        # for sequence, (item, item) is returned
+        data = self.aliases.get(id(data), data)
+        store, row = self._find("members", (id(data), k))
+        if isinstance(data, list):
+            node = store._node(row)
+            return node, node
+        return store._node(row - 1), store._node(row)
 
 
 _SysExcInfoType = t.Union[
@@ -1,7 +1,17 @@
 import typing as t
-import jsonschema
 
-ValidationError = jsonschema.ValidationError  # noqa
+if t.TYPE_CHECKING:
+    from jsonschema import ValidationError
+
+
+def __getattr__(name: str) -> t.Any:
+    # jsonschema is imported lazily (slow to import, and not needed without schema)
+    if name == "ValidationError":
+        import jsonschema
+
+        globals()[name] = jsonschema.ValidationError
+        return jsonschema.ValidationError
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class LintError(Exception):
@@ -28,8 +38,18 @@ class ResolutionError(LintError):
     pass
 
 
+class CircularReferenceError(ResolutionError):
+    # inlining $ref makes the document infinite
+    pass
+
+
 class MessageError(Exception):
     pass
 
 
-Error = t.Union[LintError, ValidationError, MessageError]
+class OfflineError(Exception):
+    # remote resource is required, but it is not cached
+    pass
+
+
+Error = t.Union[LintError, "ValidationError", MessageError]
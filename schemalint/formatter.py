@@ -3,18 +3,19 @@ import os.path
 import logging
 import json
 
-from yaml.error import Mark
 from typing_extensions import TypedDict, Protocol, Literal
 
-from schemalint.entity import ErrorEvent, Lookup, Context
+from schemalint.entity import ErrorEvent, Lookup, Context, Node, Mark
 from schemalint.errors import (
     ParseError,
     LintError,
     ResolutionError,
-    ValidationError,
     MessageError,
 )
 
+if t.TYPE_CHECKING:
+    from jsonschema import ValidationError
+
 
 logger = logging.getLogger(__name__)
 
@@ -72,31 +73,38 @@ class Detector:
         else:
             return "WARNING"
 
-    def detect_loadning_start_point(self, err: LintError) -> (Mark, Mark):
+    def detect_loadning_start_point(self, err: LintError) -> t.Tuple[Mark, Mark]:
         if err.data is None:
             return self.detect_error_point(err)
-        map_node = self.lookup.lookup_node(err.data)
-        knode, vnode = self.lookup_kvpair(map_node, err.path[-1])
+        knode, vnode = self.lookup.lookup_kvpair(err.data, err.path[-1])
         return knode.start_mark, vnode.end_mark
 
-    def detect_error_point(self, err: LintError) -> Mark:
+    def detect_error_point(self, err: LintError) -> t.Tuple[Mark, Mark]:
+        # the marks of the error are not modified (the mark of libyaml is readonly)
         mark = getattr(err.inner, "context_mark")
-        import copy
-
-        if mark is None:
+        if mark is not None:
+            line = mark.line
+        else:
             mark = getattr(err.inner, "problem_mark")
-            mark.line -= 1  # xxx
-
-        start_mark = copy.deepcopy(mark)
-        start_mark.column = 0
-        end_mark = copy.deepcopy(mark)
-        end_mark.column = -1
-        return (start_mark, end_mark)
-
-    def lookup_kvpair(self, node, k):  # todo: rename
-        for knode, vnode in node.value:
-            if knode.value == k:
-                return knode, vnode
+            line = mark.line - 1  # xxx
+        return (Mark(mark.name, line, 0), Mark(mark.name, line, -1))
+
+    def detect_instance_node(self, err: "ValidationError", *, doc: t.Any) -> Node:
+        instance = err.instance
+        if isinstance(instance, (dict, list)):
+            return self.lookup.lookup_node(instance)
+
+        # scalar is found via its parent container (id() of scalars is not unique)
+        path = list(err.absolute_path)
+        if not path or doc is None:
+            # the root, or the document is unknown (not passed the context), the top of the file
+            mark = Mark(self.filename, 0, 0)
+            return Node(start_mark=mark, end_mark=mark)
+        parent = doc
+        for k in path[:-1]:
+            parent = parent[k]
+        _, vnode = self.lookup.lookup_kvpair(parent, path[-1])
+        return vnode
 
 
 class Formatter:
@@ -104,26 +112,48 @@ class Formatter:
     layout: Layout
 
     def __init__(
-        self, filename: str, *, detector: Detector, layout: t.Optional[Layout] = None
+        self,
+        filename: str,
+        *,
+        detector: Detector,
+        layout: t.Optional[Layout] = None,
+        cwd: t.Optional[str] = None,
     ):
         self.filename = filename
         self.detector = detector
         self.layout = layout or LTSVLayout()
+        self._cwd = cwd or os.getcwd()  # the filenames are relative to it
+        self._relpaths: t.Dict[str, str] = {}
+
+    def relpath(self, name: str) -> str:
+        # memoized (the number of files is small, but the number of errors is not)
+        path = self._relpaths.get(name)
+        if path is None:
+            path = self._relpaths[name] = os.path.relpath(name, start=self._cwd)
+        return path
 
     def format(self, ev: ErrorEvent) -> str:
+        return self.layout.layout(self.to_dict(ev))
+
+    def to_dict(self, ev: ErrorEvent) -> OutputDict:
         err = ev.error
         if isinstance(err, ParseError):
-            return self.format_parse_error(err)
+            return self.build_parse_error(err)
         elif isinstance(err, ResolutionError):
-            return self.format_resolution_error(err)
-        elif isinstance(err, ValidationError):
-            return self.format_validation_error(err)
+            return self.build_resolution_error(err)
         elif isinstance(err, MessageError):
-            return self.format_message_error(err, context=ev.context)
-        else:
-            raise err
+            return self.build_message_error(err, context=ev.context)
+
+        from schemalint.errors import ValidationError  # lazy (jsonschema)
+
+        if isinstance(err, ValidationError):
+            return self.build_validation_error(err, context=ev.context)
+        raise err
 
     def format_parse_error(self, err: ParseError) -> str:
+        return self.layout.layout(self.build_parse_error(err))
+
+    def build_parse_error(self, err: ParseError) -> OutputDict:
         status = self.detector.detect_status(err.history[-1])
         if hasattr(err.inner, "problem"):
             message = f"{err.inner.problem} ({err.inner.context})"
@@ -131,75 +161,74 @@ class Formatter:
             message = repr(err.inner)
 
         start_mark, end_mark = self.detector.detect_loadning_start_point(err)
-        filename = os.path.relpath(start_mark.name, start=".")
+        filename = self.relpath(start_mark.name)
 
-        where = [os.path.relpath(name) for name in err.history]
+        where = [self.relpath(name) for name in err.history]
         where[0] = f"{where[0]}:{start_mark.line+1}"
         if self.detector.has_error_point(err):
             where[-1] = f"{where[-1]}:{err.inner.problem_mark.line+1}"
 
-        return self.layout.layout(
-            OutputDict(
-                status=status,
-                errortype=err.__class__.__name__,
-                filename=filename,
-                start=PositionDict(
-                    line=start_mark.line + 1, character=start_mark.column
-                ),
-                end=PositionDict(line=end_mark.line + 1, character=end_mark.column),
-                message=message,
-                where=where,
-            )
+        return OutputDict(
+            status=status,
+            errortype=err.__class__.__name__,
+            filename=filename,
+            start=PositionDict(line=start_mark.line + 1, character=start_mark.column),
+            end=PositionDict(line=end_mark.line + 1, character=end_mark.column),
+            message=message,
+            where=where,
         )
 
     def format_resolution_error(self, err: ResolutionError) -> str:
+        return self.layout.layout(self.build_resolution_error(err))
+
+    def build_resolution_error(self, err: ResolutionError) -> OutputDict:
         start_mark, end_mark = self.detector.detect_loadning_start_point(err)
-        filename = os.path.relpath(start_mark.name, start=".")
+        filename = self.relpath(start_mark.name)
         status = self.detector.detect_status(err.history[-1])
         message = repr(err.inner)
 
-        where = [os.path.relpath(name) for name in err.history]
+        where = [self.relpath(name) for name in err.history]
         where[0] = f"{where[0]}:{start_mark.line+1}"
         if self.detector.has_error_point(err):
             where[-1] = f"{where[-1]}:{err.inner.problem_mark.line+1}"
 
-        return self.layout.layout(
-            OutputDict(
-                status=status,
-                errortype=err.__class__.__name__,
-                filename=filename,
-                start=PositionDict(
-                    line=start_mark.line + 1, character=start_mark.column
-                ),
-                end=PositionDict(line=end_mark.line + 1, character=end_mark.column),
-                message=message,
-                where=where,
-            )
+        return OutputDict(
+            status=status,
+            errortype=err.__class__.__name__,
+            filename=filename,
+            start=PositionDict(line=start_mark.line + 1, character=start_mark.column),
+            end=PositionDict(line=end_mark.line + 1, character=end_mark.column),
+            message=message,
+            where=where,
         )
 
-    def format_validation_error(self, err: ValidationError) -> str:
+    def format_validation_error(
+        self, err: "ValidationError", *, context: t.Optional[Context] = None
+    ) -> str:
+        return self.layout.layout(self.build_validation_error(err, context=context))
+
+    def build_validation_error(
+        self, err: "ValidationError", *, context: t.Optional[Context] = None
+    ) -> OutputDict:
         status = "ERROR"
         message = f"{err.message} (validator={err.validator})"
-        node = self.detector.lookup.lookup_node(err.instance)  # xxx
+        node = self.detector.detect_instance_node(
+            err, doc=context.doc if context else None
+        )
 
         start_mark, end_mark = node.start_mark, node.end_mark
 
-        filename = os.path.relpath(start_mark.name, start=".")
-        where = [os.path.relpath(filename)]
-        where[0] = f"{where[0]}:{start_mark.line+1}"
-
-        return self.layout.layout(
-            OutputDict(
-                status=status,
-                errortype=err.__class__.__name__,
-                filename=filename,
-                start=PositionDict(
-                    line=start_mark.line + 1, character=start_mark.column
-                ),
-                end=PositionDict(line=end_mark.line + 1, character=end_mark.column),
-                message=message,
-                where=where,
-            )
+        filename = self.relpath(start_mark.name)
+        where = [f"{filename}:{start_mark.line+1}"]
+
+        return OutputDict(
+            status=status,
+            errortype=err.__class__.__name__,
+            filename=filename,
+            start=PositionDict(line=start_mark.line + 1, character=start_mark.column),
+            end=PositionDict(line=end_mark.line + 1, character=end_mark.column),
+            message=message,
+            where=where,
         )
 
     def format_message_error(
@@ -209,19 +238,28 @@ class Formatter:
         context: t.Optional[Context],
         status: StatusType = "INFO",
     ) -> str:
+        return self.layout.layout(
+            self.build_message_error(err, context=context, status=status)
+        )
+
+    def build_message_error(
+        self,
+        err: MessageError,
+        *,
+        context: t.Optional[Context],
+        status: StatusType = "INFO",
+    ) -> OutputDict:
         message = err.args[0]
-        filename = os.path.relpath(context.filename if context else self.filename)
+        filename = self.relpath(context.filename if context else self.filename)
         where = [filename]
-        return self.layout.layout(
-            OutputDict(
-                status=status,
-                errortype=err.__class__.__name__,
-                filename=filename,
-                start=PositionDict(line=1, character=1),
-                end=PositionDict(line=1, character=-1),
-                message=message,
-                where=where,
-            )
+        return OutputDict(
+            status=status,
+            errortype=err.__class__.__name__,
+            filename=filename,
+            start=PositionDict(line=1, character=1),
+            end=PositionDict(line=1, character=-1),
+            message=message,
+            where=where,
         )
 
 
@@ -229,11 +267,15 @@ OutputType = Literal["ltsv", "json"]
 
 
 def get_formatter(
-    filename: str, *, lookup: Lookup, output_type: OutputType
+    filename: str,
+    *,
+    lookup: Lookup,
+    output_type: OutputType,
+    cwd: t.Optional[str] = None,
 ) -> Formatter:
     detector = Detector(filename, lookup=lookup)
     layout = get_layout(output_type)
-    return Formatter(filename, detector=detector, layout=layout)
+    return Formatter(filename, detector=detector, layout=layout, cwd=cwd)
 
 
 def get_layout(output_type: OutputType) -> Layout:
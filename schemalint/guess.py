@@ -8,22 +8,42 @@ from . import management
 pkglogger = logger = logging.getLogger(__name__)
 
 
+# (filename, directory) -> the found file (or None), directories are checked once
+_found: t.Dict[t.Tuple[str, str], t.Optional[str]] = {}
+
+
 def _find_init_file(
     filename: str, *, current: t.Optional[str] = None
 ) -> t.Optional[str]:
-    def iter_parents(filename, current=None):
-        current = os.path.normpath(os.path.abspath(current or os.getcwd()))
-        while True:
-            yield os.path.join(current, filename)
-            if current == "/":
-                break
-            current, dropped = os.path.split(current)
+    current = os.path.normpath(os.path.abspath(current or os.getcwd()))
+    visited = []
+    found = None
+    while True:
+        key = (filename, current)
+        if key in _found:
+            found = _found[key]
+            break
+        visited.append(key)
 
-    for path in iter_parents(filename, current):
+        path = os.path.join(current, filename)
         logger.debug("check %s", path)
         if os.path.exists(path):
-            return path
-    return None
+            found = path
+            break
+        parent = os.path.dirname(current)
+        if parent == current:  # root
+            break
+        current = parent
+
+    # memoizing negative lookups too (the ancestors' result is shared)
+    for key in visited:
+        _found[key] = found
+    return found
+
+
+def clear_cache() -> None:
+    _found.clear()
+    management.clear_cache()
 
 
 def guess_schema(
@@ -1,31 +1,60 @@
+import typing as t
+import io
+import os.path
+import errno
 import logging
 import yaml
-from collections import ChainMap
 
-from dictknife import DictWalker, Accessor
-from dictknife.jsonknife.accessor import StackedAccessor, is_ref
-from dictknife.langhelpers import make_dict
 from dictknife import jsonknife
 
-from schemalint.errors import ParseError, ResolutionError
+from schemalint.errors import ParseError
+from schemalint import profiling
 from . import _yaml
+from . import _json
+from ._fragment import FragmentCache, Fragment, stat_key, fragments as _fragments
+from ._fragment import roots as _roots
+from ._resolve import Resolution
 
 logger = logging.getLogger(__name__)
 
 
+class _ErrorBudgetExceeded(Exception):
+    pass
+
+
 class Loader:
-    def __init__(self, resolver, *, store: _yaml.NodeStore):
+    def __init__(
+        self,
+        resolver,
+        *,
+        store: _yaml.NodeStore,
+        max_errors: t.Optional[int] = None,
+    ):
         self.resolver = resolver
-        self.accessor = StackedAccessor(resolver)
-        self.accessing = Accessor()
-        self.ref_walking = DictWalker([is_ref])
         self.errors = []
         self.store = store
+        self.max_errors = max_errors  # stop walking, when the errors reach this
+
+    @property
+    def exhausted(self) -> bool:
+        return self.max_errors is not None and len(self.errors) >= self.max_errors
+
+    def _add_error(self, err) -> None:
+        self.errors.append(err)
+        if self.exhausted:
+            raise _ErrorBudgetExceeded()
 
     @property
     def filename(self) -> str:
         return self.resolver.filename
 
+    @property
+    def filenames(self) -> t.List[str]:
+        # the root file and the files referenced via $ref (including not found files)
+        filenames = [self.resolver.filename]
+        filenames.extend(k for k in self.resolver.cache if k != filenames[0])
+        return filenames
+
     def load(self, doc=None, resolver=None):
         if not doc and doc is not None:
             return doc
@@ -37,76 +66,156 @@ class Loader:
                 self.errors.append(ParseError(e, history=[resolver.filename]))
             if doc is None:
                 doc = {}
-        doc, _ = self._load(doc, resolver=resolver, seen={})
+        if doc is None:  # empty document
+            return doc
+        if self.exhausted:
+            return doc
+        with profiling.get_profile().phase("resolve"):
+            resolution = Resolution(store=self.store, on_error=self._add_error)
+            try:
+                doc = resolution.resolve(doc, resolver=resolver)
+            except _ErrorBudgetExceeded:
+                logger.debug("too many errors, stop loading %s", resolver.filename)
         return doc
 
-    def _load(self, doc, *, resolver, seen: dict):
-        if "$ref" in doc:
-            original = self.accessor.access(doc["$ref"])
-            new_doc, _ = self._load(
-                original, resolver=self.accessor.resolver, seen=seen
-            )
-            return new_doc, self.accessor.pop_stack()
-        else:
-            for path, sd in self.ref_walking.iterate(doc):
-                try:
-                    uid = id(sd)
-                    if uid in seen:
-                        continue
-
-                    seen[uid] = sd
-                    new_sd, sresolver = self._load(sd, resolver=resolver, seen=seen)
-                    if resolver.filename != sresolver.filename:
-                        container = self.accessing.access(doc, path[:-1])
-                        if not hasattr(container, "parents"):
-                            container = ChainMap(make_dict(), container)
-                            container.update(new_sd)
-                        self.accessing.assign(doc, path[:-1], container)
-                except FileNotFoundError as e:
-                    self.errors.append(
-                        ResolutionError(
-                            e,
-                            path=path[:],
-                            data=sd,
-                            history=[r.filename for r in self.accessor.stack[:-1]],
-                        )
-                    )
-                except KeyError as e:
-                    self.errors.append(
-                        ResolutionError(
-                            e,
-                            path=path[:],
-                            data=sd,
-                            history=[r.filename for r in self.accessor.stack],
-                        )
-                    )
-                except _yaml.MarkedYAMLError as e:
-                    if e.problem_mark is not None:
-                        self.errors.append(
-                            ParseError(
-                                e,
-                                path=path[:],
-                                data=sd,
-                                history=[r.filename for r in self.accessor.stack],
-                            )
-                        )
-            return doc, resolver
-
 
 class _DictknifeLoaderAdapter:
-    def __init__(self, yamlloader_factory):
+    def __init__(
+        self,
+        yamlloader_factory,
+        *,
+        overlay: t.Optional[t.Mapping[str, t.Union[str, bytes]]] = None,
+        overlay_only: bool = False,
+        fragments: t.Optional[FragmentCache] = None,
+        root: t.Optional[str] = None,
+    ):
         self.yamlloader_factory = yamlloader_factory
+        self.overlay = overlay  # filename -> content (e.g. unsaved buffers)
+        self.overlay_only = overlay_only  # never reading the files on disk
+        self.fragments = fragments
+        self.root = root  # not cached in fragments (only the $ref targets are)
 
     def loadfile(self, filename, *, format=None):
-        with open(filename) as rf:
-            return yaml.load(rf, Loader=self.yamlloader_factory)
+        with profiling.get_profile().phase("parse"):
+            return self._loadfile(filename)
+
+    def _loadfile(self, filename):
+        profile = profiling.get_profile()
+        if self.overlay is not None and filename in self.overlay:
+            content = self.overlay[filename]
+            rf = (
+                io.BytesIO(content)
+                if isinstance(content, bytes)
+                else io.StringIO(content)
+            )
+            rf.name = filename  # for Mark.name
+            profile.count("bytes_read", len(content))
+            return self._parse(rf, factory=self.yamlloader_factory)
+        if self.overlay_only:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), filename)
+        if self.fragments is None:
+            with open(filename) as rf:
+                profile.count("files_opened")
+                profile.count("bytes_read", os.fstat(rf.fileno()).st_size)
+                return self._parse(rf, factory=self.yamlloader_factory)
+
+        realpath, key = stat_key(filename)
+        fragments = _roots if filename == self.root else self.fragments
+        fragment = fragments.get(realpath, key)
+        if fragment is None:
+            store = _yaml.NodeStore()
+            factory = _yaml.YAMLLoaderFactory(
+                self.yamlloader_factory.loader_class, store=store
+            )
+            with open(filename) as rf:
+                profile.count("files_opened")
+                profile.count("bytes_read", key[-1])
+                doc = self._parse(rf, factory=factory)
+            fragment = fragments.set(
+                realpath, key, Fragment(doc, store=store, size=key[-1])
+            )
+        else:
+            logger.debug("fragment cache, hit %s", filename)
+            profile.count("fragment_hits")
+        return fragment.attach(self.yamlloader_factory.store)
+
+    def _parse(self, rf: t.IO[t.Any], *, factory: _yaml.YAMLLoaderFactory) -> t.Any:
+        # json (fast path), if the file looks like json. otherwise (or if it is not valid json), yaml
+        if _json.sniff(rf, name=rf.name):
+            data = rf.read()
+            try:
+                return _json.load(data, name=rf.name, store=factory.store)
+            except (ValueError, RecursionError) as e:  # e.g. JSONDecodeError
+                logger.debug("json, fallback to yaml %s (%r)", rf.name, e)
+            rf.seek(0)
+        return yaml.load(rf, Loader=factory)
 
 
-def get_loader(filename: str) -> Loader:
+def get_loader(
+    filename: str,
+    *,
+    overlay: t.Optional[t.Mapping[str, t.Union[str, bytes]]] = None,
+    overlay_only: bool = False,
+    fragments: t.Optional[FragmentCache] = _fragments,
+    loader_class: t.Optional[t.Type[t.Any]] = None,
+    max_errors: t.Optional[int] = None,
+) -> Loader:
     store = _yaml.NodeStore()
-    yaml_loader_factory = _yaml.YAMLLoaderFactory(_yaml.YAMLLoader, store=store)
+    yaml_loader_factory = _yaml.YAMLLoaderFactory(
+        loader_class or _yaml.DefaultYAMLLoader, store=store
+    )
+
+    adapter = _DictknifeLoaderAdapter(
+        yaml_loader_factory,
+        overlay=overlay,
+        overlay_only=overlay_only,
+        fragments=fragments,
+        root=os.path.normpath(os.path.abspath(filename)),
+    )
+    resolver = jsonknife.get_resolver(filename, loader=adapter)
+    return Loader(resolver, store=store, max_errors=max_errors)
+
 
-    resolver = jsonknife.get_resolver(
-        filename, loader=_DictknifeLoaderAdapter(yaml_loader_factory)
+def iterate_loaders(
+    filename: str,
+    *,
+    store: t.Optional[_yaml.NodeStore] = None,
+    fragments: t.Optional[FragmentCache] = _fragments,
+    loader_class: t.Optional[t.Type[t.Any]] = None,
+    max_errors: t.Optional[int] = None,
+) -> t.Iterator[Loader]:
+    # for multi-document yaml, a loader per document (the store is shared and cleared for each document)
+    store = store or _yaml.NodeStore()
+    yaml_loader_factory = _yaml.YAMLLoaderFactory(
+        loader_class or _yaml.DefaultYAMLLoader, store=store
     )
-    return Loader(resolver, store=store)
+    filename = os.path.normpath(os.path.abspath(filename))
+    adapter = _DictknifeLoaderAdapter(
+        yaml_loader_factory, fragments=fragments, root=filename
+    )
+
+    profile = profiling.get_profile()
+    with open(filename) as rf:
+        profile.count("files_opened")
+        profile.count("bytes_read", os.fstat(rf.fileno()).st_size)
+        yaml_loader = yaml_loader_factory(rf)
+        try:
+            while True:
+                store.clear()
+                resolver = jsonknife.get_resolver(filename, loader=adapter)
+                loader = Loader(resolver, store=store, max_errors=max_errors)
+                try:
+                    with profile.phase("parse"):
+                        if not yaml_loader.check_data():
+                            return
+                        resolver.doc = yaml_loader.get_data()
+                except _yaml.MarkedYAMLError as e:
+                    # the rest of the stream cannot be parsed
+                    if e.problem_mark is not None:
+                        loader.errors.append(ParseError(e, history=[filename]))
+                    resolver.doc = None
+                    yield loader
+                    return
+                yield loader
+        finally:
+            yaml_loader.dispose()
@@ -0,0 +1,82 @@
+import typing as t
+import os
+import os.path
+import logging
+import threading
+from collections import OrderedDict
+
+from schemalint.entity import NodeStore
+
+logger = logging.getLogger(__name__)
+
+FragmentKey = t.Tuple[int, int, int, int]  # (st_dev, st_ino, st_mtime_ns, st_size)
+
+
+class Fragment:
+    def __init__(self, doc: t.Any, *, store: NodeStore, size: int) -> None:
+        self.doc = doc
+        self.store = store  # positions of doc
+        self.size = size
+
+    def attach(self, store: NodeStore) -> t.Any:
+        # the doc is shared by loaders (Loader doesn't modify it, containers including $ref are copied)
+        store.attach(self.store)
+        return self.doc
+
+
+def stat_key(filename: str) -> t.Tuple[str, FragmentKey]:
+    # the same file reached through the different relative paths (or symlinks) is the same entry
+    st = os.stat(filename)
+    key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+    return os.path.realpath(filename), key
+
+
+class FragmentCache:
+    # parsed files shared by loaders in a process, evicted in LRU order
+    def __init__(self, *, maxsize: int = 256, maxbytes: int = 64 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.entries: t.Dict[str, t.Tuple[FragmentKey, Fragment]] = OrderedDict()
+        self._lock = threading.RLock()  # shared by threads (e.g. api.Linter, lsp)
+
+    def get(self, realpath: str, key: FragmentKey) -> t.Optional[Fragment]:
+        with self._lock:
+            entry = self.entries.get(realpath)
+            if entry is None:
+                return None
+            if entry[0] != key:  # modified
+                self._remove(realpath)
+                return None
+            self.entries.move_to_end(realpath)
+            return entry[1]
+
+    def set(self, realpath: str, key: FragmentKey, fragment: Fragment) -> Fragment:
+        with self._lock:
+            if realpath in self.entries:
+                self._remove(realpath)
+            if fragment.size > self.maxbytes:
+                return fragment
+            self.entries[realpath] = (key, fragment)
+            self.nbytes += fragment.size
+            while len(self.entries) > self.maxsize or self.nbytes > self.maxbytes:
+                evicted, (_, evicted_fragment) = self.entries.popitem(last=False)
+                self.nbytes -= evicted_fragment.size
+                logger.debug("fragment cache, evict %s", evicted)
+            return fragment
+
+    def _remove(self, realpath: str) -> None:
+        _, fragment = self.entries.pop(realpath)
+        self.nbytes -= fragment.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+
+# the $ref targets (shared by the roots)
+fragments = FragmentCache()
+# the last root files, not evicting the $ref targets. the root is linted once,
+# kept only until the guess reads it (e.g. the version, see: management._get_version)
+roots = FragmentCache(maxsize=4)
@@ -0,0 +1,202 @@
+import typing as t
+import re
+import json
+import os.path
+from array import array
+from bisect import bisect_left
+from itertools import repeat
+from operator import sub
+from json.decoder import JSONDecodeError, WHITESPACE, scanstring
+
+from schemalint.entity import NodeStore
+from schemalint import profiling
+
+# fast path for json. the scalars are parsed by the scanner of the json module (C, if available),
+# the containers are walked here, only for recording the offsets of their members.
+# the offsets are converted to (line, column) at once, after parsing.
+#
+# - the positions are the same as the yaml loader's (the columns are counted by characters)
+# - if the parsing is failed, the caller falls back to yaml (yaml is a superset of json)
+
+EXTENSIONS = (".json",)
+_SNIFF_SIZE = 4096
+_WS = " \t\n\r"
+_NEWLINE = re.compile("\r\n|[\n\r\x85\u2028\u2029]")  # line breaks of yaml
+_BOM = "﻿"
+
+
+_YAML_FLOAT = re.compile(r"-?[0-9]+\.[0-9]*(?:[eE][-+][0-9]+)?\Z")
+
+
+# the values which are not the same in yaml, are rejected (falling back to yaml)
+def _reject_constant(name: str) -> t.Any:
+    # NaN, Infinity and -Infinity are not json ('NaN' is a string in yaml)
+    raise ValueError(f"{name} is not allowed")
+
+
+def _parse_float(s: str) -> float:
+    # yaml (1.1) reads 1e5 and 1.5e10 as strings (a dot and the sign of the exponent are required)
+    if _YAML_FLOAT.match(s) is None:
+        raise ValueError(f"{s} is not a float in yaml")
+    return float(s)
+
+
+_decoder = json.JSONDecoder(parse_constant=_reject_constant, parse_float=_parse_float)
+
+
+def sniff(rf: t.IO[t.Any], *, name: str) -> bool:
+    # by extension, or the content starts with "{" or "[" (the stream is rewound)
+    if os.path.splitext(name)[1].lower() in EXTENSIONS:
+        return True
+    head = rf.read(_SNIFF_SIZE)
+    rf.seek(0)
+    if isinstance(head, bytes):
+        return head.lstrip(b" \t\n\r\xef\xbb\xbf")[:1] in (b"{", b"[")
+    return head.lstrip(_WS + _BOM)[:1] in ("{", "[")
+
+
+# (container, first row, keys (None for list))
+_Container = t.Tuple[t.Any, int, t.Optional[t.List[str]]]
+
+
+def _parse(s: str) -> t.Tuple[t.Any, t.List[int], t.List[_Container]]:
+    # almost the same as json.scanner.py_make_scanner(), but the offsets are recorded.
+    # (start, end) of the container, and then (start, end) of its members
+    offsets: t.List[int] = []
+    containers: t.List[_Container] = []
+    memo: t.Dict[str, str] = {}  # the keys are shared
+    scan_once = _decoder.scan_once
+    match_ws = WHITESPACE.match
+
+    def _value(idx: int) -> t.Tuple[t.Any, int]:
+        c = s[idx]
+        if c == "{":
+            return _object(idx)
+        elif c == "[":
+            return _array(idx)
+        try:
+            return scan_once(s, idx)
+        except StopIteration as e:
+            raise JSONDecodeError("Expecting value", s, e.value) from None
+
+    def _object(start: int) -> t.Tuple[t.Any, int]:
+        r: t.Dict[str, t.Any] = {}
+        keys: t.List[str] = []
+        offs = [start, start]
+        idx = start + 1
+        if s[idx] in _WS:
+            idx = match_ws(s, idx).end()
+        if s[idx] == "}":
+            idx += 1
+        else:
+            while True:
+                if s[idx] != '"':
+                    raise JSONDecodeError(
+                        "Expecting property name enclosed in double quotes", s, idx
+                    )
+                k, end = scanstring(s, idx + 1, True)
+                k = memo.setdefault(k, k)
+                offs += (idx, end)
+                idx = end
+                if s[idx] != ":":
+                    idx = match_ws(s, idx).end()
+                    if s[idx] != ":":
+                        raise JSONDecodeError("Expecting ':' delimiter", s, idx)
+                idx += 1
+                if s[idx] in _WS:
+                    idx = match_ws(s, idx).end()
+                r[k], end = _value(idx)
+                keys.append(k)
+                offs += (idx, end)
+                idx = end
+                if s[idx] in _WS:
+                    idx = match_ws(s, idx).end()
+                c = s[idx]
+                idx += 1
+                if c == "}":
+                    break
+                elif c != ",":
+                    raise JSONDecodeError("Expecting ',' delimiter", s, idx - 1)
+                if s[idx] in _WS:
+                    idx = match_ws(s, idx).end()
+        offs[1] = idx
+        containers.append((r, len(offsets) >> 1, keys))
+        offsets.extend(offs)
+        return r, idx
+
+    def _array(start: int) -> t.Tuple[t.Any, int]:
+        r: t.List[t.Any] = []
+        offs = [start, start]
+        idx = start + 1
+        if s[idx] in _WS:
+            idx = match_ws(s, idx).end()
+        if s[idx] == "]":
+            idx += 1
+        else:
+            while True:
+                v, end = _value(idx)
+                r.append(v)
+                offs += (idx, end)
+                idx = end
+                if s[idx] in _WS:
+                    idx = match_ws(s, idx).end()
+                c = s[idx]
+                idx += 1
+                if c == "]":
+                    break
+                elif c != ",":
+                    raise JSONDecodeError("Expecting ',' delimiter", s, idx - 1)
+                if s[idx] in _WS:
+                    idx = match_ws(s, idx).end()
+        offs[1] = idx
+        containers.append((r, len(offsets) >> 1, None))
+        offsets.extend(offs)
+        return r, idx
+
+    idx = match_ws(s, 0).end()
+    try:
+        doc, idx = _value(idx)
+    except IndexError:
+        raise JSONDecodeError("Expecting value", s, len(s)) from None
+    idx = match_ws(s, idx).end()
+    if idx != len(s):
+        raise JSONDecodeError("Extra data", s, idx)
+    return doc, offsets, containers
+
+
+def _marks(s: str, offsets: t.List[int]) -> array:
+    # offset -> (line, column), flattened
+    starts = [0]
+    starts.extend(m.end() for m in _NEWLINE.finditer(s))
+    newlines = [i - 1 for i in starts[1:]]
+    lines = array("l", map(bisect_left, repeat(newlines), offsets))
+    columns = array("l", map(sub, offsets, map(starts.__getitem__, lines)))
+    marks = array("l", [0]) * (2 * len(offsets))
+    marks[0::2] = lines
+    marks[1::2] = columns
+    return marks
+
+
+def load(data: t.Union[bytes, str], *, name: str, store: NodeStore) -> t.Any:
+    # ValueError is raised, if data is not json (JSONDecodeError, or UnicodeDecodeError)
+    s = data.decode(json.detect_encoding(data)) if isinstance(data, bytes) else data
+    if s.startswith(_BOM):
+        s = s[1:]  # not counted in yaml's mark, too
+    doc, offsets, containers = _parse(s)
+
+    base = store.add_rows(name, _marks(s, offsets))
+    members = store.members
+    for r, row, keys in containers:
+        row += base
+        uid = id(r)
+        store.containers[uid] = row
+        if keys is None:
+            n = len(r)
+            members.update(zip(zip(repeat(uid), range(n)), range(row + 1, row + 1 + n)))
+        else:
+            n = len(keys)
+            members.update(
+                zip(zip(repeat(uid), keys), range(row + 2, row + 2 * n + 2, 2))
+            )
+    profiling.get_profile().count("nodes_constructed", len(offsets) >> 1)
+    return doc
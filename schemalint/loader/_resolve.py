@@ -0,0 +1,226 @@
+import typing as t
+import logging
+
+from dictknife.jsonknife.accessor import access_by_json_pointer
+
+from schemalint.entity import NodeStore
+from schemalint.errors import (
+    LintError,
+    ParseError,
+    ResolutionError,
+    CircularReferenceError,
+)
+from schemalint import profiling
+from . import _yaml
+
+logger = logging.getLogger(__name__)
+
+
+def is_ref(data: t.Any) -> bool:
+    return isinstance(data, dict) and isinstance(data.get("$ref"), str)
+
+
+class _Circular(Exception):
+    pass
+
+
+def _resolve_pointer(resolver, ref: str) -> t.Tuple[t.Any, str]:
+    # almost resolver.resolve(), but the resolver of the file is shared (not created per history)
+    if ref.startswith("#"):
+        return resolver, ref[1:]
+    if "#" not in ref:
+        ref = ref + "#"
+    fullpath, filepath, pointer = resolver.resolve_pathset(ref)
+    sresolver = resolver.cache.get(fullpath)
+    if sresolver is None:
+        sresolver = resolver.resolve_subresolver(fullpath, rawfilename=filepath)
+    return sresolver, pointer
+
+
+class Resolution:
+    # resolving $ref in one pass, without modifying the loaded documents (they are shared).
+    #
+    # - $ref to the other file is replaced with its target (resolved once, and shared)
+    # - $ref in the same file is kept as is (its target is visited, for the errors)
+    # - the containers including replaced $ref are copied (copy on write),
+    #   the copies are registered in the store as the aliases of the originals
+    def __init__(
+        self, *, store: NodeStore, on_error: t.Callable[[LintError], None]
+    ) -> None:
+        self.store = store
+        self.on_error = on_error
+
+        self.resolved: t.Dict[int, t.Any] = {}  # id(container) -> resolved
+        self.active: t.Set[int] = set()  # id(container) on the walking
+        self.targets: t.Dict[
+            t.Tuple[str, str], t.Any
+        ] = {}  # (filename, pointer) -> target
+
+        # for error reporting
+        self.path: t.List[t.Any] = []  # path from the walking target
+        self.history: t.List[str] = []  # filenames of $ref chain
+
+    def resolve(self, doc: t.Any, *, resolver) -> t.Any:
+        self.history.append(resolver.filename)
+        try:
+            return self._walk(doc, resolver)
+        finally:
+            self.history.pop()
+
+    def _walk(self, data: t.Any, resolver) -> t.Any:
+        uid = id(data)
+        if uid in self.resolved:
+            return self.resolved[uid]
+        if uid in self.active:  # recursive structure (e.g. via local $ref)
+            return data
+
+        self.active.add(uid)
+        try:
+            if is_ref(data):
+                new = self._resolve_ref(data, resolver)
+            elif isinstance(data, dict):
+                new = data
+                for k, v in data.items():
+                    if not isinstance(v, (dict, list)):
+                        continue
+                    self.path.append(k)
+                    nv = self._walk(v, resolver)
+                    self.path.pop()
+                    if nv is not v:
+                        if new is data:
+                            new = self._copy(data)
+                        new[k] = nv
+            elif isinstance(data, list):
+                new = data
+                for i, v in enumerate(data):
+                    if not isinstance(v, (dict, list)):
+                        continue
+                    self.path.append(i)
+                    nv = self._walk(v, resolver)
+                    self.path.pop()
+                    if nv is not v:
+                        if new is data:
+                            new = self._copy(data)
+                        new[i] = nv
+            else:
+                return data
+        finally:
+            self.active.discard(uid)
+        self.resolved[uid] = new
+        return new
+
+    def _copy(self, data: t.Any) -> t.Any:
+        new = data.copy()
+        self.store.add_alias(new, data)
+        return new
+
+    def _resolve_ref(self, data: t.Dict[str, t.Any], resolver) -> t.Any:
+        profiling.get_profile().count("refs_resolved")
+        hops: t.List[str] = []  # filenames, for each step of the $ref chain
+        try:
+            target, sresolver = self._follow(data["$ref"], resolver, hops=hops)
+            is_local = hops[0] == resolver.filename
+            if not is_local and id(target) in self.active:
+                # inlining the ancestor, the document becomes infinite
+                raise _Circular(data["$ref"])
+        except _Circular as e:
+            self._error(
+                CircularReferenceError,
+                ValueError(f"circular reference, {' -> '.join(e.args)}"),
+                data=data,
+                history=[*self.history, *hops],
+            )
+            return data
+        except FileNotFoundError as e:
+            self._error(
+                ResolutionError, e, data=data, history=[*self.history, *hops[:-1]]
+            )
+            return data
+        except KeyError as e:
+            self._error(ResolutionError, e, data=data, history=[*self.history, *hops])
+            return data
+        except _yaml.MarkedYAMLError as e:
+            if e.problem_mark is not None:
+                self._error(ParseError, e, data=data, history=[*self.history, *hops])
+            return data
+
+        path, self.path = self.path, []
+        self.history.extend(hops)
+        try:
+            new = self._walk(target, sresolver)
+        finally:
+            del self.history[-len(hops) :]
+            self.path = path
+
+        if is_local:
+            return data
+        if len(data) > 1 and isinstance(new, dict):
+            return self._merge(data, new, resolver)
+        return new
+
+    def _follow(
+        self, ref: str, resolver, *, hops: t.List[str]
+    ) -> t.Tuple[t.Any, t.Any]:
+        # following the chain of $ref (e.g. {$ref: "#/a"} -> {$ref: "#/b"} -> <target>)
+        refs: t.List[str] = []
+        seen: t.Set[t.Tuple[str, str]] = set()
+        while True:
+            refs.append(ref)
+            sresolver, pointer = _resolve_pointer(resolver, ref)
+            hops.append(sresolver.filename)
+            key = (sresolver.filename, pointer)
+            if key in seen:
+                raise _Circular(*refs)
+            seen.add(key)
+
+            target = self.targets.get(key)
+            if target is None:
+                try:
+                    target = access_by_json_pointer(sresolver.doc, pointer)
+                except KeyError as e:
+                    raise sresolver.wrap_exception(e, where=resolver.name) from None
+                self.targets[key] = target
+            if not is_ref(target):
+                return target, sresolver
+            ref, resolver = target["$ref"], sresolver
+
+    def _merge(
+        self, data: t.Dict[str, t.Any], new: t.Dict[str, t.Any], resolver
+    ) -> t.Any:
+        # {$ref: <other file>, <k>: <v>}, the target is merged with the siblings of $ref
+        merged = {}
+        for k, v in data.items():
+            if k == "$ref":
+                continue
+            if isinstance(v, (dict, list)):
+                self.path.append(k)
+                v = self._walk(v, resolver)
+                self.path.pop()
+            merged[k] = v
+        merged.update(new)
+
+        store = self.store
+        try:
+            node = store.lookup_node(new)
+            store.add_container(merged, node.start_mark, node.end_mark)
+            for k in merged:
+                knode, vnode = store.lookup_kvpair(new if k in new else data, k)
+                store.add_kvpair(
+                    merged,
+                    k,
+                    (knode.start_mark, knode.end_mark),
+                    (vnode.start_mark, vnode.end_mark),
+                )
+        except KeyError:
+            logger.debug("position is not found, %r", data["$ref"])
+        return merged
+
+    def _error(
+        self,
+        cls: t.Type[LintError],
+        e: Exception,
+        *,
+        data: t.Dict[str, t.Any],
+        history: t.List[str],
+    ) -> None:
+        self.on_error(cls(e, path=[*self.path, "$ref"], data=data, history=history))
@@ -1,10 +1,17 @@
 import typing as t
+import logging
+import contextlib
 
 import yaml.loader as yamlloader
+import yaml.nodes as yamlnodes
 from yaml.error import MarkedYAMLError  # noqa:
+from yaml.scanner import ScannerError
 from dictknife.langhelpers import reify
 
 from schemalint.entity import NodeStore
+from schemalint import profiling
+
+logger = logging.getLogger(__name__)
 
 
 class Constructor(yamlloader.SafeConstructor):
@@ -12,20 +19,53 @@ class Constructor(yamlloader.SafeConstructor):
     def store(self):
         return NodeStore()
 
+    @reify
+    def _constructed(self) -> t.List[t.Tuple[yamlnodes.Node, object]]:
+        return []
+
     def construct_object(self, node, deep=False):
+        if node in self.constructed_objects:
+            return self.constructed_objects[node]
         r = super().construct_object(node, deep=deep)
-        self.store.add_node("construct_object", node, r)
+        if isinstance(r, (dict, list)):
+            self._constructed.append((node, r))
         return r
 
-    def construct_sequence(self, node, deep=False):
-        r = super().construct_sequence(node, deep=deep)
-        self.store.add_node("construct_sequence", node, r)
-        return r
+    # almost copy from pyyaml (recording positions, before clearing constructed_objects)
+    def construct_document(self, node):
+        data = self.construct_object(node)
+        while self.state_generators:
+            state_generators = self.state_generators
+            self.state_generators = []
+            for generator in state_generators:
+                for dummy in generator:
+                    pass
+        self.record_positions()
+        profiling.get_profile().count(
+            "nodes_constructed", len(self.constructed_objects)
+        )
+        self.constructed_objects = {}
+        self.recursive_objects = {}
+        self.deep_construct = False
+        return data
 
-    def construct_mapping(self, node, deep=False):
-        r = super().construct_mapping(node, deep=deep)
-        self.store.add_node("construct_mapping", node, r)
-        return r
+    def record_positions(self):
+        store = self.store
+        constructed = self.constructed_objects
+        for node, r in self._constructed:
+            store.add_container(r, node.start_mark, node.end_mark)
+            if isinstance(r, dict):
+                for knode, vnode in node.value:  # flattened (merge key is expanded)
+                    store.add_kvpair(
+                        r,
+                        constructed[knode],
+                        (knode.start_mark, knode.end_mark),
+                        (vnode.start_mark, vnode.end_mark),
+                    )
+            else:
+                for i, vnode in enumerate(node.value):
+                    store.add_item(r, i, (vnode.start_mark, vnode.end_mark))
+        self._constructed.clear()  # the node graph is released
 
 
 # almost copy from pyyaml
@@ -46,6 +86,87 @@ class YAMLLoader(
         yamlloader.Resolver.__init__(self)
 
 
+def _reparse(stream: t.Any, *, single: bool) -> None:
+    # the same error of pyyaml (the wording, e.g. "expected ',' or ']', but got ':'",
+    # libyaml's one does not have the found token). only when the error is raised
+    if not isinstance(stream, (str, bytes)):
+        if not getattr(stream, "seekable", lambda: False)():
+            return
+        stream.seek(0)
+    loader = YAMLLoader(stream)
+    try:
+        if single:
+            loader.get_single_node()
+        else:
+            while loader.check_node():
+                loader.get_node()
+    finally:
+        loader.dispose()
+
+
+@contextlib.contextmanager
+def _compatible_error(stream: t.Any, *, single: bool = False) -> t.Iterator[None]:
+    try:
+        yield
+    except MarkedYAMLError as e:
+        try:
+            _reparse(stream, single=single)
+        except MarkedYAMLError as pe:
+            raise pe from None
+        except Exception as pe:  # e.g. the stream is closed
+            logger.debug("yaml, cannot reparse (%r)", pe)
+
+        # for "found character that cannot start any token", libyaml sets the context mark
+        # (same as the problem mark), pyyaml does not. (Detector uses the context mark first)
+        cm, pm = e.context_mark, e.problem_mark
+        if (
+            isinstance(e, ScannerError)
+            and e.context == "while scanning for the next token"
+            and cm is not None
+            and pm is not None
+            and (cm.line, cm.column) == (pm.line, pm.column)
+        ):
+            e.context_mark = None
+        raise
+
+
+try:
+    from yaml._yaml import CParser
+except ImportError:  # pragma: no cover
+    CParser = None
+
+
+if CParser is not None:
+    # fast path, scanner, parser and composer are LibYAML (C)
+    class CYAMLLoader(CParser, Constructor, yamlloader.Resolver):
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            Constructor.__init__(self)
+            yamlloader.Resolver.__init__(self)
+            self._stream = stream  # for the error message
+
+        def check_node(self):
+            with _compatible_error(self._stream):
+                return CParser.check_node(self)
+
+        def get_node(self):
+            with _compatible_error(self._stream):
+                return CParser.get_node(self)
+
+        def get_single_node(self):
+            with _compatible_error(self._stream, single=True):
+                return CParser.get_single_node(self)
+
+        def dispose(self):
+            CParser.dispose(self)
+            self._stream = None
+
+    DefaultYAMLLoader: t.Type[t.Any] = CYAMLLoader
+else:  # pragma: no cover
+    CYAMLLoader = None
+    DefaultYAMLLoader = YAMLLoader
+
+
 class YAMLLoaderFactory:
     def __init__(
         self,
@@ -0,0 +1,392 @@
+import typing as t
+import sys
+import os.path
+import json
+import time
+import queue
+import logging
+import threading
+import urllib.parse
+import pathlib
+
+from schemalint import streams
+from schemalint import guess
+from schemalint import remote
+from schemalint.entity import LoggerWithCollectMessage
+from schemalint.errors import MessageError
+from schemalint.formatter import get_formatter, OutputDict, StatusType
+from schemalint.loader import get_loader
+from schemalint.deps import schema_files
+from schemalint.validator import get_validator, get_registry, load_validator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE = 0.15  # seconds
+
+# https://microsoft.github.io/language-server-protocol/specification#diagnostic
+_SEVERITY: t.Dict[StatusType, int] = {"ERROR": 1, "WARNING": 2, "INFO": 3}
+
+
+def uri_to_path(uri: str) -> str:
+    parsed = urllib.parse.urlparse(uri)
+    return os.path.normpath(urllib.parse.unquote(parsed.path))
+
+
+def path_to_uri(path: str) -> str:
+    return pathlib.Path(path).as_uri()
+
+
+def to_diagnostic(d: OutputDict) -> t.Dict[str, t.Any]:
+    # OutputDict is 1-origin (line), LSP is 0-origin
+    start_line = max(d["start"]["line"] - 1, 0)
+    start = {"line": start_line, "character": max(d["start"]["character"], 0)}
+    if d["end"]["character"] < 0:  # until the end of line
+        end = {"line": max(d["end"]["line"], start_line), "character": 0}
+    else:
+        end = {"line": max(d["end"]["line"] - 1, 0), "character": d["end"]["character"]}
+    return {
+        "range": {"start": start, "end": end},
+        "severity": _SEVERITY.get(d["status"], 1),
+        "source": "schemalint",
+        "code": d["errortype"],
+        "message": d["message"],
+    }
+
+
+class Connection:
+    # JSON-RPC with Content-Length header (base protocol of LSP)
+    def __init__(self, rf: t.BinaryIO, wf: t.BinaryIO) -> None:
+        self.rf = rf
+        self.wf = wf
+        self._lock = threading.Lock()
+
+    def read(self) -> t.Optional[t.Dict[str, t.Any]]:
+        length = None
+        while True:
+            line = self.rf.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            k, _, v = line.decode("ascii").partition(":")
+            if k.strip().lower() == "content-length":
+                length = int(v.strip())
+        if length is None:
+            return None
+        return json.loads(self.rf.read(length))
+
+    def write(self, message: t.Dict[str, t.Any]) -> None:
+        message["jsonrpc"] = "2.0"
+        body = json.dumps(message, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            self.wf.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii"))
+            self.wf.write(body)
+            self.wf.flush()
+
+    def notify(self, method: str, params: t.Any) -> None:
+        self.write({"method": method, "params": params})
+
+
+class Workspace:
+    # open buffers and the reverse dependencies of $ref
+    def __init__(
+        self,
+        *,
+        schema: t.Optional[str] = None,
+        guess_schema: bool = True,
+        cache_dir: t.Optional[str] = None,
+        offline: bool = False,
+    ) -> None:
+        self.schema = schema
+        self.guess_schema = guess_schema
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.documents: t.Dict[str, str] = {}  # path -> text
+        self.dependencies: t.Dict[str, t.Set[str]] = {}  # root -> referenced files
+        # local schema -> the files of the schema (the validator is cached, until they are changed)
+        self.schema_files: t.Dict[str, t.Set[str]] = {}
+
+    def open(self, path: str, text: str) -> None:
+        self.documents[path] = text
+
+    def close(self, path: str) -> None:
+        self.documents.pop(path, None)
+        self.dependencies.pop(path, None)
+
+    def affected(self, path: str) -> t.List[str]:
+        # the changed buffer and the open files which $ref it
+        paths = [path] if path in self.documents else []
+        for root, deps in self.dependencies.items():
+            if root != path and path in deps and root in self.documents:
+                paths.append(root)
+        return paths
+
+    def is_schema_file(self, path: str) -> bool:
+        return any(path in files for files in self.schema_files.values())
+
+    def reload_schemas(self) -> None:
+        # load_validator() is cached by the path of the schema
+        load_validator.cache_clear()
+        self.schema_files.clear()
+
+    def lint(self, path: str) -> t.List[OutputDict]:
+        loader = get_loader(path, overlay=self.documents)
+        s = streams.from_loader(loader)
+
+        schema = self.schema
+        if schema is None and self.guess_schema:
+            wlogger = LoggerWithCollectMessage(logger, {})
+            schema = guess.guess_schema(
+                path,
+                code=".schemalint.py",
+                current=os.path.dirname(path),
+                logger=wlogger,
+            )
+            s = streams.append_messages(s, messages=wlogger.messages)
+
+        if schema is not None:
+            registry = get_registry(self.cache_dir)
+            if isinstance(schema, str):
+                remote_cache = remote.get_remote_cache(
+                    self.cache_dir, offline=self.offline
+                )
+                if not remote.is_remote(schema) and schema not in self.schema_files:
+                    self.schema_files[schema] = schema_files(schema)
+                validator = load_validator(
+                    schema, remote_cache=remote_cache, registry=registry
+                )
+            else:
+                validator = get_validator(schema, check_schema=True, registry=registry)
+            s = streams.with_validator(s, validator)
+
+        formatter = get_formatter(path, lookup=s.context.lookup, output_type="json")
+        try:
+            results = [formatter.to_dict(ev) for ev in s]
+        finally:
+            self.dependencies[path] = set(loader.filenames)
+        return results
+
+
+class Server:
+    def __init__(
+        self,
+        conn: Connection,
+        *,
+        workspace: Workspace,
+        debounce: float = DEFAULT_DEBOUNCE,
+    ) -> None:
+        self.conn = conn
+        self.workspace = workspace
+        self.debounce = debounce
+        self.pending: t.Dict[str, float] = {}  # path -> deadline
+        self.running = True
+        self.shutdown_requested = False
+
+    def serve(self) -> int:
+        # reading in the main thread, linting in the worker thread (with debounce)
+        messages: "queue.Queue[t.Optional[t.Dict[str, t.Any]]]" = queue.Queue()
+        th = threading.Thread(target=self._process_loop, args=(messages,))
+        th.start()
+        try:
+            while True:
+                message = self.conn.read()
+                messages.put(message)
+                if message is None or message.get("method") == "exit":
+                    break
+        finally:
+            messages.put(None)
+            th.join()
+        return 0 if self.shutdown_requested else 1
+
+    def _process_loop(
+        self, messages: "queue.Queue[t.Optional[t.Dict[str, t.Any]]]"
+    ) -> None:
+        while self.running:
+            timeout = None
+            if self.pending:
+                timeout = max(min(self.pending.values()) - time.monotonic(), 0)
+            try:
+                message = messages.get(timeout=timeout)
+            except queue.Empty:
+                self.flush()
+                continue
+            if message is None:
+                break
+            self.dispatch(message)
+
+    def schedule(self, path: str, *, delay: t.Optional[float] = None) -> None:
+        delay = self.debounce if delay is None else delay
+        self.pending[path] = time.monotonic() + delay
+
+    def flush(self) -> None:
+        now = time.monotonic()
+        ready = [path for path, deadline in self.pending.items() if deadline <= now]
+        targets: t.List[str] = []
+        for path in ready:
+            del self.pending[path]
+            for target in self.workspace.affected(path):
+                if target not in targets:
+                    targets.append(target)
+        for target in targets:
+            self.publish(target)
+
+    def publish(self, path: str) -> None:
+        st = time.perf_counter()
+        try:
+            results = self.workspace.lint(path)
+        except Exception as e:
+            logger.warning("lint failed %s (%r)", path, e, exc_info=True)
+            formatter = get_formatter(path, lookup=None, output_type="json")
+            results = [
+                formatter.build_message_error(
+                    MessageError(repr(e)), context=None, status="ERROR"
+                )
+            ]
+        diagnostics = [
+            to_diagnostic(d)
+            for d in results
+            if os.path.abspath(d["filename"]) == path
+            or d["errortype"] == MessageError.__name__
+        ]
+        logger.debug(
+            "publish %s, %d diagnostics (%.3fs)",
+            path,
+            len(diagnostics),
+            time.perf_counter() - st,
+        )
+        self.conn.notify(
+            "textDocument/publishDiagnostics",
+            {"uri": path_to_uri(path), "diagnostics": diagnostics},
+        )
+
+    def dispatch(self, message: t.Dict[str, t.Any]) -> None:
+        method = message.get("method")
+        params = message.get("params") or {}
+        msgid = message.get("id")
+        handler = getattr(self, "on_" + (method or "").replace("/", "_"), None)
+
+        if handler is None:
+            if msgid is not None and method is not None:
+                self.conn.write(
+                    {
+                        "id": msgid,
+                        "error": {"code": -32601, "message": f"{method} not found"},
+                    }
+                )
+            return
+        try:
+            result = handler(params)
+        except Exception as e:
+            logger.warning("%s is failed (%r)", method, e, exc_info=True)
+            if msgid is not None:
+                self.conn.write(
+                    {"id": msgid, "error": {"code": -32603, "message": repr(e)}}
+                )
+            return
+        if msgid is not None:
+            self.conn.write({"id": msgid, "result": result})
+
+    def on_initialize(self, params: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
+        options = params.get("initializationOptions") or {}
+        if "schema" in options:
+            self.workspace.schema = options["schema"]
+        if "guessSchema" in options:
+            self.workspace.guess_schema = options["guessSchema"]
+        return {
+            "capabilities": {
+                # openClose, full text sync, save
+                "textDocumentSync": {"openClose": True, "change": 1, "save": True}
+            },
+            "serverInfo": {"name": "schemalint"},
+        }
+
+    def on_initialized(self, params: t.Dict[str, t.Any]) -> None:
+        pass
+
+    def on_shutdown(self, params: t.Dict[str, t.Any]) -> None:
+        self.shutdown_requested = True
+
+    def on_exit(self, params: t.Dict[str, t.Any]) -> None:
+        self.running = False
+
+    def on_textDocument_didOpen(self, params: t.Dict[str, t.Any]) -> None:
+        doc = params["textDocument"]
+        path = uri_to_path(doc["uri"])
+        self.workspace.open(path, doc["text"])
+        self.schedule(path, delay=0)
+
+    def on_textDocument_didChange(self, params: t.Dict[str, t.Any]) -> None:
+        path = uri_to_path(params["textDocument"]["uri"])
+        changes = params.get("contentChanges") or []
+        if changes:
+            self.workspace.open(path, changes[-1]["text"])  # full sync
+        self.schedule(path)
+
+    def on_textDocument_didSave(self, params: t.Dict[str, t.Any]) -> None:
+        path = uri_to_path(params["textDocument"]["uri"])
+        if "text" in params:
+            self.workspace.open(path, params["text"])
+        self.schedule(path, delay=0)
+
+    def on_textDocument_didClose(self, params: t.Dict[str, t.Any]) -> None:
+        uri = params["textDocument"]["uri"]
+        path = uri_to_path(uri)
+        self.workspace.close(path)
+        self.pending.pop(path, None)
+        self.conn.notify(
+            "textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []}
+        )
+        # dependents are linted with the file on disk, instead of the closed buffer
+        self.schedule(path, delay=0)
+
+    def on_workspace_didChangeWatchedFiles(self, params: t.Dict[str, t.Any]) -> None:
+        for change in params.get("changes") or []:
+            path = uri_to_path(change["uri"])
+            if os.path.basename(path) == ".schemalint.py":
+                # created, modified or deleted, schemas are guessed again
+                guess.clear_cache()
+                for target in self.workspace.documents:
+                    self.schedule(target)
+                continue
+            if self.workspace.is_schema_file(path):
+                # the schema (or its $ref) is changed, all documents are linted again
+                self.workspace.reload_schemas()
+                for target in self.workspace.documents:
+                    self.schedule(target)
+                continue
+            self.schedule(path)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="schemalint lsp", description=None)
+    parser.print_usage = parser.print_help
+    parser.add_argument(
+        "--logging", choices=list(logging._nameToLevel.keys()), default="WARNING"
+    )
+    parser.add_argument("-s", "--schema")
+    parser.add_argument(
+        "--no-guess-schema",
+        dest="guess_schema",
+        action="store_false",
+        help="don't find schema file via .schemalint.py",
+    )
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE)
+    parser.add_argument("--offline", action="store_true")
+    parser.add_argument("--cache-dir")
+
+    args = parser.parse_args(argv)
+
+    # stdout is used by the protocol
+    logging.basicConfig(level=args.logging, stream=sys.stderr)
+    workspace = Workspace(
+        schema=args.schema,
+        guess_schema=args.guess_schema,
+        cache_dir=args.cache_dir,
+        offline=args.offline,
+    )
+    conn = Connection(sys.stdin.buffer, sys.stdout.buffer)
+    server = Server(conn, workspace=workspace, debounce=args.debounce)
+    sys.exit(server.serve())
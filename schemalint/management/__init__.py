@@ -1,13 +1,15 @@
 import typing as t
 import logging
 import os.path
-import importlib_resources
+import functools
+import yaml
 
 from typing_extensions import TypedDict
 from dictknife import loading
-from magicalimport import import_module
 
 from schemalint.entity import Logger
+from schemalint.loader._fragment import roots, stat_key
+from ._sniff import sniff_scalar
 
 logger = logging.getLogger(__name__)
 
@@ -27,9 +29,12 @@ def resolve(
     return _resolve_path(filepath, resource)
 
 
+@functools.lru_cache(maxsize=None)  # loaded once per process
 def _resolve_resource(
     package: str, *, name: t.Optional[str], support_extensions=(".yaml", ".yml")
 ) -> dict:
+    import importlib_resources
+
     logger.info("resolve resource, find resource from %s", package)
     for fname in importlib_resources.contents(package):
         if not os.path.splitext(fname)[1].endswith(support_extensions):
@@ -60,18 +65,13 @@ def _resolve_path(path: str, resource: t.Dict[str, t.Any]) -> t.Optional[str]:
     if "{" not in url:
         return url
 
-    # loadata (TODO:shared loaded data)
-    from dictknife import loading
-    from dictknife.jsonknife import access_by_json_pointer
-
-    data = loading.loadfile(filepath)
     try:
         logger.info(
             "resolve schema, get version via %r, from %s",
             definition["get-version"],
             filepath,
         )
-        version = str(access_by_json_pointer(data, definition["get-version"]))
+        version = str(_get_version(path, definition["get-version"]))
     except KeyError:
         logger.info(
             "resolve schema, version is not found, guess latest version from %s",
@@ -87,18 +87,111 @@ def _resolve_path(path: str, resource: t.Dict[str, t.Any]) -> t.Optional[str]:
     return url.format(version=version)
 
 
-def get_schema(filepath: str, *, codepath: str) -> t.Union[str, dict, None]:
+def iterate_urls(
+    *,
+    package: str = "schemalint.management.resources",
+    resource_name: str = "root.yaml",
+    resource: t.Optional[t.Dict[str, t.Any]] = None,
+) -> t.Iterator[str]:
+    # all urls of the resource (each version)
+    if resource is None:
+        resource = _resolve_resource(package, name=resource_name)
+    for data in resource.values():
+        url = data["url"]
+        if "{" not in url:
+            yield url
+            continue
+        for version in data.get("version") or []:
+            yield url.format(version=version)
+
+
+def _get_version(path: str, pointer: str) -> t.Any:
+    # the document loaded by the loader is reused, if it is cached.
+    # if not, only the top of the file is read, until the pointer is found.
+    from dictknife.jsonknife import access_by_json_pointer
+
+    try:
+        realpath, key = stat_key(path)
+        fragment = roots.get(realpath, key)
+        if fragment is not None:
+            return access_by_json_pointer(fragment.doc, pointer)
+        with open(path) as rf:
+            try:
+                return sniff_scalar(rf, pointer)
+            except ValueError as e:  # e.g. complex key
+                logger.debug("sniff version, fallback to load (%r)", e)
+                rf.seek(0)
+                return access_by_json_pointer(loading.load(rf), pointer)
+    except (OSError, yaml.MarkedYAMLError) as e:
+        # the error of the file is reported by the loader
+        raise KeyError(pointer) from e
+
+
+# codepath -> (stat key, module), the config module (.schemalint.py) is imported once (until changed)
+_modules: t.Dict[str, t.Tuple[t.Any, t.Any]] = {}
+# codepath -> schema, when the schema doesn't depend on the file (not callable)
+_constants: t.Dict[str, t.Union[str, dict, None]] = {}
+
+
+def _forget(codepath: str) -> None:
+    # magicalimport keeps the imported module in sys.modules
+    import sys
+
+    _constants.pop(codepath, None)
+    entry = _modules.pop(codepath, None)
+    if entry is not None and sys.modules.get(entry[1].__name__) is entry[1]:
+        del sys.modules[entry[1].__name__]
+
+
+def _import_config(codepath: str) -> t.Any:
+    try:
+        _, key = stat_key(codepath)
+    except OSError:
+        key = None  # reported by import_module()
+    entry = _modules.get(codepath)
+    if entry is not None:
+        if entry[0] == key:
+            return entry[1]
+        logger.info("config is changed, reload %s", codepath)
+        _forget(codepath)
+
+    from magicalimport import import_module
+
     m = import_module(codepath, cwd=True)
+    _modules[codepath] = (key, m)
+    return m
+
+
+def clear_cache() -> None:
+    for codepath in list(_modules):
+        _forget(codepath)
+    _constants.clear()
+
+
+def get_schema(filepath: str, *, codepath: str) -> t.Union[str, dict, None]:
+    m = _import_config(codepath)
+    if codepath in _constants:
+        return _constants[codepath]
+
+    is_constant = True
+    schema = None
     for name in ["schema", "get_schema"]:
         # t.Optional[get_schema_fn_type, t.Union[t.Optional[str]]]
         get_schema_fn = getattr(m, name, None)
         if get_schema_fn is None:
             continue
 
-        schema = get_schema_fn(filepath) if callable(get_schema_fn) else get_schema_fn
+        # callable receives the filepath (e.g. resolve() reads the version from the file)
+        if callable(get_schema_fn):
+            is_constant = False
+            schema = get_schema_fn(filepath)
+        else:
+            schema = get_schema_fn
         if schema is None:
             continue
         if isinstance(schema, str) and not schema.startswith(("https://", "http:")):
-            return os.path.normpath(os.path.join(os.path.dirname(codepath), schema))
-        return schema
-    return None
+            schema = os.path.normpath(os.path.join(os.path.dirname(codepath), schema))
+        break
+    if is_constant:
+        _constants[codepath] = schema
+    return schema
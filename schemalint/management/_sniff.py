@@ -0,0 +1,60 @@
+import typing as t
+import yaml
+from dictknife.jsonknife.accessor import json_pointer_to_path
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader
+
+
+def sniff_scalar(rf: t.IO[str], pointer: str) -> t.Any:
+    # reading the yaml events until the scalar at the pointer is found (not loading the whole file)
+    target = (
+        [str(x) for x in json_pointer_to_path(pointer)] if pointer.strip("#/") else []
+    )
+    path: t.List[t.Any] = []  # keys (or indices) of the current node
+    frames: t.List[t.List[t.Any]] = []  # [is_mapping, expecting key, index]
+
+    for ev in yaml.parse(rf, Loader=SafeLoader):
+        if isinstance(ev, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            frames.pop()
+            if frames:
+                path.pop()
+                _done(frames)
+            continue
+        if not isinstance(ev, yaml.NodeEvent):
+            continue
+
+        top = frames[-1] if frames else None
+        if top is not None and top[0] and top[1]:  # key of mapping
+            if not isinstance(ev, yaml.ScalarEvent):
+                raise ValueError(f"unsupported key, {ev}")
+            path.append(ev.value)
+            top[1] = False
+            continue
+        if top is not None and not top[0]:  # item of sequence
+            top[2] += 1
+            path.append(str(top[2]))
+
+        if isinstance(ev, yaml.CollectionStartEvent):
+            if path == target:
+                raise KeyError(pointer)  # not scalar
+            frames.append([isinstance(ev, yaml.MappingStartEvent), True, -1])
+            continue
+        if path == target:
+            if not isinstance(ev, yaml.ScalarEvent):
+                raise ValueError(f"unsupported value, {ev}")
+            if ev.implicit[0]:  # plain scalar (e.g. 3.7 is float)
+                return yaml.load(ev.value, Loader=SafeLoader)
+            return ev.value
+        if top is not None:
+            path.pop()
+            _done(frames)
+    raise KeyError(pointer)
+
+
+def _done(frames: t.List[t.List[t.Any]]) -> None:
+    # a value is consumed
+    if frames[-1][0]:
+        frames[-1][1] = True
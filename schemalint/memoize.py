@@ -0,0 +1,157 @@
+import typing as t
+import hashlib
+import logging
+import threading
+import functools
+from collections import deque
+
+from jsonschema import validators
+
+if t.TYPE_CHECKING:
+    from jsonschema import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# validating the identical subtrees (against the same sub schema) once.
+#
+# each keyword function (e.g. properties, items, $ref) is wrapped, the errors are memoized by
+# (digest of the instance, keyword, id of the schema). for the repeated pair, the memoized errors
+# are copied, and their instances are remapped (found via the path from the current instance),
+# so that the positions are detected from the current subtree (not from the first one).
+
+_local = threading.local()
+
+
+class _Memo:
+    def __init__(self) -> None:
+        self.digests: t.Dict[int, bytes] = {}  # id(container) -> digest
+        self.containers: t.List[t.Any] = []  # keeping alive, id() is used in the key
+        self.errors: t.Dict[t.Tuple[t.Any, ...], t.List["ValidationError"]] = {}
+        self.schemas: t.List[t.Any] = []
+        self.hits = 0
+
+    def digest(self, data: t.Any) -> bytes:
+        uid = id(data)
+        d = self.digests.get(uid)
+        if d is not None:
+            return d
+
+        h = hashlib.blake2b(digest_size=16)
+        if isinstance(data, dict):
+            h.update(b"{")
+            for k, v in data.items():
+                h.update(_encode(k))
+                h.update(self.digest(v) if isinstance(v, (dict, list)) else _encode(v))
+        else:
+            h.update(b"[")
+            for v in data:
+                h.update(self.digest(v) if isinstance(v, (dict, list)) else _encode(v))
+        d = self.digests[uid] = h.digest()
+        self.containers.append(data)
+        return d
+
+
+def _encode(v: t.Any) -> bytes:
+    # True and 1 are equal, but not the same for the validation
+    return repr((type(v).__name__, v)).encode("utf-8") + b"\0"
+
+
+def _scope(validator: t.Any) -> t.Any:
+    # the base uri for resolving $ref (if available)
+    return getattr(getattr(validator, "_resolver", None), "_base_uri", None)
+
+
+def _clone(err: "ValidationError", base: t.Any) -> "ValidationError":
+    # the path of err is relative to base
+    instance = err.instance
+    if isinstance(instance, (dict, list)):
+        try:
+            target = base
+            for k in err.relative_path:
+                target = target[k]
+            if type(target) is type(instance):
+                instance = target
+        except (KeyError, IndexError, TypeError):
+            logger.debug("memoized error, instance is not found %r", err.relative_path)
+    child_base = instance if isinstance(instance, (dict, list)) else base
+
+    # almost copy.copy(), without calling __init__() (slow, and it modifies the context)
+    cls = err.__class__
+    new = cls.__new__(cls)
+    new.args = err.args
+    new.__dict__.update(err.__dict__)
+    new.__cause__ = err.__cause__
+    new.path = new.relative_path = deque(err.relative_path)
+    new.schema_path = new.relative_schema_path = deque(err.relative_schema_path)
+    new.instance = instance
+    new.parent = None
+    new.context = [_clone(child, child_base) for child in err.context]
+    for child in new.context:
+        child.parent = new
+    return new
+
+
+def _memoized(k: str, fn: t.Callable[..., t.Any]) -> t.Callable[..., t.Any]:
+    @functools.wraps(fn)
+    def _keyword(validator, value, instance, schema):
+        memo: t.Optional[_Memo] = getattr(_local, "memo", None)
+        if memo is None or not isinstance(instance, (dict, list)):
+            return fn(validator, value, instance, schema)
+
+        key = (memo.digest(instance), k, id(schema), _scope(validator))
+        templates = memo.errors.get(key)
+        if templates is not None:
+            memo.hits += 1
+            return [_clone(err, instance) for err in templates]
+        return _record(
+            memo, key, fn(validator, value, instance, schema), instance, schema
+        )
+
+    return _keyword
+
+
+def _record(
+    memo: _Memo,
+    key: t.Tuple[t.Any, ...],
+    errors: t.Optional[t.Iterable["ValidationError"]],
+    instance: t.Any,
+    schema: t.Any,
+) -> t.Iterator["ValidationError"]:
+    # the error is modified by the caller after yield (path, instance, ...), so it is copied before
+    templates = []
+    for err in errors or ():
+        templates.append(_clone(err, instance))
+        yield err
+    memo.schemas.append(schema)
+    memo.errors[key] = templates  # only when all errors are consumed
+
+
+@functools.lru_cache(maxsize=None)
+def memoizing(cls: t.Type[t.Any]) -> t.Type[t.Any]:
+    return validators.extend(
+        cls, validators={k: _memoized(k, fn) for k, fn in cls.VALIDATORS.items()}
+    )
+
+
+class MemoizingValidator:
+    # the memo is alive while iterating the errors of an instance (document)
+    def __init__(self, validator: t.Any) -> None:
+        self.validator = validator
+
+    def __getattr__(self, name: str) -> t.Any:
+        return getattr(self.validator, name)
+
+    def iter_errors(self, instance: t.Any) -> t.Iterator["ValidationError"]:
+        # the memo is active only in next() (the consumer may validate the other instance)
+        memo = _Memo()
+        itr = self.validator.iter_errors(instance)
+        while True:
+            prev, _local.memo = getattr(_local, "memo", None), memo
+            try:
+                err = next(itr)
+            except StopIteration:
+                logger.debug("memoized validation, %d hits", memo.hits)
+                return
+            finally:
+                _local.memo = prev
+            yield err
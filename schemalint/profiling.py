@@ -0,0 +1,148 @@
+import typing as t
+import time
+import threading
+import contextlib
+from collections import Counter
+
+# per-phase wall/cpu time and counters.
+# the phase time is exclusive (the time of nested phases is not included),
+# so e.g. "resolve" doesn't include "parse" of the referenced files.
+# the nesting of phases is tracked per thread, the totals are shared (e.g. api.Linter in threads).
+#
+# usage:
+#   with profiling.activate() as p:
+#       run(...)
+#   print(p.to_dict())
+
+_T = t.TypeVar("_T")
+
+
+class Profile:
+    enabled = True
+
+    def __init__(self) -> None:
+        self.phases: t.Dict[str, t.Dict[str, float]] = {}
+        self.counters: t.Counter[str] = Counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started = (time.perf_counter(), time.process_time())
+
+    @property
+    def _stack(self) -> t.List[t.List[float]]:
+        # [wall, cpu, child wall, child cpu]
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self) -> None:
+        self._stack.append([time.perf_counter(), time.process_time(), 0.0, 0.0])
+
+    def stop(self, name: str) -> None:
+        wall, cpu, child_wall, child_cpu = self._stack.pop()
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        if self._stack:
+            self._stack[-1][2] += wall
+            self._stack[-1][3] += cpu
+        self._add(name, wall - child_wall, cpu - child_cpu, 1)
+
+    def _add(self, name: str, wall: float, cpu: float, calls: int) -> None:
+        with self._lock:
+            phase = self.phases.get(name)
+            if phase is None:
+                phase = self.phases[name] = {"wall": 0.0, "cpu": 0.0, "calls": 0}
+            phase["wall"] += wall
+            phase["cpu"] += cpu
+            phase["calls"] += calls
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> t.Iterator[None]:
+        self.start()
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    def iterate(self, name: str, iterable: t.Iterable[_T]) -> t.Iterator[_T]:
+        # timing only the generator side (not the consumer of each item)
+        itr = iter(iterable)
+        while True:
+            self.start()
+            try:
+                item = next(itr)
+            except StopIteration:
+                return
+            finally:
+                self.stop(name)
+            yield item
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def merge(self, d: t.Dict[str, t.Any]) -> None:
+        # merging the result of the other process (e.g. --jobs)
+        for name, phase in d["phases"].items():
+            self._add(name, phase["wall"], phase["cpu"], phase["calls"])
+        with self._lock:
+            self.counters.update(d["counters"])
+
+    def to_dict(self) -> t.Dict[str, t.Any]:
+        wall, cpu = self._started
+        with self._lock:
+            phases = {name: dict(phase) for name, phase in self.phases.items()}
+            counters = dict(self.counters)
+        return {
+            "wall": time.perf_counter() - wall,
+            "cpu": time.process_time() - cpu,
+            "phases": phases,
+            "counters": counters,
+        }
+
+
+class NullProfile(Profile):
+    # disabled (default), doing nothing
+    enabled = False
+
+    def start(self) -> None:
+        pass
+
+    def stop(self, name: str) -> None:
+        pass
+
+    def phase(self, name: str) -> t.ContextManager[None]:
+        return _NULL_CONTEXT
+
+    def iterate(self, name: str, iterable: t.Iterable[_T]) -> t.Iterable[_T]:
+        return iterable
+
+    def count(self, name: str, n: int = 1) -> None:
+        pass
+
+
+class _NullContext:
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc: t.Any) -> None:
+        pass
+
+
+_NULL_CONTEXT = _NullContext()
+_current: Profile = NullProfile()
+
+
+def get_profile() -> Profile:
+    return _current
+
+
+@contextlib.contextmanager
+def activate(profile: t.Optional[Profile] = None) -> t.Iterator[Profile]:
+    global _current
+    prev = _current
+    _current = profile or Profile()
+    try:
+        yield _current
+    finally:
+        _current = prev
@@ -0,0 +1,257 @@
+import typing as t
+import os.path
+import json
+import time
+import hashlib
+import logging
+import functools
+import threading
+import urllib.parse
+
+from schemalint.cachedir import get_cache_dir, write_atomic
+from schemalint.errors import OfflineError
+
+if t.TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+DEFAULT_WORKERS = 8
+
+
+def is_remote(path: str) -> bool:
+    return path.startswith(("https://", "http://"))
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# content addressed cache for remote schemas
+# - <directory>/objects/<sha256 of content>
+# - <directory>/entries/<sha256 of url>.json (url, digest, etag, last-modified, fetched-at)
+class RemoteCache:
+    def __init__(
+        self,
+        directory: str,
+        *,
+        ttl: float = DEFAULT_TTL,
+        offline: bool = False,
+        session: t.Optional[t.Any] = None,
+        timeout: float = 30,
+        clock: t.Callable[[], float] = time.time,
+    ) -> None:
+        self.directory = directory
+        self.ttl = ttl
+        self.offline = offline
+        self.timeout = timeout
+        self.clock = clock
+        self._session = session
+
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+        return self._session
+
+    def _entry_path(self, url: str) -> str:
+        return os.path.join(
+            self.directory, "entries", _digest(url.encode("utf-8")) + ".json"
+        )
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest)
+
+    def _read_entry(self, url: str) -> t.Optional[t.Dict[str, t.Any]]:
+        try:
+            with open(self._entry_path(url)) as rf:
+                entry = json.load(rf)
+        except (FileNotFoundError, ValueError):
+            return None
+        if entry.get("url") != url:
+            return None
+        return entry
+
+    def _read_object(self, entry: t.Dict[str, t.Any]) -> t.Optional[bytes]:
+        try:
+            with open(self._object_path(entry["digest"]), "rb") as rf:
+                return rf.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, url: str, content: bytes, *, headers: t.Mapping[str, str]) -> None:
+        digest = _digest(content)
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            write_atomic(object_path, content)
+        entry = {
+            "url": url,
+            "digest": digest,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": self.clock(),
+        }
+        self._write_entry(url, entry)
+
+    def _write_entry(self, url: str, entry: t.Dict[str, t.Any]) -> None:
+        write_atomic(self._entry_path(url), json.dumps(entry).encode("utf-8"))
+
+    def fetch(self, url: str) -> bytes:
+        entry = self._read_entry(url)
+        content = self._read_object(entry) if entry is not None else None
+
+        if content is not None:
+            if self.offline:
+                logger.debug("remote cache, offline, use cached %s", url)
+                return content
+            if self.clock() - entry["fetched_at"] < self.ttl:
+                logger.debug("remote cache, fresh, use cached %s", url)
+                return content
+        elif self.offline:
+            raise OfflineError(f"{url} is not found in cache (offline mode)")
+
+        headers = {}
+        if content is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        logger.info("remote cache, fetch %s", url)
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            response.raise_for_status()  # e.g. 5xx (304 is not an error)
+        except OSError as e:  # requests.RequestException is a subclass of OSError
+            if content is None:
+                raise
+            logger.warning("remote cache, fetch failed (%r), use stale %s", e, url)
+            return content
+
+        if response.status_code == 304 and content is not None:
+            logger.debug("remote cache, not modified %s", url)
+            entry["fetched_at"] = self.clock()
+            self._write_entry(url, entry)
+            return content
+
+        content = response.content
+        self._write(url, content, headers=response.headers)
+        return content
+
+    def fetch_json(self, url: str) -> t.Any:
+        return json.loads(self.fetch(url))
+
+    def digest(self, url: str) -> str:
+        # the digest of the content, the stale one is revalidated (same as fetch())
+        return _digest(self.fetch(url))
+
+
+def iterate_refs(data: t.Any, base: str) -> t.Iterator[str]:
+    # the absolute urls of $ref (without fragment), $id changes the base url
+    if isinstance(data, dict):
+        if isinstance(data.get("$id"), str):
+            base = urllib.parse.urljoin(base, data["$id"])
+        ref = data.get("$ref")
+        if isinstance(ref, str):
+            url, _ = urllib.parse.urldefrag(urllib.parse.urljoin(base, ref))
+            if url:
+                yield url
+        for v in data.values():
+            yield from iterate_refs(v, base)
+    elif isinstance(data, list):
+        for v in data:
+            yield from iterate_refs(v, base)
+
+
+def remote_refs(data: t.Any, base: str) -> t.Set[str]:
+    return {url for url in iterate_refs(data, base) if is_remote(url)}
+
+
+class Prefetcher:
+    # fetching the remote $ref of a schema (transitively) concurrently.
+    # the concurrent requests for the same url share a single fetch. the fetched ones are
+    # kept while any prefetch() is running, after that, RemoteCache is asked again (ttl)
+    def __init__(
+        self, remote_cache: RemoteCache, *, max_workers: int = DEFAULT_WORKERS
+    ) -> None:
+        self.remote_cache = remote_cache
+        self.max_workers = max_workers
+        self.futures: t.Dict[str, "Future[t.Any]"] = {}
+        self._lock = threading.RLock()  # the callback may be called in submit()
+        self._executor: t.Optional["ThreadPoolExecutor"] = None
+        self._active = 0  # the number of running prefetch()
+
+    def submit(self, url: str) -> "Future[t.Any]":
+        with self._lock:
+            fut = self.futures.get(url)
+            if fut is None:
+                if self._executor is None:
+                    from concurrent.futures import ThreadPoolExecutor
+
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="schemalint-fetch",
+                    )
+                fut = self.futures[url] = self._executor.submit(
+                    self.remote_cache.fetch_json, url
+                )
+                fut.add_done_callback(lambda _: self._done(url))
+            return fut
+
+    def _done(self, url: str) -> None:
+        with self._lock:
+            if not self._active:
+                self.futures.pop(url, None)
+
+    def fetch_json(self, url: str) -> t.Any:
+        return self.submit(url).result()
+
+    def prefetch(self, schema: t.Any, *, base: str = "") -> t.Dict[str, t.Any]:
+        # url -> document, the urls failed to fetch are skipped (reported on validation)
+        with self._lock:
+            self._active += 1
+        try:
+            return self._prefetch(schema, base=base)
+        finally:
+            with self._lock:
+                self._active -= 1
+                if not self._active:
+                    self.futures = {
+                        url: fut for url, fut in self.futures.items() if not fut.done()
+                    }
+
+    def _prefetch(self, schema: t.Any, *, base: str) -> t.Dict[str, t.Any]:
+        fetched: t.Dict[str, t.Any] = {}
+        pending = {url: self.submit(url) for url in remote_refs(schema, base)}
+        seen = set(pending)
+        while pending:
+            url, fut = pending.popitem()
+            try:
+                doc = fut.result()
+            except (OSError, ValueError, OfflineError) as e:
+                logger.info("remote cache, prefetch failed %s (%r)", url, e)
+                continue
+            fetched[url] = doc
+            for sub in remote_refs(doc, url) - seen:
+                seen.add(sub)
+                pending[sub] = self.submit(sub)
+        return fetched
+
+
+@functools.lru_cache(maxsize=None)
+def get_prefetcher(remote_cache: RemoteCache) -> Prefetcher:
+    return Prefetcher(remote_cache)
+
+
+@functools.lru_cache(maxsize=None)
+def get_remote_cache(
+    cache_dir: t.Optional[str] = None,
+    *,
+    ttl: float = DEFAULT_TTL,
+    offline: bool = False,
+) -> RemoteCache:
+    return RemoteCache(
+        os.path.join(get_cache_dir(cache_dir), "remote"), ttl=ttl, offline=offline
+    )
@@ -0,0 +1,159 @@
+import typing as t
+import os
+import os.path
+import json
+import hashlib
+import logging
+import functools
+
+from schemalint.cachedir import get_cache_dir, write_atomic
+from schemalint.errors import OfflineError
+
+if t.TYPE_CHECKING:
+    from schemalint.formatter import OutputDict
+    from schemalint.remote import RemoteCache
+
+logger = logging.getLogger(__name__)
+
+VERSION = 1  # format of the entry
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# realpath -> (stat key, digest), the files shared by root files are hashed once
+_digests: t.Dict[str, t.Tuple[t.Any, str]] = {}
+
+
+def file_digest(filename: str) -> t.Optional[str]:
+    # None, if the file is not found
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    realpath = os.path.realpath(filename)
+    key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+    cached = _digests.get(realpath)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    try:
+        with open(filename, "rb") as rf:
+            digest = _sha256(rf.read())
+    except OSError:
+        return None
+    _digests[realpath] = (key, digest)
+    return digest
+
+
+@functools.lru_cache(maxsize=1)
+def schemalint_version() -> str:
+    try:
+        from importlib.metadata import version
+
+        return version("schemalint")
+    except Exception:  # not installed, or python < 3.8
+        return "dev"
+
+
+def schema_fingerprint(
+    schema: t.Union[None, str, dict],
+    *,
+    remote_cache: "RemoteCache",
+    bundle: t.Optional[str] = None,
+) -> str:
+    # without loading the schema (and jsonschema)
+    from schemalint import remote
+
+    if schema is None:
+        return ""
+    if isinstance(schema, dict):
+        from schemalint.validator import fingerprint
+
+        fp = fingerprint(schema)
+    elif remote.is_remote(schema):
+        # the content in the remote cache (fetched, only if it is stale)
+        try:
+            digest: t.Optional[str] = remote_cache.digest(schema)
+        except (OSError, OfflineError):  # reported on validation
+            digest = None
+        fp = f"{schema}@{digest}"
+    else:
+        fp = f"{os.path.abspath(schema)}@{file_digest(schema)}"
+    if bundle is not None:
+        fp = f"{fp}+{file_digest(os.path.join(bundle, 'index.json'))}"
+    return fp
+
+
+def make_key(filepath: str, *, schema: str, options: t.Dict[str, t.Any]) -> str:
+    # the records include the relative paths from cwd
+    data = {
+        "schemalint": schemalint_version(),
+        "cwd": os.getcwd(),
+        "filename": os.path.abspath(filepath),
+        "schema": schema,
+        "options": options,
+    }
+    return _sha256(json.dumps(data, sort_keys=True).encode("utf-8"))
+
+
+def snapshot(record: "OutputDict") -> "OutputDict":
+    # the layout modifies the record
+    return t.cast(
+        "OutputDict",
+        {
+            **record,
+            "start": dict(record["start"]),
+            "end": dict(record["end"]),
+            "where": list(record["where"]),
+        },
+    )
+
+
+# the results of linting, stored in <directory>/<key[:2]>/<key>.json
+# the entry is valid, if all files used for linting (the root file and
+# the files referenced via $ref) are not changed (compared by sha256)
+class ResultCache:
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key: str) -> t.Optional[t.Dict[str, t.Any]]:
+        try:
+            with open(self._path(key)) as rf:
+                entry = json.load(rf)
+        except (FileNotFoundError, ValueError):
+            return None
+        if entry.get("version") != VERSION:
+            return None
+        for filename, digest in entry["files"].items():
+            if file_digest(filename) != digest:
+                logger.debug("result cache, changed %s", filename)
+                return None
+        return entry
+
+    def set(
+        self,
+        key: str,
+        *,
+        filenames: t.Iterable[str],
+        records: t.List["OutputDict"],
+        errors: int,
+    ) -> None:
+        entry = {
+            "version": VERSION,
+            "files": {os.path.abspath(name): file_digest(name) for name in filenames},
+            "errors": errors,  # the number of errors, excluding soft errors
+            "records": records,
+        }
+        try:
+            write_atomic(self._path(key), json.dumps(entry).encode("utf-8"))
+        except OSError as e:
+            logger.info("result cache, cannot write (%r)", e)
+
+
+@functools.lru_cache(maxsize=None)
+def get_result_cache(cache_dir: t.Optional[str] = None) -> ResultCache:
+    return ResultCache(os.path.join(get_cache_dir(cache_dir), "results"))
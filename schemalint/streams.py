@@ -2,10 +2,13 @@ import typing as t
 from dictknife import loading
 from dictknife.langhelpers import reify
 
-from .entity import ErrorEvent, Context
+from .entity import ErrorEvent, Context, NodeStore
 from .errors import MessageError
-from .loader import get_loader, Loader
-from .validator import get_validator, Validator
+from .loader import get_loader, iterate_loaders, Loader
+from . import profiling
+
+if t.TYPE_CHECKING:
+    from .validator import Validator
 
 
 class Stream:  # todo: to protocol
@@ -28,6 +31,10 @@ class StreamFromLoader(Stream):
     def doc(self) -> dict:
         return self.loader.load()
 
+    @property
+    def filenames(self) -> t.List[str]:
+        return self.loader.filenames
+
     def __iter__(self) -> t.Iterable[ErrorEvent]:
         self.context.doc = self.doc
         for err in self.loader.errors:
@@ -36,8 +43,13 @@ class StreamFromLoader(Stream):
             yield ErrorEvent(error=err, context=self.context)
 
 
-def from_filename(filepath: str, ctx: t.Optional[Context] = None) -> StreamFromLoader:
-    loader = get_loader(filepath)
+def from_filename(
+    filepath: str,
+    ctx: t.Optional[Context] = None,
+    *,
+    max_errors: t.Optional[int] = None,
+) -> StreamFromLoader:
+    loader = get_loader(filepath, max_errors=max_errors)
     return from_loader(loader, ctx=ctx)
 
 
@@ -48,6 +60,45 @@ def from_loader(loader: Loader, *, ctx: t.Optional[Context] = None) -> StreamFro
     return s
 
 
+class StreamFromDocuments(Stream):
+    # multi-document yaml, each document is loaded, resolved and validated one by one
+    def __init__(
+        self, ctx: Context, *, loaders: t.Iterable[Loader], store: NodeStore
+    ) -> None:
+        self.context = ctx
+        self.loaders = loaders
+        self.hooks: t.List[t.Callable[[Context], t.Iterable[ErrorEvent]]] = []
+        self.filenames: t.List[str] = []  # the files loaded until now
+        ctx.lookup = store
+
+    def __iter__(self) -> t.Iterable[ErrorEvent]:
+        for loader in self.loaders:
+            self.context.filename = loader.filename
+            self.context.doc = loader.load()
+            for filename in loader.filenames:
+                if filename not in self.filenames:
+                    self.filenames.append(filename)
+            for err in loader.errors:
+                yield ErrorEvent(error=err, context=self.context)
+            if self.context.doc is None:
+                continue  # empty document (or broken document)
+            for hook in self.hooks:
+                yield from hook(self.context)
+        self.context.doc = {}  # release the last document
+
+
+def from_filename_documents(
+    filepath: str,
+    ctx: t.Optional[Context] = None,
+    *,
+    max_errors: t.Optional[int] = None,
+) -> StreamFromDocuments:
+    ctx = ctx or Context(filename=filepath)
+    store = NodeStore()
+    loaders = iterate_loaders(filepath, store=store, max_errors=max_errors)
+    return StreamFromDocuments(ctx, loaders=loaders, store=store)
+
+
 class StreamWithMessages(Stream):
     def __init__(self, stream: StreamFromLoader, *, messages: t.List[str]) -> None:
         self._stream = stream
@@ -72,7 +123,7 @@ def append_messages(
 
 
 class StreamWithValidator(Stream):
-    def __init__(self, stream: StreamFromLoader, *, validator: Validator) -> None:
+    def __init__(self, stream: StreamFromLoader, *, validator: "Validator") -> None:
         self._stream = stream
         self.validator = validator
 
@@ -82,17 +133,32 @@ class StreamWithValidator(Stream):
 
     def __iter__(self) -> t.Iterable[ErrorEvent]:
         yield from self._stream
-        for err in self.validator.iter_errors(self._stream.context.doc):
-            yield ErrorEvent(context=self._stream.context, error=err)
+        yield from _validate(self.validator, self._stream.context)
 
 
-def with_validator(s: StreamFromLoader, validator: Validator) -> StreamWithValidator:
+def _validate(validator: "Validator", ctx: Context) -> t.Iterable[ErrorEvent]:
+    profile = profiling.get_profile()
+    for err in profile.iterate("validate", validator.iter_errors(ctx.doc)):
+        profile.count("validation_errors")
+        yield ErrorEvent(context=ctx, error=err)
+
+
+def with_validator(s: StreamFromLoader, validator: "Validator") -> StreamWithValidator:
+    base = s
+    while hasattr(base, "_stream"):
+        base = base._stream
+    if isinstance(base, StreamFromDocuments):
+        # validating each document, as soon as it is loaded
+        base.hooks.append(lambda ctx: _validate(validator, ctx))
+        return s
     return StreamWithValidator(s, validator=validator)
 
 
 def with_schema(
     s: StreamFromLoader, filepath: str, *, check_schema: bool
 ) -> StreamWithValidator:
+    from .validator import get_validator
+
     schema = loading.loadfile(filepath)
     validator = get_validator(schema, check_schema=check_schema)
     return with_validator(s, validator)
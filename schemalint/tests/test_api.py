@@ -0,0 +1,124 @@
+import unittest
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "age": {"type": "integer", "minimum": 0},
+        "friends": {"type": "array", "items": {"$ref": "#"}},
+    },
+}
+
+
+def _buffers(n):
+    buffers = []
+    for i in range(n):
+        lines = [f"name: person{i}", f"age: {i - n // 2}", "friends:"]
+        lines.extend(f"  - $ref: 'defs.yaml#/p{j}'" for j in range(i % 3))
+        if i % 5 == 0:
+            lines.append("  - name: [broken")  # parse error
+        buffers.append((f"docs/{i}.yaml", "\n".join(lines) + "\n"))
+    return buffers
+
+
+FILES = {
+    "docs/defs.yaml": "p0:\n  name: 0\np1:\n  age: x\np2:\n  name: ok\n",
+}
+
+
+class _SwitchOftenMixin:
+    # switching threads often, so that the races are not hidden by the GIL
+    def setUp(self):
+        import sys
+
+        self._interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        import sys
+
+        sys.setswitchinterval(self._interval)
+
+
+class LinterTests(_SwitchOftenMixin, unittest.TestCase):
+    def _makeOne(self, **kwargs):
+        from schemalint.api import Linter
+
+        return Linter(schema=SCHEMA, **kwargs)
+
+    def test_concurrent(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from schemalint import profiling
+
+        buffers = _buffers(40) * 5
+        linter = self._makeOne()
+        with profiling.activate() as serial:
+            want = [linter.lint(name, data, files=FILES) for name, data in buffers]
+        self.assertTrue(any(want))
+
+        linter = self._makeOne()
+        with profiling.activate() as p:
+            with ThreadPoolExecutor(max_workers=8) as ex:
+                got = list(
+                    ex.map(lambda args: linter.lint(*args, files=FILES), buffers)
+                )
+        self.assertEqual(got, want)
+
+        # the counts are not lost, and the phases of the threads are not mixed
+        want_d, got_d = serial.to_dict(), p.to_dict()
+        self.assertEqual(got_d["counters"], want_d["counters"])
+        self.assertEqual(
+            {name: phase["calls"] for name, phase in got_d["phases"].items()},
+            {name: phase["calls"] for name, phase in want_d["phases"].items()},
+        )
+        for phase in got_d["phases"].values():
+            self.assertGreaterEqual(phase["wall"], 0.0)
+
+    def test_concurrent__max_errors(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        buffers = _buffers(20)
+        want = [
+            self._makeOne(max_errors=1).lint(name, data, files=FILES)
+            for name, data in buffers
+        ]
+        linter = self._makeOne(max_errors=1)
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            got = list(ex.map(lambda args: linter.lint(*args, files=FILES), buffers))
+        self.assertEqual(got, want)
+
+
+class FragmentCacheTests(_SwitchOftenMixin, unittest.TestCase):
+    def test_concurrent(self):
+        import os.path
+        import tempfile
+        from concurrent.futures import ThreadPoolExecutor
+        from schemalint.loader import get_loader
+        from schemalint.loader._fragment import FragmentCache
+
+        with tempfile.TemporaryDirectory() as d:
+            for i in range(8):
+                with open(os.path.join(d, f"{i}.yaml"), "w") as wf:
+                    wf.write(f"a:\n  $ref: '{(i + 1) % 8}.yaml#/b'\nb:\n  x: {i}\n")
+
+            def _load(i, *, fragments):
+                loader = get_loader(
+                    os.path.join(d, f"{i % 8}.yaml"), fragments=fragments
+                )
+                return loader.load(), loader.errors
+
+            want = [_load(i, fragments=None) for i in range(8)] * 50
+            # small, so that the entries are evicted while the other threads use them
+            fragments = FragmentCache(maxsize=3)
+            with ThreadPoolExecutor(max_workers=8) as ex:
+                got = list(ex.map(lambda i: _load(i, fragments=fragments), range(400)))
+            self.assertEqual(got, want)
+            self.assertLessEqual(len(fragments.entries), 3)
+            self.assertEqual(
+                fragments.nbytes,
+                sum(fragment.size for _, fragment in fragments.entries.values()),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import os
+import os.path
+import sys
+import json
+import hashlib
+import tempfile
+import subprocess
+
+from schemalint.tests.test_remote import _Server
+
+
+class BundleMainTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmpdir.name, "vendor")
+        self.cache_dir = os.path.join(self.tmpdir.name, "cache")
+        self.server = _Server().__enter__()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.tmpdir.cleanup()
+
+    def _respond(self, path, doc):
+        self.server.respond(path, json.dumps(doc).encode("utf-8"))
+        return self.server.url(path)
+
+    def _callFUT(self, *schemas):
+        from schemalint.bundle import main
+
+        argv = ["-d", self.directory, "--cache-dir", self.cache_dir, *schemas]
+        with self.assertRaises(SystemExit) as c:
+            main(argv)
+        return c.exception.code
+
+    def _index(self):
+        with open(os.path.join(self.directory, "index.json")) as rf:
+            return json.load(rf)
+
+    def _documents(self):
+        from schemalint.bundle import Bundle
+
+        return Bundle.load(self.directory).documents
+
+    def test_output(self):
+        defs = {"definitions": {"name": {"type": "string"}}}
+        defs_url = self._respond("/defs.json", defs)
+        schema = {
+            "definitions": {"person": {"$ref": "defs.json#/definitions/name"}},
+            "properties": {"name": {"$ref": "#/definitions/person"}},
+        }
+        url = self._respond("/schema.json", schema)
+
+        self.assertEqual(self._callFUT(url), 0)
+
+        # index.json (url -> objects/<sha256 of url>.json), the documents are kept as is
+        def _filename(url):
+            return f"objects/{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+        self.assertEqual(
+            self._index(),
+            {
+                "version": 1,
+                "documents": {url: _filename(url), defs_url: _filename(defs_url)},
+            },
+        )
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.directory, "objects"))),
+            sorted(os.path.basename(_filename(u)) for u in [url, defs_url]),
+        )
+        self.assertEqual(self._documents(), {url: schema, defs_url: defs})
+
+    def test_external_refs__transitive(self):
+        # the local schema is not included, only the remote $ref (transitively)
+        b_url = self._respond("/sub/b.json", {"type": "string"})
+        a_url = self._respond("/a.json", {"$ref": "sub/b.json"})
+        local = os.path.join(self.tmpdir.name, "schema.json")
+        with open(local, "w") as wf:
+            json.dump({"properties": {"name": {"$ref": a_url}}}, wf)
+
+        self.assertEqual(self._callFUT(local), 0)
+        self.assertEqual(
+            self._documents(),
+            {a_url: {"$ref": "sub/b.json"}, b_url: {"type": "string"}},
+        )
+
+    def test_circular_refs(self):
+        a_url = self.server.url("/a.json")
+        b_url = self._respond("/b.json", {"properties": {"a": {"$ref": a_url}}})
+        self._respond("/a.json", {"properties": {"b": {"$ref": "b.json"}}})
+
+        self.assertEqual(self._callFUT(a_url), 0)
+        self.assertEqual(sorted(self._documents()), [a_url, b_url])
+        # each document is fetched once
+        self.assertEqual(
+            sorted(path for path, _ in self.server.requests), ["/a.json", "/b.json"]
+        )
+
+    def test_not_found(self):
+        missing = self.server.url("/missing.json")
+        url = self._respond("/schema.json", {"$ref": missing})
+
+        self.assertEqual(self._callFUT(url), 1)
+        # the others are saved
+        self.assertEqual(self._documents(), {url: {"$ref": missing}})
+
+    def test_stale_objects(self):
+        a_url = self._respond("/a.json", {"type": "string"})
+        b_url = self._respond("/b.json", {"type": "integer"})
+        self.assertEqual(self._callFUT(a_url, b_url), 0)
+        self.assertEqual(self._callFUT(a_url), 0)
+
+        self.assertEqual(list(self._index()["documents"]), [a_url])
+        self.assertEqual(len(os.listdir(os.path.join(self.directory, "objects"))), 1)
+
+    def test_lint_with_bundle(self):
+        defs_url = self._respond("/defs.json", {"name": {"type": "string"}})
+        url = self._respond(
+            "/schema.json", {"properties": {"name": {"$ref": "defs.json#/name"}}}
+        )
+        self.assertEqual(self._callFUT(url), 0)
+        self.server.__exit__(None, None, None)
+        self.server = _Server().__enter__()  # the schemas are not served anymore
+
+        import schemalint
+
+        filename = os.path.join(self.tmpdir.name, "data.yaml")
+        with open(filename, "w") as wf:
+            wf.write("name: 1\n")
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(schemalint.__file__))
+        p = subprocess.run(
+            [sys.executable, "-m", "schemalint", "--bundle", self.directory]
+            + ["--cache-dir", os.path.join(self.tmpdir.name, "empty")]
+            + ["-o", "json", "-s", url, filename],
+            cwd=self.tmpdir.name,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        records = [json.loads(line) for line in p.stdout.splitlines()]
+        self.assertEqual(p.returncode, 1, p.stderr)
+        self.assertEqual(
+            [r["message"] for r in records],
+            ["1 is not of type 'string' (validator=type)"],
+        )
+        self.assertIn(defs_url, self._documents())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+import unittest
+import os
+import os.path
+import sys
+import json
+import tempfile
+import subprocess
+
+
+def _touch(path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as wf:
+        wf.write("name: foo\n")
+
+
+class ExpandFilenamesTests(unittest.TestCase):
+    def _callFUT(self, patterns):
+        from schemalint.cli import expand_filenames
+
+        return expand_filenames(patterns)
+
+    def test_glob(self):
+        with tempfile.TemporaryDirectory() as d:
+            _touch(os.path.join(d, "b", "x.yaml"))
+            _touch(os.path.join(d, "a", "x.yaml"))
+            got = self._callFUT([os.path.join(d, "*", "x.yaml")])
+            want = [os.path.join(d, "a", "x.yaml"), os.path.join(d, "b", "x.yaml")]
+            self.assertEqual(got, want)
+
+    def test_glob__duplicated(self):
+        with tempfile.TemporaryDirectory() as d:
+            _touch(os.path.join(d, "a", "x.yaml"))
+            path = os.path.join(d, "a", "x.yaml")
+            got = self._callFUT([path, os.path.join(d, "*", "x.yaml")])
+            self.assertEqual(got, [path])
+
+    def test_glob__not_matched(self):
+        # kept as is, and reported as not found
+        with tempfile.TemporaryDirectory() as d:
+            pattern = os.path.join(d, "missing*", "x.yaml")
+            got = self._callFUT([pattern])
+            self.assertEqual(got, [pattern])
+
+    def test_not_found(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "missing.yaml")
+            got = self._callFUT([path])
+            self.assertEqual(got, [path])
+
+
+class MainTests(unittest.TestCase):
+    def _run(self, *args, cwd):
+        import schemalint
+
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(schemalint.__file__))
+        return subprocess.run(
+            [sys.executable, "-m", "schemalint", *args],
+            cwd=cwd,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+
+    def test_glob__not_matched(self):
+        with tempfile.TemporaryDirectory() as d:
+            p = self._run("missing*/x.yaml", "-o", "json", "--always-success", cwd=d)
+            self.assertEqual(p.returncode, 1, p.stderr)
+            records = [json.loads(line) for line in p.stdout.splitlines()]
+            self.assertEqual(len(records), 1)
+            self.assertEqual(records[0]["errortype"], "ExFileNotFoundError")
+            self.assertEqual(records[0]["filename"], "missing*/x.yaml")
+
+    def _assertMissingInBatch(self, *args):
+        with tempfile.TemporaryDirectory() as d:
+            for name in ["a.yaml", "c.yaml"]:
+                with open(os.path.join(d, name), "w") as wf:
+                    wf.write("name: 1\n")
+            with open(os.path.join(d, "schema.json"), "w") as wf:
+                json.dump({"properties": {"name": {"type": "string"}}}, wf)
+            filenames = ["a.yaml", "missing.yaml", "c.yaml"]
+            p = self._run("-s", "schema.json", *filenames, "-o", "json", *args, cwd=d)
+            self.assertEqual(p.returncode, 1, p.stderr)
+            self.assertNotIn("Traceback", p.stderr)
+            records = [json.loads(line) for line in p.stdout.splitlines()]
+            self.assertEqual(
+                [(r["filename"], r["errortype"]) for r in records],
+                [
+                    ("a.yaml", "ValidationError"),
+                    ("missing.yaml", "ExFileNotFoundError"),
+                    ("c.yaml", "ValidationError"),
+                ],
+            )
+
+    def test_missing_in_batch(self):
+        # the rest of files are linted
+        self._assertMissingInBatch()
+
+    def test_missing_in_batch__jobs(self):
+        self._assertMissingInBatch("-j", "2")
+
+    def _runMaxErrors(self, *args):
+        with tempfile.TemporaryDirectory() as d:
+            for name in ["a.yaml", "b.yaml"]:
+                with open(os.path.join(d, name), "w") as wf:
+                    wf.write("".join(f"- {i}\n" for i in range(5)))
+            with open(os.path.join(d, "schema.json"), "w") as wf:
+                json.dump({"items": {"type": "string"}}, wf)
+            p = self._run("-s", "schema.json", "-o", "json", *args, cwd=d)
+            records = [json.loads(line) for line in p.stdout.splitlines()]
+            return p, [(r["filename"], r["errortype"], r["message"]) for r in records]
+
+    def test_max_errors(self):
+        p, got = self._runMaxErrors("a.yaml", "b.yaml", "--max-errors", "2")
+        self.assertEqual(p.returncode, 1, p.stderr)
+        stopped = "stopped, the number of errors reached 2"
+        want = [
+            ("a.yaml", "ValidationError", "0 is not of type 'string' (validator=type)"),
+            ("a.yaml", "ValidationError", "1 is not of type 'string' (validator=type)"),
+            ("a.yaml", "MessageError", stopped),
+            ("b.yaml", "ValidationError", "0 is not of type 'string' (validator=type)"),
+            ("b.yaml", "ValidationError", "1 is not of type 'string' (validator=type)"),
+            ("b.yaml", "MessageError", stopped),
+        ]
+        self.assertEqual(got, want)
+
+    def test_max_errors__always_success(self):
+        p, got = self._runMaxErrors("a.yaml", "--max-errors", "1", "--always-success")
+        self.assertEqual(p.returncode, 0, p.stderr)
+        self.assertEqual(len(got), 2)
+
+    def test_fail_fast(self):
+        # same as --max-errors 1, and the rest of files are skipped
+        p, got = self._runMaxErrors("a.yaml", "b.yaml", "--fail-fast")
+        self.assertEqual(p.returncode, 1, p.stderr)
+        q, want = self._runMaxErrors("a.yaml", "--max-errors", "1")
+        self.assertEqual(q.returncode, 1, q.stderr)
+        self.assertEqual(got, want)
+        self.assertEqual(len(got), 2)
+
+    def test_cache_schemas(self):
+        # the checked schemas are recorded, only with --cache-schemas
+        with tempfile.TemporaryDirectory() as d:
+            with open(os.path.join(d, "a.yaml"), "w") as wf:
+                wf.write("name: foo\n")
+            with open(os.path.join(d, "schema.json"), "w") as wf:
+                json.dump({"properties": {"name": {"type": "string"}}}, wf)
+            cache_dir = os.path.join(d, "cache")
+            args = ["-s", "schema.json", "a.yaml", "--cache-dir", cache_dir]
+
+            p = self._run(*args, cwd=d)
+            self.assertEqual(p.returncode, 0, p.stderr)
+            self.assertFalse(os.path.exists(os.path.join(cache_dir, "checked")))
+
+            p = self._run(*args, "--cache-schemas", cwd=d)
+            self.assertEqual(p.returncode, 0, p.stderr)
+            ((_, _, files),) = list(os.walk(os.path.join(cache_dir, "checked")))[1:]
+            self.assertEqual(len(files), 1)
+
+
+class RunTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "docker-compose.yml")
+        with open(self.filename, "w") as wf:
+            wf.write("version: '3.7'\nservices: {}\n")
+        with open(os.path.join(self.tmpdir.name, ".schemalint.py"), "w") as wf:
+            wf.write("from schemalint.management import resolve as get_schema\n")
+
+    def tearDown(self):
+        from schemalint import guess
+        from schemalint.loader._fragment import fragments, roots
+
+        guess.clear_cache()
+        fragments.clear()
+        roots.clear()
+        self.tmpdir.cleanup()
+
+    def _callFUT(self, **kwargs):
+        from schemalint.cli import run
+        from schemalint.errors import OfflineError
+
+        # the guessed schema (with the version) is reported as not cached
+        with self.assertRaisesRegex(OfflineError, "config_schema_v3.7.json"):
+            run(
+                self.filename,
+                guess_schema=True,
+                always_success=True,
+                output="json",
+                offline=True,  # the schema is not fetched
+                cache_dir=os.path.join(self.tmpdir.name, "cache"),
+                printer=lambda line: None,
+                **kwargs,
+            )
+
+    def test_guess__reuse_parsed_document(self):
+        from unittest import mock
+
+        # the version is read from the document parsed before guessing
+        with mock.patch("schemalint.management.sniff_scalar") as m:
+            self._callFUT()
+        self.assertFalse(m.called)
+
+    def test_guess__cache_results(self):
+        from unittest import mock
+        from schemalint.management import sniff_scalar
+
+        # guessed before parsing (for the key), the version is sniffed
+        with mock.patch(
+            "schemalint.management.sniff_scalar", side_effect=sniff_scalar
+        ) as m:
+            self._callFUT(cache_results=True)
+        self.assertTrue(m.called)
+
+
+if __name__ == "__main__":
+    unittest.main()
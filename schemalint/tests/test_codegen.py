@@ -0,0 +1,252 @@
+import unittest
+import os
+import os.path
+import glob
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EXAMPLES = os.path.join(HERE, "..", "..", "examples")
+
+PERSON = {
+    "definitions": {
+        "name": {"type": "string", "minLength": 1},
+        "person": {
+            "type": "object",
+            "properties": {
+                "name": {"$ref": "#/definitions/name"},
+                "age": {"type": "integer", "minimum": 0},
+                "email": {"type": "string", "format": "email"},
+                "parent": {"$ref": "#/definitions/person"},
+            },
+            "required": ["name"],
+            "additionalProperties": False,
+        },
+    },
+    "type": "object",
+    "properties": {
+        "people": {"type": "array", "items": {"$ref": "#/definitions/person"}},
+        "id": {
+            "anyOf": [
+                {"type": "integer"},
+                {"type": "string", "pattern": "^[a-z]+$"},
+            ]
+        },
+        "value": {
+            "oneOf": [
+                {"type": "number", "multipleOf": 2},
+                {"type": "number", "multipleOf": 3},
+                {"type": "string", "format": "date"},
+            ]
+        },
+        "labels": {
+            "type": "object",
+            "patternProperties": {
+                "^x-": {"type": "string"},
+                "^[0-9]+$": {"type": "integer"},
+            },
+            "additionalProperties": False,
+        },
+    },
+    "additionalProperties": False,
+}
+
+INSTANCES = [
+    {},
+    {"people": [{"name": "foo", "age": 20, "email": "foo@example.com"}]},
+    {"people": [{"name": "", "age": -1, "email": "not email", "extra": 1}]},
+    {"people": [{"age": "20", "parent": {"name": 1, "parent": {"name": "x"}}}]},
+    {"people": [{"name": "a"}, "b", None, {"name": "c", "parent": []}]},
+    {"id": 1},
+    {"id": "abc"},
+    {"id": "ABC"},
+    {"id": 1.5},
+    {"value": 4},
+    {"value": 9},
+    {"value": 6},  # multiple of 2 and 3
+    {"value": 5},
+    {"value": "2020-01-01"},
+    {"value": "not date"},
+    {"value": None},
+    {"labels": {"x-a": "a", "1": 1}},
+    {"labels": {"x-a": 1, "1": "a", "other": True}},
+    {"labels": {"x-1": 1}},  # not matched by ^[0-9]+$
+    {"labels": []},
+    {"unknown": 1, "id": [], "people": {}},
+    [],
+    None,
+]
+
+
+def _examples():
+    # (schema, instances) of the examples
+    from dictknife import loading
+
+    for path in sorted(glob.glob(os.path.join(EXAMPLES, "*", "src", "*", "schema.*"))):
+        d = os.path.dirname(path)
+        instances = [
+            loading.loadfile(f)
+            for f in sorted(glob.glob(os.path.join(d, "*")))
+            if os.path.splitext(f)[0].endswith(("ok", "ng"))
+        ]
+        yield os.path.relpath(path, EXAMPLES), loading.loadfile(path), instances
+
+
+def _errors(validator, instance):
+    # jsonschema's best_match order is not compared, the set of errors is
+    return sorted(
+        (
+            (tuple(map(str, e.absolute_path)), tuple(map(str, e.absolute_schema_path))),
+            e.validator,
+            e.message,
+        )
+        for e in validator.iter_errors(instance)
+    )
+
+
+class CompiledValidatorTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _makeOne(self, schema, *, registry=None, **kwargs):
+        from schemalint.codegen import CompiledValidator
+        from schemalint.validator import ValidatorRegistry
+
+        if registry is None:
+            registry = ValidatorRegistry(codegen=True, codegen_dir=self.tmpdir.name)
+        validator = registry.get(schema, **kwargs)
+        self.assertIsInstance(validator, CompiledValidator)  # not fallback
+        return validator
+
+    def _assertSameErrors(self, schema, instances):
+        import jsonschema
+
+        interpreted = jsonschema.Draft7Validator(schema)
+        compiled = self._makeOne(schema)
+        for instance in instances:
+            with self.subTest(instance=instance):
+                self.assertEqual(
+                    _errors(compiled, instance), _errors(interpreted, instance)
+                )
+
+    def test_same_errors(self):
+        self._assertSameErrors(PERSON, INSTANCES)
+
+    def test_same_errors__examples(self):
+        found = False
+        for name, schema, instances in _examples():
+            found = True
+            with self.subTest(schema=name):
+                self._assertSameErrors(schema, instances)
+        self.assertTrue(found)
+
+    def test_cached_on_disk(self):
+        from schemalint import codegen
+
+        schema = {"properties": {"name": {"type": "string"}}}
+        validator = self._makeOne(schema)
+        self.assertEqual(len(glob.glob(os.path.join(self.tmpdir.name, "*", "*"))), 1)
+
+        # loaded from the cache, in the other process
+        codegen.release(schema)
+        schema = {"properties": {"name": {"type": "string"}}}
+        validator = self._makeOne(schema)
+        self.assertEqual(len(glob.glob(os.path.join(self.tmpdir.name, "*", "*"))), 1)
+        self.assertEqual(
+            [e.message for e in validator.iter_errors({"name": 1})],
+            ["1 is not of type 'string'"],
+        )
+
+    def test_cached_on_disk__broken(self):
+        from schemalint import codegen
+        from schemalint.validator import fingerprint
+
+        schema = {"properties": {"name": {"type": "string"}}}
+        self._makeOne(schema)
+        codegen.release(schema)
+        (path,) = glob.glob(os.path.join(self.tmpdir.name, "*", "*"))
+        with open(path, "rb") as rf:
+            data = rf.read()
+
+        other = {"properties": {"name": {"type": "integer"}}}
+        self._makeOne(other)
+        codegen.release(other)
+        (other_path,) = set(glob.glob(os.path.join(self.tmpdir.name, "*", "*"))) - {
+            path
+        }
+        with open(other_path, "rb") as rf:
+            other_data = rf.read()
+
+        n = len(codegen.HEADER)
+        cases = [
+            ("truncated", data[:-8]),
+            ("modified", data[:-1] + bytes([data[-1] ^ 0xFF])),
+            (
+                "old version",
+                codegen.MAGIC_NUMBER + (0).to_bytes(4, "little") + data[8:],
+            ),
+            ("without digest", data[:n] + data[n + 32 :]),
+            ("the other schema", other_data),
+        ]
+        for name, broken in cases:
+            with self.subTest(name=name):
+                with open(path, "wb") as wf:
+                    wf.write(broken)
+
+                # not loaded, compiled again (and the file is rewritten)
+                schema = {"properties": {"name": {"type": "string"}}}
+                validator = self._makeOne(schema)
+                self.assertEqual(
+                    [e.message for e in validator.iter_errors({"name": 1})],
+                    ["1 is not of type 'string'"],
+                )
+                codegen.release(schema)
+                self.assertIsNotNone(codegen._read_code(path, fingerprint(schema)))
+
+    def test_release__shared(self):
+        from schemalint import codegen
+        from schemalint.validator import ValidatorRegistry
+
+        # the same schema with the different resources, evicted one by one
+        registry = ValidatorRegistry(
+            maxsize=2, codegen=True, codegen_dir=self.tmpdir.name
+        )
+        schema = {"properties": {"name": {"type": "string"}}}
+        a = self._makeOne(
+            schema, registry=registry, resources={"http://example.com/a.json": {}}
+        )
+        b = self._makeOne(
+            schema, registry=registry, resources={"http://example.com/b.json": {}}
+        )
+        self.assertIsNot(a, b)
+
+        self._makeOne({"type": "object"}, registry=registry)  # a is evicted
+        self.assertIn(id(schema), codegen._checks)
+        self.assertEqual(
+            [e.message for e in b.iter_errors({"name": 1})],
+            ["1 is not of type 'string'"],
+        )
+
+        self._makeOne({"type": "array"}, registry=registry)  # b is evicted
+        self.assertNotIn(id(schema), codegen._checks)
+
+    def test_fingerprint_changed(self):
+        schema = {"properties": {"name": {"type": "string"}}}
+        validator = self._makeOne(schema)
+        self.assertEqual(list(validator.iter_errors({"name": "foo"})), [])
+
+        # the schema is modified in place, the compiled checks are not reused
+        schema["properties"]["name"]["type"] = "integer"
+        validator = self._makeOne(schema)
+        self.assertEqual(
+            [e.message for e in validator.iter_errors({"name": "foo"})],
+            ["'foo' is not of type 'integer'"],
+        )
+        self.assertEqual(list(validator.iter_errors({"name": 1})), [])
+        self.assertEqual(len(glob.glob(os.path.join(self.tmpdir.name, "*", "*"))), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+import unittest
+import os
+import os.path
+import sys
+import json
+import tempfile
+import subprocess
+
+
+class _FilesMixin:
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.d = os.path.realpath(self.tmpdir.name)
+        self._write("a.yaml", "x:\n  $ref: 'defs/x.yaml#/x'\n")
+        self._write("b.yaml", "y:\n  $ref: 'defs/y.yaml#/y'\n")
+        self._write("defs/x.yaml", "x:\n  $ref: 'common.yaml#/c'\n")
+        self._write("defs/y.yaml", "y: 1\n")
+        self._write("defs/common.yaml", "c: 1\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.d, name)
+
+    def _write(self, name, text):
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as wf:
+            wf.write(text)
+        return path
+
+
+class DependencyIndexTests(_FilesMixin, unittest.TestCase):
+    def _makeOne(self, name=".schemalint-deps.json"):
+        from schemalint.deps import DependencyIndex
+
+        return DependencyIndex.load(self._path(name))
+
+    def _update(self, index, *names):
+        from schemalint.deps import update
+
+        update(index, [self._path(name) for name in names])
+
+    def _affected(self, index, *names):
+        got = index.affected([self._path(name) for name in names])
+        return [os.path.relpath(name, self.d) for name in got]
+
+    def test_update(self):
+        index = self._makeOne()
+        self._update(index, "a.yaml", "b.yaml")
+        self.assertEqual(
+            index.roots,
+            {
+                "a.yaml": ["defs/common.yaml", "defs/x.yaml"],
+                "b.yaml": ["defs/y.yaml"],
+            },
+        )
+
+    def test_affected(self):
+        index = self._makeOne()
+        self._update(index, "a.yaml", "b.yaml")
+        cases = [
+            (["defs/common.yaml"], ["a.yaml"]),  # transitively
+            (["defs/y.yaml"], ["b.yaml"]),
+            (["a.yaml"], ["a.yaml"]),
+            (["defs/x.yaml", "defs/y.yaml"], ["a.yaml", "b.yaml"]),
+            (["README.md"], []),
+        ]
+        for changed, want in cases:
+            with self.subTest(changed=changed):
+                self.assertEqual(self._affected(index, *changed), want)
+
+    def test_affected__new_and_removed(self):
+        index = self._makeOne()
+        self._update(index, "a.yaml", "b.yaml")
+
+        # the unknown yaml file is regarded as a new root file
+        self._write("c.yaml", "z: 1\n")
+        self.assertEqual(self._affected(index, "c.yaml"), ["c.yaml"])
+        # the removed root file is not reported
+        os.remove(self._path("b.yaml"))
+        self.assertEqual(self._affected(index, "defs/y.yaml"), [])
+        self.assertEqual(index.prune(), ["b.yaml"])
+        self.assertEqual(list(index.roots), ["a.yaml"])
+
+    def test_invalidation(self):
+        index = self._makeOne()
+        self._update(index, "a.yaml")
+        self.assertEqual(self._affected(index, "defs/common.yaml"), ["a.yaml"])
+
+        # the $ref is changed, the old dependencies are forgotten
+        self._write("a.yaml", "x:\n  $ref: 'defs/y.yaml#/y'\n# changed\n")
+        self._update(index, "a.yaml")
+        self.assertEqual(index.roots, {"a.yaml": ["defs/y.yaml"]})
+        # (not known anymore, regarded as a new root file)
+        self.assertEqual(
+            self._affected(index, "defs/common.yaml"), ["defs/common.yaml"]
+        )
+        self.assertEqual(self._affected(index, "defs/y.yaml"), ["a.yaml"])
+
+        index.remove(self._path("a.yaml"))
+        self.assertEqual(index.roots, {})
+
+    def test_update__broken(self):
+        # the dependencies found until the failure are recorded (including not found files)
+        self._write(
+            "c.yaml",
+            "x:\n  $ref: 'defs/missing.yaml#/x'\ny:\n  $ref: 'defs/y.yaml#/y'\n",
+        )
+        index = self._makeOne()
+        self._update(index, "c.yaml")
+        self.assertEqual(index.roots, {"c.yaml": ["defs/missing.yaml", "defs/y.yaml"]})
+
+    def test_save_and_load(self):
+        # the paths are relative to the index file
+        index = self._makeOne("sub/index.json")
+        self._update(index, "a.yaml")
+        index.save()
+        with open(self._path("sub/index.json")) as rf:
+            data = json.load(rf)
+        self.assertEqual(
+            data,
+            {
+                "version": 1,
+                "roots": {"../a.yaml": ["../defs/common.yaml", "../defs/x.yaml"]},
+            },
+        )
+        self.assertEqual(self._makeOne("sub/index.json").roots, index.roots)
+
+    def test_load__version_changed(self):
+        with open(self._path("index.json"), "w") as wf:
+            json.dump({"version": 0, "roots": {"a.yaml": []}}, wf)
+        self.assertEqual(self._makeOne("index.json").roots, {})
+
+
+class SchemaFilesTests(_FilesMixin, unittest.TestCase):
+    def test_it(self):
+        from schemalint.deps import schema_files
+
+        self._write(
+            "schema.yaml",
+            "\n".join(
+                [
+                    "properties:",
+                    "  a:",
+                    "    $ref: 'defs/x.yaml#/x'",
+                    "  b:",
+                    "    $ref: 'https://example.com/schema.json'",
+                    "  c:",
+                    "    $ref: '#/properties/a'",
+                    "  d:",
+                    "    $ref: 'defs/missing.yaml'",
+                    "",
+                ]
+            ),
+        )
+        got = schema_files(self._path("schema.yaml"))
+        self.assertEqual(
+            sorted(os.path.relpath(name, self.d) for name in got),
+            ["defs/common.yaml", "defs/missing.yaml", "defs/x.yaml", "schema.yaml"],
+        )
+
+
+class DepsMainTests(_FilesMixin, unittest.TestCase):
+    def _run(self, *args, input=None):
+        import schemalint
+
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(schemalint.__file__))
+        return subprocess.run(
+            [sys.executable, "-m", "schemalint", "deps", *args],
+            cwd=self.d,
+            env=env,
+            input=input,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+
+    def test_update_and_affected(self):
+        p = self._run("update", "*.yaml")
+        self.assertEqual(p.returncode, 0, p.stderr)
+        self.assertTrue(os.path.exists(self._path(".schemalint-deps.json")))
+
+        p = self._run("affected", "defs/common.yaml", "defs/y.yaml")
+        self.assertEqual(p.returncode, 0, p.stderr)
+        self.assertEqual(p.stdout.splitlines(), ["a.yaml", "b.yaml"])
+
+        # read from stdin
+        p = self._run("affected", input="defs/y.yaml\n\n")
+        self.assertEqual(p.stdout.splitlines(), ["b.yaml"])
+
+    def test_update__prune(self):
+        p = self._run("update", "--index", "deps.json", "a.yaml", "b.yaml")
+        self.assertEqual(p.returncode, 0, p.stderr)
+        os.remove(self._path("b.yaml"))
+        p = self._run("update", "--index", "deps.json", "--prune", "a.yaml")
+        self.assertEqual(p.returncode, 0, p.stderr)
+        with open(self._path("deps.json")) as rf:
+            self.assertEqual(list(json.load(rf)["roots"]), ["a.yaml"])
+
+    def test_no_action(self):
+        p = self._run()
+        self.assertEqual(p.returncode, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
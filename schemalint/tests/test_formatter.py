@@ -0,0 +1,205 @@
+import unittest
+import os.path
+import tempfile
+
+SCHEMA = {
+    "properties": {"name": {"type": "string"}, "age": {"type": "integer"}},
+}
+
+
+class FormatterTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self._write(
+            "main.yaml",
+            "\n".join(
+                [
+                    "name: 1",
+                    "friends:",
+                    "  - $ref: 'defs.yaml#/missing'",
+                    "  - $ref: 'broken.yaml#/x'",
+                    "age: [1]",
+                    "",
+                ]
+            ),
+        )
+        self._write("defs.yaml", "x: 1\n")
+        self._write("broken.yaml", "x: [1\n")
+        self._write("root_broken.yaml", "a: 1\nb: [\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, name, text):
+        with open(os.path.join(self.tmpdir.name, name), "w") as wf:
+            wf.write(text)
+
+    def _events(self, name):
+        from schemalint import streams
+        from schemalint.validator import get_validator
+
+        filepath = os.path.join(self.tmpdir.name, name)
+        s = streams.from_filename(filepath, max_errors=None)
+        s = streams.with_validator(s, get_validator(SCHEMA))
+        return s, list(s)
+
+    def _makeOne(self, s, *, output_type="json"):
+        from schemalint.formatter import get_formatter
+
+        filepath = os.path.join(self.tmpdir.name, s.context.filename)
+        return get_formatter(
+            filepath,
+            lookup=s.context.lookup,
+            output_type=output_type,
+            cwd=self.tmpdir.name,
+        )
+
+    def test_to_dict(self):
+        s, events = self._events("main.yaml")
+        formatter = self._makeOne(s)
+        got = [formatter.to_dict(ev) for ev in events]
+        want = [
+            {
+                "status": "WARNING",
+                "errortype": "ResolutionError",
+                "filename": "main.yaml",
+                "start": {"line": 3, "character": 4},
+                "end": {"line": 3, "character": 30},
+                "message": "ExKeyError('/missing')",
+                "where": ["main.yaml:3", "defs.yaml"],
+            },
+            {
+                "status": "WARNING",
+                "errortype": "ParseError",
+                "filename": "main.yaml",
+                "start": {"line": 4, "character": 4},
+                "end": {"line": 4, "character": 26},
+                "message": "expected ',' or ']', but got '<stream end>' (while parsing a flow sequence)",
+                "where": ["main.yaml:4", "broken.yaml"],
+            },
+            {
+                "status": "ERROR",
+                "errortype": "ValidationError",
+                "filename": "main.yaml",
+                "start": {"line": 1, "character": 6},
+                "end": {"line": 1, "character": 7},
+                "message": "1 is not of type 'string' (validator=type)",
+                "where": ["main.yaml:1"],
+            },
+            {
+                "status": "ERROR",
+                "errortype": "ValidationError",
+                "filename": "main.yaml",
+                "start": {"line": 5, "character": 5},
+                "end": {"line": 5, "character": 8},
+                "message": "[1] is not of type 'integer' (validator=type)",
+                "where": ["main.yaml:5"],
+            },
+        ]
+        self.assertEqual(got, want)
+
+    def test_to_dict__unknown_error(self):
+        from schemalint.entity import ErrorEvent
+
+        s, _ = self._events("main.yaml")
+        err = ValueError("unexpected")
+        with self.assertRaises(ValueError):
+            self._makeOne(s).to_dict(ErrorEvent(error=err, context=s.context))
+
+    def test_build_parse_error__root(self):
+        from schemalint.errors import ParseError
+
+        s, events = self._events("root_broken.yaml")
+        (ev,) = events
+        self.assertIsInstance(ev.error, ParseError)
+        got = self._makeOne(s).build_parse_error(ev.error)
+        self.assertEqual(got["status"], "ERROR")
+        self.assertEqual(got["filename"], "root_broken.yaml")
+        self.assertEqual(
+            (got["start"], got["end"]),
+            ({"line": 3, "character": 0}, {"line": 3, "character": -1}),
+        )
+        self.assertEqual(got["where"], ["root_broken.yaml:3"])
+
+    def test_build_resolution_error(self):
+        s, events = self._events("main.yaml")
+        got = self._makeOne(s).build_resolution_error(events[0].error)
+        self.assertEqual(got["errortype"], "ResolutionError")
+        self.assertEqual(got["where"], ["main.yaml:3", "defs.yaml"])
+
+    def test_build_validation_error(self):
+        s, events = self._events("main.yaml")
+        formatter = self._makeOne(s)
+        for ev in events[2:]:
+            with self.subTest(message=ev.error.message):
+                self.assertEqual(
+                    formatter.build_validation_error(ev.error, context=s.context),
+                    formatter.to_dict(ev),
+                )
+
+    def test_build_validation_error__without_context(self):
+        s, events = self._events("main.yaml")
+        formatter = self._makeOne(s)
+
+        # the scalar cannot be found without the document, the top of the file
+        scalar = formatter.build_validation_error(events[2].error)
+        self.assertEqual(
+            (scalar["start"], scalar["end"], scalar["where"]),
+            ({"line": 1, "character": 0}, {"line": 1, "character": 0}, ["main.yaml:1"]),
+        )
+        # the container is found
+        container = formatter.build_validation_error(events[3].error)
+        self.assertEqual(container, formatter.to_dict(events[3]))
+
+    def test_format_validation_error__without_context(self):
+        import json
+
+        s, events = self._events("main.yaml")
+        got = json.loads(self._makeOne(s).format_validation_error(events[2].error))
+        self.assertEqual(got["message"], "1 is not of type 'string' (validator=type)")
+        self.assertEqual(got["where"], "['main.yaml:1']")
+
+    def test_build_message_error(self):
+        from schemalint.entity import Context
+        from schemalint.errors import MessageError
+
+        s, _ = self._events("main.yaml")
+        formatter = self._makeOne(s)
+        err = MessageError("hello")
+        got = formatter.build_message_error(err, context=None)
+        want = {
+            "status": "INFO",
+            "errortype": "MessageError",
+            "filename": "main.yaml",
+            "start": {"line": 1, "character": 1},
+            "end": {"line": 1, "character": -1},
+            "message": "hello",
+            "where": ["main.yaml"],
+        }
+        self.assertEqual(got, want)
+
+        other = Context(filename=os.path.join(self.tmpdir.name, "defs.yaml"))
+        got = formatter.build_message_error(err, context=other, status="ERROR")
+        self.assertEqual((got["status"], got["filename"]), ("ERROR", "defs.yaml"))
+
+    def test_layout__ltsv(self):
+        s, events = self._events("main.yaml")
+        got = self._makeOne(s, output_type="ltsv").format(events[2])
+        self.assertEqual(
+            got,
+            "\t".join(
+                [
+                    "status:ERROR",
+                    "errortype:ValidationError",
+                    "filename:main.yaml",
+                    "start:1@6",
+                    "end:1@7",
+                    "message:1 is not of type 'string' (validator=type)",
+                    "where:['main.yaml:1']",
+                ]
+            ),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import os
+import os.path
+import tempfile
+
+
+class GuessSchemaTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.dirpath = os.path.join(self.tmpdir.name, "src")
+        os.makedirs(self.dirpath)
+        self.filepath = os.path.join(self.dirpath, "doc.yaml")
+
+    def tearDown(self):
+        from schemalint import guess
+
+        guess.clear_cache()
+        self.tmpdir.cleanup()
+
+    def _write(self, path, text):
+        with open(path, "w") as wf:
+            wf.write(text)
+
+    def _callFUT(self):
+        from schemalint import guess
+
+        return guess.guess_schema(
+            self.filepath, code=".schemalint.py", current=self.dirpath
+        )
+
+    def test_constant(self):
+        self._write(os.path.join(self.dirpath, ".schemalint.py"), "schema = 'a.json'\n")
+        self.assertEqual(self._callFUT(), os.path.join(self.dirpath, "a.json"))
+
+    def test_config_changed(self):
+        from schemalint import management
+
+        config = os.path.join(self.tmpdir.name, ".schemalint.py")
+        self._write(config, "schema = 'a.json'\n")
+        self.assertEqual(self._callFUT(), os.path.join(self.tmpdir.name, "a.json"))
+
+        # reloaded, without clear_cache()
+        self._write(config, "def get_schema(filepath):\n    return 'bb.json'\n")
+        self.assertEqual(self._callFUT(), os.path.join(self.tmpdir.name, "bb.json"))
+        self.assertEqual(list(management._modules), [config])
+
+    def test_clear_cache(self):
+        import sys
+        from schemalint import guess, management
+
+        self._write(
+            os.path.join(self.tmpdir.name, ".schemalint.py"), "schema = 'a.json'\n"
+        )
+        self.assertEqual(self._callFUT(), os.path.join(self.tmpdir.name, "a.json"))
+        ((_, m),) = management._modules.values()
+        self.assertIs(sys.modules.get(m.__name__), m)
+
+        # the nearer config is not found, until clear_cache()
+        self._write(os.path.join(self.dirpath, ".schemalint.py"), "schema = 'b.json'\n")
+        self.assertEqual(self._callFUT(), os.path.join(self.tmpdir.name, "a.json"))
+
+        guess.clear_cache()
+        self.assertEqual(management._modules, {})
+        self.assertEqual(management._constants, {})
+        self.assertNotIn(m.__name__, sys.modules)
+        self.assertEqual(self._callFUT(), os.path.join(self.dirpath, "b.json"))
+
+    def test_not_found(self):
+        from schemalint import guess
+
+        self.assertIsNone(self._callFUT())
+        self.assertIn((".schemalint.py", self.dirpath), guess._found)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import os
+import os.path
+import sys
+import tempfile
+import subprocess
+
+# the heavy modules are not imported, on the code path which doesn't need them
+# (the import time itself is measured by benchmarks/importtime.py)
+
+
+def _imported(args, *, cwd):
+    import schemalint
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(schemalint.__file__))
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "schemalint", *args],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    modules = set()
+    for line in p.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        modules.add(line.rsplit("|", 1)[-1].strip())
+    return p, modules
+
+
+class ImportTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _assertNotImported(self, modules, forbidden):
+        self.assertIn("schemalint.cli", modules)
+        for name in forbidden:
+            with self.subTest(module=name):
+                self.assertNotIn(name, modules)
+
+    def test_help(self):
+        p, modules = _imported(["--help"], cwd=self.tmpdir.name)
+        self.assertEqual(p.returncode, 0, p.stderr)
+        self._assertNotImported(
+            modules,
+            [
+                "jsonschema",
+                "yaml",
+                "requests",
+                "dictknife",
+                "magicalimport",
+                "importlib_resources",
+            ],
+        )
+
+    def test_no_schema(self):
+        # yaml is needed to load the file, the others are not
+        filename = os.path.join(self.tmpdir.name, "x.yaml")
+        with open(filename, "w") as wf:
+            wf.write("name: foo\n")
+        p, modules = _imported([filename], cwd=self.tmpdir.name)
+        self.assertEqual(p.returncode, 0, p.stderr)
+        self.assertIn("yaml", modules)
+        self._assertNotImported(
+            modules,
+            ["jsonschema", "requests", "magicalimport", "importlib_resources"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import io
+import os.path
+import tempfile
+
+from schemalint.tests.test_yaml_loader import _table
+
+DOCUMENTS = [
+    '{"name": "foo", "age": 20}',
+    '{\n  "person": {\n    "name": "foo",\n    "tags": ["a", "b"]\n  },\n  "x": [1, [2, [3, {}]], []]\n}\n',
+    '[1, -2, 0.5, -1.25, 1.0e+3, 2.5E-2, true, false, null, "s"]',
+    '{"a":{"b":{"c":[{"d":null}]}}}',
+    '{"名前": "値", "key": "é日本", "next": {"ä": ["ö"]}, "emoji": "😀"}',
+    '{"escaped": "a\\nb\\t\\"c\\" \\/ \\\\ \\u00e9"}',
+    '{"duplicated": 1, "duplicated": 2}',
+    '{\r\n  "crlf": [\r\n    1,\r\n    2\r\n  ]\r\n}\r\n',
+    '﻿{"bom": true}',
+    "  \n\n  [  ]  \n",
+    '{"big": 123456789012345678901234567890, "zero": -0}',
+]
+
+# not the same values in yaml, falling back to yaml
+FALLBACK_DOCUMENTS = [
+    '{"a": NaN}',
+    '{"a": [1, Infinity]}',
+    '{"a": {"b": -Infinity}}',
+    '{"a": 1e5}',
+    '{"a": 1.5e10}',
+    '{"a": [1, 2,]}',  # not json
+]
+
+
+def _load_yaml(text, *, name):
+    from schemalint.loader import _yaml
+
+    rf = io.StringIO(text)
+    rf.name = name
+    factory = _yaml.YAMLLoaderFactory(_yaml.YAMLLoader)
+    loader = factory(rf)
+    try:
+        return loader.get_single_data(), factory.store
+    finally:
+        loader.dispose()
+
+
+def _load_json(text, *, name):
+    from schemalint.loader import _json, _yaml
+
+    store = _yaml.NodeStore()
+    return _json.load(text, name=name, store=store), store
+
+
+class JSONLoaderParityTests(unittest.TestCase):
+    def test_positions(self):
+        for text in DOCUMENTS:
+            with self.subTest(text=text):
+                want_doc, want_store = _load_yaml(text, name="x.json")
+                got_doc, got_store = _load_json(text, name="x.json")
+                self.assertEqual(got_doc, want_doc)
+                self.assertEqual(
+                    _table(got_doc, got_store), _table(want_doc, want_store)
+                )
+
+    def test_surrogate_pair(self):
+        # the escaped surrogate pair is a character in json (yaml keeps the pair as is),
+        # the positions are the same
+        text = '{"emoji": "\\ud83d\\ude00", "next": 1}'
+        want_doc, want_store = _load_yaml(text, name="x.json")
+        got_doc, got_store = _load_json(text, name="x.json")
+        self.assertEqual(got_doc, {"emoji": "\U0001f600", "next": 1})
+        self.assertEqual(want_doc, {"emoji": "\ud83d\ude00", "next": 1})
+        self.assertEqual(_table(got_doc, got_store), _table(want_doc, want_store))
+
+    def test_fallback(self):
+        from schemalint.loader import get_loader, _yaml
+
+        with tempfile.TemporaryDirectory() as d:
+            filename = os.path.join(d, "x.json")
+            for text in FALLBACK_DOCUMENTS:
+                with self.subTest(text=text):
+                    with self.assertRaises(ValueError):
+                        _load_json(text, name=filename)
+
+                    with open(filename, "w") as wf:
+                        wf.write(text)
+                    loader = get_loader(
+                        filename, fragments=None, loader_class=_yaml.YAMLLoader
+                    )
+                    got_doc = loader.load()
+                    want_doc, want_store = _load_yaml(text, name=filename)
+                    self.assertEqual(loader.errors, [])
+                    self.assertEqual(got_doc, want_doc)
+                    self.assertEqual(
+                        _table(got_doc, loader.store), _table(want_doc, want_store)
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
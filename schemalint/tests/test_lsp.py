@@ -0,0 +1,126 @@
+import unittest
+import io
+import os
+import os.path
+import json
+import tempfile
+
+
+def _write(path, data):
+    with open(path, "w") as wf:
+        json.dump(data, wf)
+
+
+class _Output(io.BytesIO):
+    def messages(self):
+        from schemalint.lsp import Connection
+
+        conn = Connection(io.BytesIO(self.getvalue()), io.BytesIO())
+        r = []
+        while True:
+            message = conn.read()
+            if message is None:
+                return r
+            r.append(message)
+
+
+class SchemaChangeTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        d = self.tmpdir.name
+        self.schema = os.path.join(d, "schema.json")
+        self.defs = os.path.join(d, "defs.json")
+        self.document = os.path.join(d, "data.yaml")
+        _write(
+            self.schema,
+            {
+                "$id": "file://" + self.schema,
+                "properties": {
+                    "name": {"type": "string"},
+                    "age": {"$ref": "defs.json#/definitions/age"},
+                },
+            },
+        )
+        _write(self.defs, {"definitions": {"age": {"type": "integer"}}})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        from schemalint.validator import load_validator
+
+        load_validator.cache_clear()
+
+    def _makeOne(self):
+        from schemalint.lsp import Connection, Server, Workspace
+
+        self.output = _Output()
+        workspace = Workspace(
+            schema=self.schema,
+            guess_schema=False,
+            cache_dir=os.path.join(self.tmpdir.name, "cache"),
+        )
+        return Server(Connection(io.BytesIO(), self.output), workspace=workspace)
+
+    def _published(self, server):
+        server.flush()
+        messages = [
+            m["params"]["diagnostics"]
+            for m in self.output.messages()
+            if m.get("method") == "textDocument/publishDiagnostics"
+        ]
+        self.output.seek(0)
+        self.output.truncate()
+        return [d["message"] for d in messages[-1]]
+
+    def _open(self, server, text):
+        from schemalint.lsp import path_to_uri
+
+        server.debounce = 0
+        server.on_textDocument_didOpen(
+            {"textDocument": {"uri": path_to_uri(self.document), "text": text}}
+        )
+
+    def _changed(self, server, path):
+        from schemalint.lsp import path_to_uri
+
+        server.on_workspace_didChangeWatchedFiles(
+            {"changes": [{"uri": path_to_uri(path), "type": 2}]}
+        )
+
+    def test_schema_changed(self):
+        server = self._makeOne()
+        self._open(server, "name: 1\n")
+        self.assertEqual(
+            self._published(server), ["1 is not of type 'string' (validator=type)"]
+        )
+
+        _write(self.schema, {"properties": {"name": {"type": "integer"}}})
+        self._changed(server, self.schema)
+        self.assertEqual(self._published(server), [])
+
+    def test_ref_target_changed(self):
+        server = self._makeOne()
+        self._open(server, "age: foo\n")
+        self.assertEqual(
+            self._published(server),
+            ["'foo' is not of type 'integer' (validator=type)"],
+        )
+        self.assertTrue(server.workspace.is_schema_file(self.defs))
+
+        _write(self.defs, {"definitions": {"age": {"type": "string"}}})
+        self._changed(server, self.defs)
+        self.assertEqual(self._published(server), [])
+
+    def test_other_file_changed(self):
+        from schemalint.validator import load_validator
+
+        server = self._makeOne()
+        self._open(server, "name: 1\n")
+        self._published(server)
+
+        # the validator is kept
+        self._changed(server, os.path.join(self.tmpdir.name, "other.yaml"))
+        self.assertEqual(load_validator.cache_info().currsize, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import unittest
+import os
+import os.path
+import json
+import tempfile
+
+SCHEMA = {
+    "definitions": {
+        "person": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "age": {"type": "integer", "minimum": 0},
+                "tags": {"type": "array", "items": {"type": "string"}},
+                "parent": {"$ref": "#/definitions/person"},
+            },
+            "required": ["name"],
+            "additionalProperties": False,
+        },
+    },
+    "type": "object",
+    "properties": {
+        "people": {"type": "array", "items": {"$ref": "#/definitions/person"}},
+        "groups": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "array",
+                "items": {"$ref": "#/definitions/person"},
+            },
+        },
+        "choice": {"anyOf": [{"$ref": "#/definitions/person"}, {"type": "null"}]},
+    },
+}
+
+# the same subtree (errors) repeated under the different parents
+INVALID = """\
+people:
+  - name: 1
+    age: -1
+    tags: [a, 2]
+  - name: 1
+    age: -1
+    tags: [a, 2]
+  - parent:
+      name: 1
+      age: -1
+      tags: [a, 2]
+groups:
+  x:
+    - name: 1
+      age: -1
+      tags: [a, 2]
+  y:
+    - extra: true
+    - name: 1
+      age: -1
+      tags: [a, 2]
+choice:
+  name: 1
+  age: -1
+  tags: [a, 2]
+"""
+
+
+def _errors(validator, instance):
+    return [
+        (
+            list(e.absolute_path),
+            list(e.absolute_schema_path),
+            e.validator,
+            e.message,
+            id(e.instance),  # the instance of the current subtree
+            [(list(c.absolute_path), c.message) for c in e.context],
+        )
+        for e in validator.iter_errors(instance)
+    ]
+
+
+class MemoizingValidatorTests(unittest.TestCase):
+    def _makeOne(self, *, memoize):
+        from schemalint.validator import ValidatorRegistry
+
+        return ValidatorRegistry(memoize=memoize).get(SCHEMA)
+
+    def test_same_errors(self):
+        from unittest import mock
+        from dictknife import loading
+        from schemalint import memoize
+
+        doc = loading.loads(INVALID, format="yaml")
+        want = _errors(self._makeOne(memoize=False), doc)
+        memos = []
+        _Memo = memoize._Memo
+        with mock.patch.object(
+            memoize, "_Memo", side_effect=lambda: memos.append(_Memo()) or memos[-1]
+        ):
+            got = _errors(self._makeOne(memoize=True), doc)
+        self.assertEqual(got, want)
+        self.assertEqual(len(want), 19)
+        self.assertGreater(memos[0].hits, 0)  # memoized
+
+    def test_same_errors__shared_subtree(self):
+        from dictknife import loading
+
+        # the same object under the different parents (e.g. yaml alias)
+        doc = loading.loads(INVALID, format="yaml")
+        person = doc["people"][0]
+        doc["people"] = [person, {"parent": person}, person]
+        doc["groups"] = {"x": [person], "y": [{"extra": True}, person]}
+        want = _errors(self._makeOne(memoize=False), doc)
+        got = _errors(self._makeOne(memoize=True), doc)
+        self.assertEqual(got, want)
+
+
+class MemoizeValidationOptionTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "data.yaml")
+        with open(self.filename, "w") as wf:
+            wf.write(INVALID)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _callFUT(self, **kwargs):
+        from schemalint.cli import run
+
+        records = []
+        run(
+            self.filename,
+            schema=SCHEMA,
+            guess_schema=False,
+            always_success=True,
+            output="json",
+            cache_dir=os.path.join(self.tmpdir.name, "cache"),
+            printer=lambda line: records.append(json.loads(line)),
+            **kwargs,
+        )
+        return records
+
+    def test_same_records(self):
+        # the same order, paths and positions (start, end)
+        want = self._callFUT()
+        got = self._callFUT(memoize_validation=True)
+        self.assertEqual(got, want)
+        lines = sorted(
+            r["start"]["line"] for r in want if r["message"].startswith("2 ")
+        )
+        self.assertEqual(lines, [4, 7, 11, 16, 21])  # each subtree
+
+
+if __name__ == "__main__":
+    unittest.main()
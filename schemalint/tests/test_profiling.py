@@ -0,0 +1,112 @@
+import unittest
+import os
+import os.path
+import sys
+import json
+import tempfile
+import subprocess
+
+
+class ProfileTests(unittest.TestCase):
+    def _makeOne(self):
+        from schemalint.profiling import Profile
+
+        return Profile()
+
+    def test_nested(self):
+        p = self._makeOne()
+        with p.phase("outer"):
+            with p.phase("inner"):
+                pass
+        p.count("files")
+        d = p.to_dict()
+        self.assertEqual(d["phases"]["outer"]["calls"], 1)
+        self.assertEqual(d["phases"]["inner"]["calls"], 1)
+        self.assertEqual(d["counters"], {"files": 1})
+
+    def test_threads(self):
+        import threading
+        from unittest import mock
+
+        # the phases of the threads overlap (not nested), a starts, b starts, a stops, b stops
+        clock = iter([0.0, 1.0, 2.0, 3.0])
+        p = self._makeOne()
+        a_started, a_stopped = threading.Event(), threading.Event()
+        b_started = threading.Event()
+
+        def _a():
+            p.start()
+            a_started.set()
+            b_started.wait()
+            p.stop("a")
+            a_stopped.set()
+
+        def _b():
+            a_started.wait()
+            p.start()
+            b_started.set()
+            a_stopped.wait()
+            p.stop("b")
+
+        with mock.patch("time.perf_counter", side_effect=lambda: next(clock)):
+            threads = [threading.Thread(target=_a), threading.Thread(target=_b)]
+            for th in threads:
+                th.start()
+            for th in threads:
+                th.join()
+        phases = p.phases
+        self.assertEqual(phases["a"]["wall"], 2.0)  # 0.0 -> 2.0
+        self.assertEqual(phases["b"]["wall"], 2.0)  # 1.0 -> 3.0
+
+
+class ProfileOptionTests(unittest.TestCase):
+    def _run(self, *args):
+        import schemalint
+
+        with tempfile.TemporaryDirectory() as d:
+            for name in ["a.yaml", "b.yaml"]:
+                with open(os.path.join(d, name), "w") as wf:
+                    wf.write("name: 1\nfriend:\n  $ref: 'defs.yaml#/x'\n")
+            with open(os.path.join(d, "defs.yaml"), "w") as wf:
+                wf.write("x: {name: foo}\n")
+            with open(os.path.join(d, "schema.json"), "w") as wf:
+                json.dump({"properties": {"name": {"type": "string"}}}, wf)
+
+            env = os.environ.copy()
+            env["PYTHONPATH"] = os.path.dirname(os.path.dirname(schemalint.__file__))
+            p = subprocess.run(
+                [sys.executable, "-m", "schemalint", "--profile", "-s", "schema.json"]
+                + ["-o", "json", "a.yaml", "b.yaml", *args],
+                cwd=d,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+        self.assertEqual(p.returncode, 1, p.stderr)
+        self.assertEqual(len(p.stdout.splitlines()), 2)  # the report is not on stdout
+        return json.loads(p.stderr.splitlines()[-1])["profile"]
+
+    def _assertReport(self, d):
+        self.assertEqual(sorted(d), ["counters", "cpu", "phases", "wall"])
+        self.assertGreater(d["wall"], 0.0)
+        for name in ["schema", "parse", "resolve", "validate", "format"]:
+            with self.subTest(phase=name):
+                self.assertEqual(sorted(d["phases"][name]), ["calls", "cpu", "wall"])
+                self.assertGreater(d["phases"][name]["calls"], 0)
+                self.assertGreaterEqual(d["phases"][name]["wall"], 0.0)
+        counters = d["counters"]
+        self.assertEqual(counters["files"], 2)
+        self.assertEqual(counters["validation_errors"], 2)
+        self.assertEqual(counters["refs_resolved"], 2)
+
+    def test_it(self):
+        self._assertReport(self._run())
+
+    def test_jobs(self):
+        # merged from the worker processes
+        self._assertReport(self._run("-j", "2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,310 @@
+import unittest
+import os
+import os.path
+import sys
+import json
+import tempfile
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, dict(self.headers)))
+        status, body, etag = server.responses.get(self.path, (404, b"", None))
+        if etag is not None and self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server:
+    # local http server, path -> (status, body, etag)
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.responses = {}
+        self.httpd.requests = []
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}{path}"
+
+    def respond(self, path, body, *, status=200, etag=None):
+        self.httpd.responses[path] = (status, body, etag)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RemoteCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.server = _Server().__enter__()
+        self.clock = _Clock()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.tmpdir.cleanup()
+
+    def _makeOne(self, *, ttl=60, offline=False):
+        from schemalint.remote import RemoteCache
+
+        return RemoteCache(
+            self.tmpdir.name, ttl=ttl, offline=offline, clock=self.clock, timeout=5
+        )
+
+    def test_fetch(self):
+        self.server.respond("/schema.json", b'{"type": "object"}')
+        url = self.server.url("/schema.json")
+
+        got = self._makeOne().fetch_json(url)
+        self.assertEqual(got, {"type": "object"})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_fetch__fresh(self):
+        self.server.respond("/schema.json", b'{"v": 1}')
+        url = self.server.url("/schema.json")
+        self._makeOne().fetch(url)
+
+        self.server.respond("/schema.json", b'{"v": 2}')
+        self.clock.now += 59
+        got = self._makeOne().fetch_json(url)
+        self.assertEqual(got, {"v": 1})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_fetch__expired(self):
+        self.server.respond("/schema.json", b'{"v": 1}')
+        url = self.server.url("/schema.json")
+        self._makeOne().fetch(url)
+
+        self.server.respond("/schema.json", b'{"v": 2}')
+        self.clock.now += 61
+        got = self._makeOne().fetch_json(url)
+        self.assertEqual(got, {"v": 2})
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_fetch__not_modified(self):
+        self.server.respond("/schema.json", b'{"v": 1}', etag='"v1"')
+        url = self.server.url("/schema.json")
+        cache = self._makeOne()
+        cache.fetch(url)
+
+        self.clock.now += 61
+        got = cache.fetch_json(url)
+        self.assertEqual(got, {"v": 1})
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[-1][1].get("If-None-Match"), '"v1"')
+
+        # revalidated, fresh again
+        self.clock.now += 59
+        cache.fetch(url)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_fetch__server_error__stale(self):
+        self.server.respond("/schema.json", b'{"v": 1}')
+        url = self.server.url("/schema.json")
+        self._makeOne().fetch(url)
+
+        self.server.respond("/schema.json", b"", status=503)
+        self.clock.now += 61
+        got = self._makeOne().fetch_json(url)
+        self.assertEqual(got, {"v": 1})
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_fetch__server_error__not_cached(self):
+        self.server.respond("/schema.json", b"", status=503)
+        url = self.server.url("/schema.json")
+        with self.assertRaises(OSError):  # requests.HTTPError
+            self._makeOne().fetch(url)
+
+    def test_fetch__offline(self):
+        self.server.respond("/schema.json", b'{"v": 1}')
+        url = self.server.url("/schema.json")
+        self._makeOne().fetch(url)
+
+        self.clock.now += 61  # expired, but not revalidated
+        got = self._makeOne(offline=True).fetch_json(url)
+        self.assertEqual(got, {"v": 1})
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_fetch__offline__not_cached(self):
+        from schemalint.errors import OfflineError
+
+        self.server.respond("/schema.json", b'{"v": 1}')
+        url = self.server.url("/schema.json")
+        with self.assertRaises(OfflineError):
+            self._makeOne(offline=True).fetch(url)
+        self.assertEqual(self.server.requests, [])
+
+    def test_digest(self):
+        self.server.respond("/schema.json", b'{"v": 1}')
+        url = self.server.url("/schema.json")
+        cache = self._makeOne()
+        digest = cache.digest(url)  # fetched
+        self.assertEqual(len(digest), 64)  # sha256
+        self.assertEqual(len(self.server.requests), 1)
+        with open(cache._entry_path(url)) as rf:
+            entry = json.load(rf)
+        self.assertEqual(entry["url"], url)
+        self.assertEqual(entry["digest"], digest)
+
+
+class OfflineOptionTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmpdir.name, "cache")
+        self.filename = os.path.join(self.tmpdir.name, "data.yaml")
+        with open(self.filename, "w") as wf:
+            wf.write("name: 1\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _run(self, *args):
+        import schemalint
+
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(schemalint.__file__))
+        p = subprocess.run(
+            [sys.executable, "-m", "schemalint", "--cache-dir", self.cache_dir]
+            + ["-o", "json", "--always-success", *args, self.filename],
+            cwd=self.tmpdir.name,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        return [json.loads(line) for line in p.stdout.splitlines()]
+
+    def test_cached(self):
+        schema = b'{"properties": {"name": {"type": "string"}}}'
+        with _Server() as server:
+            server.respond("/schema.json", schema)
+            url = server.url("/schema.json")
+            online = self._run("-s", url)
+        # the server is stopped
+        offline = self._run("--offline", "-s", url)
+        self.assertEqual([r["errortype"] for r in online], ["ValidationError"])
+        self.assertEqual(offline, online)
+
+    def test_not_cached(self):
+        with _Server() as server:
+            server.respond("/schema.json", b"{}")
+            got = self._run("--offline", "-s", server.url("/schema.json"))
+            self.assertEqual(server.requests, [])
+        self.assertEqual([r["errortype"] for r in got], ["OfflineError"])
+
+
+class _StubCache:
+    # in place of RemoteCache, url -> document (fetching is blocked until released)
+    def __init__(self, documents):
+        self.documents = documents
+        self.calls = []
+        self.released = threading.Event()
+        self._lock = threading.Lock()
+
+    def fetch_json(self, url):
+        with self._lock:
+            self.calls.append(url)
+        self.released.wait(timeout=5)
+        return self.documents[url]
+
+
+class PrefetcherTests(unittest.TestCase):
+    def _makeOne(self, remote_cache):
+        from schemalint.remote import Prefetcher
+
+        return Prefetcher(remote_cache, max_workers=4)
+
+    def _documents(self):
+        # diamond, a -> (b, c) -> d (and d -> a, circular)
+        base = "https://example.com/"
+        return {
+            base + "a.json": {"x": {"$ref": "b.json"}, "y": {"$ref": "c.json#/y"}},
+            base + "b.json": {"$ref": "d.json"},
+            base + "c.json": {"y": {"$ref": "d.json#/z"}},
+            base + "d.json": {"z": {"$ref": "a.json"}},
+        }
+
+    def test_concurrent(self):
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        documents = self._documents()
+        stub = _StubCache(documents)
+        prefetcher = self._makeOne(stub)
+        schema = {"$ref": "https://example.com/a.json"}
+
+        n = 8
+        with ThreadPoolExecutor(max_workers=n) as ex:
+            futs = [ex.submit(prefetcher.prefetch, schema) for _ in range(n)]
+            # all prefetches are running, before the first fetch is finished
+            deadline = time.time() + 5
+            while prefetcher._active < n and time.time() < deadline:
+                time.sleep(0.001)
+            stub.released.set()
+            got = [fut.result() for fut in futs]
+
+        self.assertEqual(got, [documents] * n)
+        self.assertEqual(sorted(stub.calls), sorted(documents))
+        self.assertEqual(prefetcher.futures, {})
+
+    def test_fetched_again(self):
+        # after the prefetches, asking the remote cache again (revalidated with ttl)
+        documents = self._documents()
+        stub = _StubCache(documents)
+        stub.released.set()
+        prefetcher = self._makeOne(stub)
+        schema = {"$ref": "https://example.com/a.json"}
+
+        self.assertEqual(prefetcher.prefetch(schema), documents)
+        self.assertEqual(prefetcher.prefetch(schema), documents)
+        self.assertEqual(sorted(stub.calls), sorted([*documents] * 2))
+
+    def test_failed(self):
+        documents = self._documents()
+        del documents["https://example.com/c.json"]
+        stub = _StubCache(documents)
+        stub.released.set()
+
+        def _fetch_json(url):
+            if url not in documents:
+                raise OSError(f"not found {url}")
+            return _StubCache.fetch_json(stub, url)
+
+        stub.fetch_json = _fetch_json
+        got = self._makeOne(stub).prefetch({"$ref": "https://example.com/a.json"})
+        # d.json is found via b.json
+        self.assertEqual(got, documents)
+
+
+if __name__ == "__main__":
+    unittest.main()
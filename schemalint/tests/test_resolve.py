@@ -0,0 +1,311 @@
+import unittest
+import os.path
+import tempfile
+
+import yaml
+
+
+class ResolutionTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w") as wf:
+            wf.write(text)
+        return path
+
+    def _makeOne(self, name, *, fragments=None):
+        from schemalint.loader import get_loader
+
+        return get_loader(os.path.join(self.tmpdir.name, name), fragments=fragments)
+
+    def _history(self, err):
+        return [os.path.relpath(name, self.tmpdir.name) for name in err.history]
+
+    def test_circular__direct(self):
+        from schemalint.errors import CircularReferenceError
+
+        self._write("main.yaml", "a:\n  $ref: '#/a'\n")
+        loader = self._makeOne("main.yaml")
+        doc = loader.load()
+
+        self.assertEqual(doc, {"a": {"$ref": "#/a"}})
+        self.assertEqual(len(loader.errors), 1)
+        err = loader.errors[0]
+        self.assertIsInstance(err, CircularReferenceError)
+        self.assertEqual(str(err.inner), "circular reference, #/a -> #/a")
+        self.assertEqual(err.path, ["a", "$ref"])
+
+    def test_circular__indirect(self):
+        from schemalint.errors import CircularReferenceError
+
+        self._write("a.yaml", "x:\n  $ref: 'b.yaml#/y'\n")
+        self._write("b.yaml", "y:\n  $ref: 'c.yaml#/z'\n")
+        self._write("c.yaml", "z:\n  $ref: 'a.yaml#/x'\n")
+        loader = self._makeOne("a.yaml")
+        doc = loader.load()
+
+        self.assertEqual(doc, {"x": {"$ref": "b.yaml#/y"}})
+        self.assertEqual(len(loader.errors), 1)
+        err = loader.errors[0]
+        self.assertIsInstance(err, CircularReferenceError)
+        self.assertEqual(
+            str(err.inner),
+            "circular reference, b.yaml#/y -> c.yaml#/z -> a.yaml#/x -> b.yaml#/y",
+        )
+        self.assertEqual(err.path, ["x", "$ref"])
+        self.assertEqual(
+            self._history(err), ["a.yaml", "b.yaml", "c.yaml", "a.yaml", "b.yaml"]
+        )
+
+    def test_circular__inlined_ancestor(self):
+        from schemalint.errors import CircularReferenceError
+
+        self._write("a.yaml", "person:\n  $ref: 'b.yaml#/person'\n")
+        self._write(
+            "b.yaml",
+            "person:\n  type: object\n  properties:\n    parent:\n      $ref: 'a.yaml#/person'\n",
+        )
+        loader = self._makeOne("a.yaml")
+        doc = loader.load()
+
+        # the cycle is kept as $ref (not inlined)
+        parent = doc["person"]["properties"]["parent"]
+        self.assertEqual(parent, {"$ref": "a.yaml#/person"})
+        self.assertEqual(len(loader.errors), 1)
+        err = loader.errors[0]
+        self.assertIsInstance(err, CircularReferenceError)
+        self.assertEqual(err.path, ["properties", "parent", "$ref"])
+        self.assertEqual(self._history(err), ["a.yaml", "b.yaml", "a.yaml", "b.yaml"])
+
+    def test_cross_file__merge_siblings(self):
+        self._write(
+            "main.yaml",
+            "\n".join(
+                [
+                    "person:",
+                    "  $ref: 'defs.yaml#/person'",
+                    "  description: overwritten",
+                    "  title: person",
+                    "",
+                ]
+            ),
+        )
+        self._write(
+            "defs.yaml",
+            "\n".join(
+                [
+                    "person:",
+                    "  description: person",
+                    "  properties:",
+                    "    name:",
+                    "      type: string",
+                    "",
+                ]
+            ),
+        )
+        loader = self._makeOne("main.yaml")
+        doc = loader.load()
+
+        self.assertEqual(loader.errors, [])
+        person = doc["person"]
+        # the target is preferred to the siblings of $ref
+        self.assertEqual(
+            person,
+            {
+                "description": "person",
+                "title": "person",
+                "properties": {"name": {"type": "string"}},
+            },
+        )
+
+        # the positions are found in each file
+        store = loader.store
+        knode, _ = store.lookup_kvpair(person, "title")
+        self.assertEqual(
+            (os.path.basename(knode.start_mark.name), knode.start_mark.line),
+            ("main.yaml", 3),
+        )
+        knode, _ = store.lookup_kvpair(person, "description")
+        self.assertEqual(
+            (os.path.basename(knode.start_mark.name), knode.start_mark.line),
+            ("defs.yaml", 1),
+        )
+
+    def test_not_mutated(self):
+        from schemalint.loader._fragment import FragmentCache, roots
+
+        self._write(
+            "main.yaml",
+            "\n".join(
+                [
+                    "a:",
+                    "  $ref: 'defs.yaml#/person'",
+                    "  title: a",
+                    "b:",
+                    "  - $ref: 'defs.yaml#/person'",
+                    "  - x:",
+                    "      $ref: '#/a'",
+                    "",
+                ]
+            ),
+        )
+        self._write(
+            "defs.yaml",
+            "\n".join(
+                [
+                    "person:",
+                    "  properties:",
+                    "    name:",
+                    "      $ref: '#/name'",
+                    "    friend:",
+                    "      $ref: 'defs.yaml#/person'",
+                    "name:",
+                    "  type: string",
+                    "",
+                ]
+            ),
+        )
+        # the documents as written
+        want = {}
+        for name in ["main.yaml", "defs.yaml"]:
+            path = os.path.join(self.tmpdir.name, name)
+            with open(path) as rf:
+                want[os.path.realpath(path)] = yaml.safe_load(rf)
+
+        fragments = FragmentCache()
+        for _ in range(2):  # the second one resolves the cached fragments
+            loader = self._makeOne("main.yaml", fragments=fragments)
+            doc = loader.load()
+            self.assertEqual(doc["a"]["title"], "a")
+            self.assertEqual(doc["b"][0]["properties"]["name"], {"$ref": "#/name"})
+
+            got = {
+                name: fragment.doc
+                for cache in [fragments, roots]
+                for name, (_, fragment) in cache.entries.items()
+                if name in want
+            }
+            self.assertEqual(got, want)
+
+
+class FragmentCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as wf:
+            wf.write(text)
+        return path
+
+    def _makeOne(self, **kwargs):
+        from schemalint.loader._fragment import FragmentCache
+
+        return FragmentCache(**kwargs)
+
+    def _load(self, name, *, fragments):
+        from schemalint import profiling
+        from schemalint.loader import get_loader
+        from schemalint.loader._fragment import roots
+
+        roots.clear()  # counting only the hits of the $ref targets
+        with profiling.activate() as p:
+            loader = get_loader(
+                os.path.join(self.tmpdir.name, name), fragments=fragments
+            )
+            doc = loader.load()
+        self.assertEqual(loader.errors, [])
+        return doc, p.counters["fragment_hits"]
+
+    def _names(self, fragments):
+        d = os.path.realpath(self.tmpdir.name)
+        return [os.path.relpath(k, d) for k in fragments.entries]
+
+    def test_root__not_cached(self):
+        self._write("main.yaml", "a:\n  $ref: 'defs.yaml#/a'\n")
+        self._write("defs.yaml", "a:\n  x: 1\n")
+        fragments = self._makeOne()
+
+        doc, hits = self._load("main.yaml", fragments=fragments)
+        self.assertEqual(doc, {"a": {"x": 1}})
+        self.assertEqual(self._names(fragments), ["defs.yaml"])
+        _, hits = self._load("main.yaml", fragments=fragments)
+        self.assertEqual(hits, 1)
+
+    def test_key__relative_paths(self):
+        # the same file, via the different relative paths (and a symlink)
+        self._write("x/main.yaml", "a:\n  $ref: '../shared/defs.yaml#/a'\n")
+        self._write("y/z/main.yaml", "a:\n  $ref: '../../shared/defs.yaml#/a'\n")
+        self._write("main.yaml", "a:\n  $ref: 'link/defs.yaml#/a'\n")
+        self._write("shared/defs.yaml", "a:\n  x: 1\n")
+        os.symlink(
+            os.path.join(self.tmpdir.name, "shared"),
+            os.path.join(self.tmpdir.name, "link"),
+        )
+        fragments = self._makeOne()
+
+        got = [
+            self._load(name, fragments=fragments)
+            for name in ["x/main.yaml", "y/z/main.yaml", "main.yaml"]
+        ]
+        self.assertEqual(got, [({"a": {"x": 1}}, 0), *[({"a": {"x": 1}}, 1)] * 2])
+        self.assertEqual(
+            [os.path.basename(k) for k in fragments.entries], ["defs.yaml"]
+        )
+
+    def test_key__modified(self):
+        self._write("main.yaml", "a:\n  $ref: 'defs.yaml#/a'\n")
+        defs = self._write("defs.yaml", "a:\n  x: 1\n")
+        fragments = self._makeOne()
+        self._load("main.yaml", fragments=fragments)
+
+        # the size is changed
+        self._write("defs.yaml", "a:\n  x: 100\n")
+        self.assertEqual(
+            self._load("main.yaml", fragments=fragments), ({"a": {"x": 100}}, 0)
+        )
+
+        # the same size, only the mtime is changed
+        st = os.stat(defs)
+        self._write("defs.yaml", "a:\n  x: 200\n")
+        os.utime(defs, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(
+            self._load("main.yaml", fragments=fragments), ({"a": {"x": 200}}, 0)
+        )
+        self.assertEqual(
+            self._load("main.yaml", fragments=fragments), ({"a": {"x": 200}}, 1)
+        )
+        self.assertEqual(len(fragments.entries), 1)
+
+    def test_eviction(self):
+        for name in ["a", "b", "c"]:
+            self._write(f"{name}.yaml", f"{name}:\n  $ref: 'defs_{name}.yaml#/x'\n")
+            self._write(f"defs_{name}.yaml", "x: " + name * 10 + "\n")
+        fragments = self._makeOne(maxsize=2)
+        for name in ["a", "b", "a", "c"]:
+            self._load(f"{name}.yaml", fragments=fragments)
+        # b is the least recently used
+        self.assertEqual(self._names(fragments), ["defs_a.yaml", "defs_c.yaml"])
+        self.assertEqual(self._load("a.yaml", fragments=fragments)[1], 1)
+        self.assertEqual(self._load("b.yaml", fragments=fragments)[1], 0)
+
+        # evicted by the total size
+        size = os.path.getsize(os.path.join(self.tmpdir.name, "defs_a.yaml"))
+        fragments = self._makeOne(maxbytes=size * 2)
+        for name in ["a", "b", "c"]:
+            self._load(f"{name}.yaml", fragments=fragments)
+        self.assertEqual(self._names(fragments), ["defs_b.yaml", "defs_c.yaml"])
+        self.assertEqual(fragments.nbytes, size * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
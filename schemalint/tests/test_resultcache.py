@@ -0,0 +1,62 @@
+import unittest
+import tempfile
+
+from schemalint.tests.test_remote import _Server, _Clock
+
+
+class SchemaFingerprintTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.server = _Server().__enter__()
+        self.clock = _Clock()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.tmpdir.cleanup()
+
+    def _callFUT(self, schema, *, offline=False):
+        from schemalint.remote import RemoteCache
+        from schemalint.resultcache import schema_fingerprint
+
+        remote_cache = RemoteCache(
+            self.tmpdir.name, ttl=60, offline=offline, clock=self.clock, timeout=5
+        )
+        return schema_fingerprint(schema, remote_cache=remote_cache)
+
+    def test_remote__fresh(self):
+        self.server.respond("/schema.json", b'{"v": 1}')
+        url = self.server.url("/schema.json")
+        want = self._callFUT(url)
+
+        self.server.respond("/schema.json", b'{"v": 2}')
+        self.clock.now += 59
+        self.assertEqual(self._callFUT(url), want)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_remote__expired(self):
+        self.server.respond("/schema.json", b'{"v": 1}')
+        url = self.server.url("/schema.json")
+        old = self._callFUT(url)
+
+        self.server.respond("/schema.json", b'{"v": 2}')
+        self.clock.now += 61
+        self.assertNotEqual(self._callFUT(url), old)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_remote__not_modified(self):
+        self.server.respond("/schema.json", b'{"v": 1}', etag='"v1"')
+        url = self.server.url("/schema.json")
+        want = self._callFUT(url)
+
+        self.clock.now += 61
+        self.assertEqual(self._callFUT(url), want)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_remote__offline__not_cached(self):
+        url = self.server.url("/schema.json")
+        self.assertEqual(self._callFUT(url, offline=True), f"{url}@None")
+        self.assertEqual(self.server.requests, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+import os.path
+import json
+import tempfile
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "age": {"type": "integer"}},
+    "required": ["name"],
+}
+
+EMPTY = "# empty\n"
+DOCUMENTS = [
+    "name: foo\nage: 20\n",
+    "name: 1\nage: x\n",
+    "name: bar\nfriend:\n  $ref: 'defs.yaml#/person'\n",
+    EMPTY,
+    "name: baz\nfriend:\n  $ref: 'defs.yaml#/missing'\n",
+    "age: 1\n",
+]
+
+
+class MultiDocumentTests(unittest.TestCase):
+    # streaming (--multi-document) output is the same as linting each document as a file
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self._write("defs.yaml", "person:\n  name: 1\n")
+        with open(os.path.join(self.tmpdir.name, "schema.json"), "w") as wf:
+            json.dump(SCHEMA, wf)
+
+    def tearDown(self):
+        from schemalint.validator import load_validator
+
+        load_validator.cache_clear()
+        self.tmpdir.cleanup()
+
+    def _write(self, name, text):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w") as wf:
+            wf.write(text)
+        return path
+
+    def _callFUT(self, filename, **kwargs):
+        from schemalint.cli import run
+
+        records = []
+        status = run(
+            filename,
+            schema=os.path.join(self.tmpdir.name, "schema.json"),
+            guess_schema=False,
+            always_success=False,
+            output="json",
+            cache_dir=os.path.join(self.tmpdir.name, "cache"),
+            printer=lambda line: records.append(json.loads(line)),
+            **kwargs,
+        )
+        return status, records
+
+    def _split(self):
+        # each document as a file, the lines of the other documents are kept as comments
+        # (so that the positions are the same)
+        lines = ["---\n" + doc for doc in DOCUMENTS]
+        multi = self._write("multi.yaml", "".join(lines))
+        singles = []
+        offset = 0
+        for i, text in enumerate(lines):
+            prefix = "#\n" * offset
+            singles.append(self._write(f"single{i}.yaml", prefix + text))
+            offset += text.count("\n")
+        return multi, singles
+
+    def _replace(self, records, src, dst):
+        src, dst = os.path.basename(src), os.path.basename(dst)
+        return [json.loads(json.dumps(r).replace(src, dst)) for r in records]
+
+    def test_same_as_each_document(self):
+        multi, singles = self._split()
+        status, got = self._callFUT(multi, multi_document=True)
+
+        want = []
+        for doc, single in zip(DOCUMENTS, singles):
+            if doc == EMPTY:
+                continue  # not validated in the stream (see: test_empty_document)
+            _, records = self._callFUT(single)
+            want.extend(self._replace(records, single, multi))
+        self.assertEqual(status, 1)
+        self.assertEqual(
+            [r["errortype"] for r in got],
+            ["ValidationError"] * 2 + ["ResolutionError", "ValidationError"],
+        )
+        self.assertEqual(got, want)
+
+    def test_single_document(self):
+        # a file of a document, the output is the same with or without --multi-document
+        filename = self._write("one.yaml", DOCUMENTS[1])
+        self.assertEqual(
+            self._callFUT(filename, multi_document=True), self._callFUT(filename)
+        )
+
+    def test_empty_document(self):
+        # e.g. the trailing "---", not validated (a file of an empty document is validated as null)
+        filename = self._write("empty.yaml", "---\n" + DOCUMENTS[0] + "---\n" + EMPTY)
+        self.assertEqual(self._callFUT(filename, multi_document=True), (0, []))
+
+    def test_max_errors(self):
+        multi, _ = self._split()
+        _, records = self._callFUT(multi, multi_document=True)
+        for n in range(1, len(records)):
+            with self.subTest(max_errors=n):
+                _, got = self._callFUT(multi, multi_document=True, max_errors=n)
+                self.assertEqual(got[:-1], records[:n])
+                self.assertEqual(
+                    got[-1]["message"], f"stopped, the number of errors reached {n}"
+                )
+
+    def test_with_validator__wrapped(self):
+        # the document hook is found through the wrapping streams (e.g. messages of guess)
+        from schemalint import streams
+        from schemalint.validator import get_validator
+
+        multi, _ = self._split()
+        s = streams.from_filename_documents(multi)
+        s = streams.append_messages(s, messages=["hello"])
+        s = streams.with_validator(s, get_validator(SCHEMA))
+        got = [(ev.context.doc, ev.error.__class__.__name__) for ev in s]
+        self.assertEqual(
+            [name for _, name in got],
+            ["ValidationError"] * 2
+            + ["ResolutionError", "ValidationError"]
+            + ["MessageError"],
+        )
+        # validated as soon as each document is loaded
+        self.assertEqual(got[0][0], {"name": 1, "age": "x"})
+        self.assertEqual(got[-2][0], {"age": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
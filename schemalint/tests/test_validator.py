@@ -0,0 +1,109 @@
+import unittest
+import os
+import os.path
+import sys
+import tempfile
+import subprocess
+
+SCHEMA = {"properties": {"name": {"type": "string"}}}
+
+# runs in another process, prints whether the schema was checked before
+_SCRIPT = """
+import sys, json
+from schemalint.validator import get_registry, fingerprint
+registry = get_registry(sys.argv[1], persistent=True)
+schema = json.loads(sys.argv[2])
+print(registry.is_checked(fingerprint(schema)))
+registry.get(schema)
+"""
+
+
+class ValidatorRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _makeOne(self, **kwargs):
+        from schemalint.validator import ValidatorRegistry
+
+        return ValidatorRegistry(directory=self.tmpdir.name, **kwargs)
+
+    def _run_process(self, schema):
+        import json
+        import schemalint
+
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.path.dirname(os.path.dirname(schemalint.__file__))
+        p = subprocess.run(
+            [sys.executable, "-c", _SCRIPT, self.tmpdir.name, json.dumps(schema)],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        self.assertEqual(p.returncode, 0, p.stderr)
+        return p.stdout.strip()
+
+    def test_persistent__across_processes(self):
+        self.assertEqual(self._run_process(SCHEMA), "False")
+        self.assertEqual(self._run_process(SCHEMA), "True")
+        # the other schema is not checked yet
+        self.assertEqual(self._run_process({"type": "object"}), "False")
+
+    def test_invalidation(self):
+        from unittest import mock
+        import jsonschema
+        from schemalint.validator import fingerprint
+
+        fp = fingerprint(SCHEMA)
+        self._makeOne().get(SCHEMA)
+        self.assertTrue(self._makeOne().is_checked(fp))
+
+        # the result depends on the meta schema
+        self.assertFalse(self._makeOne(cls=jsonschema.Draft4Validator).is_checked(fp))
+
+        # the removed marker (e.g. the cache directory is cleaned), checked again
+        registry = self._makeOne()
+        os.remove(os.path.join(registry._checked_dir, fp))
+        with mock.patch.object(
+            registry.cls, "check_schema", wraps=registry.cls.check_schema
+        ) as check_schema:
+            registry.get(SCHEMA)
+            registry.get(SCHEMA)
+        self.assertEqual(check_schema.call_count, 1)
+
+        # the invalid schema is not recorded
+        invalid = {"type": 1}
+        with self.assertRaises(jsonschema.SchemaError):
+            self._makeOne().get(invalid)
+        self.assertFalse(self._makeOne().is_checked(fingerprint(invalid)))
+
+    def test_key__contents_of_resources(self):
+        url = "https://example.com/defs.json"
+        schema = {"$ref": f"{url}#/name"}
+        registry = self._makeOne()
+
+        v1 = registry.get(schema, resources={url: {"name": {"type": "string"}}})
+        v2 = registry.get(schema, resources={url: {"name": {"type": "integer"}}})
+        self.assertIsNot(v1, v2)
+        self.assertFalse(v1.is_valid(1))
+        self.assertTrue(v2.is_valid(1))
+        self.assertIs(
+            registry.get(schema, resources={url: {"name": {"type": "string"}}}), v1
+        )
+
+    def test_get_validator__not_persistent(self):
+        from unittest import mock
+        from schemalint.validator import get_validator
+
+        env = {"SCHEMALINT_CACHE_DIR": self.tmpdir.name}
+        with mock.patch.dict(os.environ, env):
+            validator = get_validator(SCHEMA)
+        self.assertFalse(validator.is_valid({"name": 1}))
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
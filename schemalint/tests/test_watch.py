@@ -0,0 +1,108 @@
+import unittest
+import os
+import os.path
+import json
+import tempfile
+
+
+class _Watcher:
+    # each wait() applies the next edit, and returns the changed files
+    def __init__(self, edits):
+        self.edits = list(edits)
+        self.watched = []
+
+    def watch(self, filenames):
+        self.watched.append(set(filenames))
+
+    def wait(self, timeout=None):
+        if timeout is not None:  # debouncing
+            return set()
+        if not self.edits:
+            raise KeyboardInterrupt
+        return self.edits.pop(0)()
+
+    def close(self):
+        pass
+
+
+class WatchTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        d = self.tmpdir.name
+        self.document = os.path.join(d, "doc.yaml")
+        self.schema = os.path.join(d, "schema.yaml")
+        self.config = os.path.join(d, ".schemalint.py")
+        self._write(self.document, "name: 1\n")
+        self._write(self.schema, "properties:\n  name:\n    type: string\n")
+
+    def tearDown(self):
+        from schemalint import guess
+        from schemalint.validator import load_validator
+
+        guess.clear_cache()
+        load_validator.cache_clear()
+        self.tmpdir.cleanup()
+
+    def _write(self, path, text):
+        with open(path, "w") as wf:
+            wf.write(text)
+
+    def _callFUT(self, watcher, **params):
+        from schemalint.cli import run
+        from schemalint.watch import watch
+
+        records = []
+        watch(
+            [self.document],
+            run=run,
+            printer=lambda line: records.append(json.loads(line)),
+            watcher=watcher,
+            always_success=True,
+            output="json",
+            cache_dir=os.path.join(self.tmpdir.name, "cache"),
+            **params,
+        )
+        return [r["message"] for r in records]
+
+    def _edit_schema(self):
+        self._write(self.schema, "properties:\n  name:\n    type: integer\n")
+        return {self.schema}
+
+    def test_schema_changed(self):
+        watcher = _Watcher([self._edit_schema])
+        got = self._callFUT(watcher, schema=self.schema, guess_schema=False)
+        self.assertEqual(got, ["1 is not of type 'string' (validator=type)"])
+        self.assertIn(self.schema, watcher.watched[0])
+
+    def test_schema_changed__guessed(self):
+        self._write(self.config, "schema = 'schema.yaml'\n")
+        watcher = _Watcher([self._edit_schema])
+        got = self._callFUT(watcher, schema=None, guess_schema=True)
+        # relinted with the new schema (no errors)
+        self.assertEqual(got, ["1 is not of type 'string' (validator=type)"])
+        self.assertIn(self.schema, watcher.watched[0])
+        self.assertIn(self.config, watcher.watched[0])
+
+    def test_config_changed(self):
+        self._write(self.config, "schema = 'schema.yaml'\n")
+        other = os.path.join(self.tmpdir.name, "other.yaml")
+        self._write(other, "properties:\n  name:\n    type: boolean\n")
+
+        def _edit_config():
+            self._write(self.config, "schema = 'other.yaml'\n")
+            return {self.config}
+
+        watcher = _Watcher([_edit_config])
+        got = self._callFUT(watcher, schema=None, guess_schema=True)
+        self.assertEqual(
+            got,
+            [
+                "1 is not of type 'string' (validator=type)",
+                "1 is not of type 'boolean' (validator=type)",
+            ],
+        )
+        self.assertIn(other, watcher.watched[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+import io
+
+from schemalint.loader import _yaml
+
+DOCUMENTS = [
+    "name: foo\nage: 20\n",
+    "person:\n  name: foo\n  tags:\n    - a\n    - b\n  nested: {x: 1, y: [1, 2, {z: 3}]}\n",
+    "- 1\n- [a, b]\n- {k: v}\n- - x\n  - y\n",
+    "base: &base\n  a: 1\n  b: 2\nderived:\n  <<: *base\n  c: 3\nalias: *base\n",
+    "text: |\n  line1\n  line2\nfolded: >\n  a\n  b\nafter: 1\n",
+    "quoted: \"a\\nb\"\nsingle: 'x'\nempty:\nnull: ~\n",
+    "名前: 値\nkey: 'é日本'\nnext: {ä: [ö]}\n",
+    '{"a": 1, "b": [true, null, 1.5], "c": {"d": "e"}}\n',
+    "? complex\n: value\nkey:\n\n  - 1\n\n  - 2\n",
+    "",
+    "# only comment\n",
+]
+
+BROKEN_DOCUMENTS = [
+    'a: "\\q"\n',
+    "a: |x\n  b\n",
+    "a: [1, 2\nb: 3\n",
+    "a: {x: 1\n",
+    "a: 1\n b: 2\n",
+    "- a\nb: 1\n",
+    "a: 'x\n",
+    "a: *unknown\n",
+    "key: value: x\n",
+    "a:\n\t- 1\n",  # tab
+    '{"a": 1,,}\n',
+    "a: 1\nb: [\n  1,\n  2,\n",
+]
+
+
+def _load(loader_class, text):
+    rf = io.StringIO(text)
+    rf.name = "x.yaml"
+    factory = _yaml.YAMLLoaderFactory(loader_class)
+    loader = factory(rf)
+    try:
+        return loader.get_single_data(), factory.store
+    finally:
+        loader.dispose()
+
+
+def _table(doc, store):
+    # path -> positions (container, and key/value of members)
+    rows = []
+
+    def _walk(data, path):
+        if isinstance(data, dict):
+            items = list(data.items())
+        elif isinstance(data, list):
+            items = list(enumerate(data))
+        else:
+            return
+        rows.append((path, "container", store.lookup_node(data)))
+        for k, v in items:
+            rows.append((path + (k,), "member", store.lookup_kvpair(data, k)))
+            _walk(v, path + (k,))
+
+    _walk(doc, ())
+    return rows
+
+
+def _marks(e):
+    def _mark(m):
+        return None if m is None else (m.name, m.line, m.column)
+
+    return {"context": _mark(e.context_mark), "problem": _mark(e.problem_mark)}
+
+
+@unittest.skipIf(_yaml.CYAMLLoader is None, "libyaml is not available")
+class CYAMLLoaderParityTests(unittest.TestCase):
+    def test_positions(self):
+        for text in DOCUMENTS:
+            with self.subTest(text=text):
+                want_doc, want_store = _load(_yaml.YAMLLoader, text)
+                got_doc, got_store = _load(_yaml.CYAMLLoader, text)
+                self.assertEqual(got_doc, want_doc)
+                self.assertEqual(
+                    _table(got_doc, got_store), _table(want_doc, want_store)
+                )
+
+    def test_parse_error(self):
+        for text in BROKEN_DOCUMENTS:
+            with self.subTest(text=text):
+                with self.assertRaises(_yaml.MarkedYAMLError) as want:
+                    _load(_yaml.YAMLLoader, text)
+                with self.assertRaises(_yaml.MarkedYAMLError) as got:
+                    _load(_yaml.CYAMLLoader, text)
+                # the same wording (e.g. the found token), and the same marks
+                self.assertIs(type(got.exception), type(want.exception))
+                self.assertEqual(str(got.exception), str(want.exception))
+                self.assertEqual(_marks(got.exception), _marks(want.exception))
+
+    def test_parse_error__multi_documents(self):
+        text = "a: 1\n---\nb: [1\n---\nc: 1\n"
+        for cls in [_yaml.YAMLLoader, _yaml.CYAMLLoader]:
+            with self.subTest(loader=cls.__name__):
+                rf = io.StringIO(text)
+                rf.name = "x.yaml"
+                loader = _yaml.YAMLLoaderFactory(cls)(rf)
+                docs = []
+                with self.assertRaises(_yaml.MarkedYAMLError) as c:
+                    while loader.check_data():
+                        docs.append(loader.get_data())
+                loader.dispose()
+                self.assertEqual(docs, [{"a": 1}])
+                self.assertEqual(
+                    c.exception.problem,
+                    "expected ',' or ']', but got '<document start>'",
+                )
+
+    def test_parse_error__not_seekable(self):
+        # the libyaml's wording, but the marks are the same
+        class _Stream(io.StringIO):
+            def seekable(self):
+                return False
+
+        text = "a:\n\t- 1\n"
+        with self.assertRaises(_yaml.MarkedYAMLError) as want:
+            _load(_yaml.YAMLLoader, text)
+        with self.assertRaises(_yaml.MarkedYAMLError) as got:
+            loader = _yaml.CYAMLLoader(_Stream(text))
+            loader.get_single_data()
+        self.assertEqual(
+            got.exception.problem, "found character that cannot start any token"
+        )
+        self.assertEqual(
+            {k: v and v[1:] for k, v in _marks(got.exception).items()},
+            {k: v and v[1:] for k, v in _marks(want.exception).items()},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
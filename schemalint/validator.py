@@ -1,11 +1,294 @@
+import typing as t
+import os.path
+import json
+import hashlib
+import logging
+import threading
+import functools
+from collections import OrderedDict
+
 import jsonschema
 
+from schemalint.cachedir import get_cache_dir, write_atomic
+
+if t.TYPE_CHECKING:
+    from schemalint.remote import RemoteCache
+    from schemalint.bundle import Bundle
+
+logger = logging.getLogger(__name__)
+
 Validator = jsonschema.Draft7Validator
 
 
-def get_validator(schema: dict, *, check_schema=True) -> Validator:
-    cls = jsonschema.Draft7Validator
-    if check_schema:
-        cls.check_schema(schema)
-    validator = cls(schema=schema)
-    return validator
+def fingerprint(schema: t.Any) -> str:
+    data = json.dumps(
+        schema, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ValidatorRegistry:
+    # in-process LRU of validators, keyed by the fingerprint of the schema.
+    # the schemas which passed check_schema() are recorded in <directory>/<metaschema>/<fingerprint>
+    def __init__(
+        self,
+        *,
+        cls: t.Type[Validator] = jsonschema.Draft7Validator,
+        directory: t.Optional[str] = None,
+        maxsize: int = 32,
+        memoize: bool = False,
+        codegen: bool = False,
+        codegen_dir: t.Optional[str] = None,
+    ) -> None:
+        self.cls = cls
+        self.directory = directory
+        self.maxsize = maxsize
+        self.memoize = memoize  # validating the identical subtrees once
+        self.codegen = codegen  # validating with the compiled schema (see: codegen.py)
+        self.codegen_dir = codegen_dir
+        self.validators: t.Dict[str, Validator] = OrderedDict()
+        self._checked: t.Set[str] = set()
+        self._lock = threading.RLock()  # shared by threads (e.g. api.Linter)
+
+    @property
+    def _checked_dir(self) -> str:
+        # the result of check_schema() depends on the meta schema
+        return os.path.join(self.directory, fingerprint(self.cls.META_SCHEMA)[:16])
+
+    def is_checked(self, fp: str) -> bool:
+        if fp in self._checked:
+            return True
+        if self.directory is None:
+            return False
+        if os.path.exists(os.path.join(self._checked_dir, fp)):
+            self._checked.add(fp)
+            return True
+        return False
+
+    def mark_checked(self, fp: str) -> None:
+        self._checked.add(fp)
+        if self.directory is None:
+            return
+        try:
+            write_atomic(os.path.join(self._checked_dir, fp), b"")
+        except OSError as e:
+            logger.info("validator registry, cannot record checked schema (%r)", e)
+
+    def get(
+        self,
+        schema: dict,
+        *,
+        check_schema: bool = True,
+        resources: t.Optional[t.Dict[str, t.Any]] = None,
+        fetch: t.Optional[t.Callable[[str], t.Any]] = None,
+        base: str = "",
+    ) -> Validator:
+        with self._lock:
+            return self._get(
+                schema,
+                check_schema=check_schema,
+                resources=resources,
+                fetch=fetch,
+                base=base,
+            )
+
+    def _get(
+        self,
+        schema: dict,
+        *,
+        check_schema: bool,
+        resources: t.Optional[t.Dict[str, t.Any]],
+        fetch: t.Optional[t.Callable[[str], t.Any]],
+        base: str,
+    ) -> Validator:
+        fp = fingerprint(schema)
+        if check_schema and not self.is_checked(fp):
+            self.cls.check_schema(schema)
+            self.mark_checked(fp)
+
+        key = fp
+        if resources:
+            # the contents of the resources (not only the urls), e.g. a remote schema is updated
+            key = f"{fp}:{fingerprint([base, resources])}"
+        validator = self.validators.get(key)
+        if validator is not None:
+            self.validators.move_to_end(key)
+            return validator
+
+        cls = self.cls
+        compiled = False
+        if self.codegen:
+            from schemalint import codegen
+
+            compiled = codegen.compile_schema(
+                schema, keywords=cls.VALIDATORS, directory=self.codegen_dir
+            )
+            if compiled:
+                cls = codegen.compiled(cls)
+        if self.memoize:
+            from schemalint.memoize import memoizing
+
+            cls = memoizing(cls)
+        if resources:
+            validator = _with_resources(cls, schema, resources, fetch=fetch, base=base)
+        else:
+            validator = cls(schema=schema)
+        if compiled:
+            validator = codegen.CompiledValidator(validator)
+        if self.memoize:
+            from schemalint.memoize import MemoizingValidator
+
+            validator = MemoizingValidator(validator)
+        self.validators[key] = validator
+        while len(self.validators) > self.maxsize:
+            _, evicted = self.validators.popitem(last=False)
+            if self.codegen:
+                from schemalint import codegen
+
+                codegen.release(evicted.schema)
+        return validator
+
+
+def _with_resources(
+    cls: t.Type[Validator],
+    schema: dict,
+    resources: t.Dict[str, t.Any],
+    *,
+    fetch: t.Optional[t.Callable[[str], t.Any]] = None,
+    base: str = "",
+) -> Validator:
+    # the prefetched documents (url -> document) are used on resolving $ref
+    try:
+        import referencing
+        import referencing.jsonschema
+        from jsonschema_specifications import REGISTRY as SPECIFICATIONS
+    except ImportError:  # jsonschema < 4.18
+        resolver = jsonschema.RefResolver.from_schema(schema, store=resources)
+        if base and "$id" not in schema:
+            resolver = jsonschema.RefResolver(base, schema, store=resources)
+        return cls(schema=schema, resolver=resolver)
+
+    from urllib.request import urlopen
+    from schemalint import remote
+
+    def retrieve(uri: str) -> "referencing.Resource[t.Any]":
+        # not prefetched (e.g. failed to prefetch)
+        if remote.is_remote(uri) and fetch is not None:
+            contents = fetch(uri)
+        else:
+            with urlopen(uri) as response:
+                contents = json.load(response)
+        return referencing.Resource.from_contents(
+            contents, default_specification=referencing.jsonschema.DRAFT7
+        )
+
+    registry = referencing.Registry(retrieve=retrieve).with_resources(
+        (
+            url,
+            referencing.Resource.from_contents(
+                doc, default_specification=referencing.jsonschema.DRAFT7
+            ),
+        )
+        for url, doc in resources.items()
+    )
+    if base and "$id" not in schema:
+        # the relative $ref in the remote schema, are resolved from its url
+        registry = registry.with_resource(
+            base,
+            referencing.Resource.from_contents(
+                schema, default_specification=referencing.jsonschema.DRAFT7
+            ),
+        )
+        resolver = SPECIFICATIONS.combine(registry).resolver(base_uri=base)
+        return cls(schema=schema, _resolver=resolver)
+    return cls(schema=schema, registry=registry)
+
+
+@functools.lru_cache(maxsize=None)
+def get_registry(
+    cache_dir: t.Optional[str] = None,
+    *,
+    persistent: bool = False,
+    memoize: bool = False,
+    codegen: bool = False,
+) -> ValidatorRegistry:
+    # the checked schemas are recorded on disk, only if persistent (opt-in, e.g. --cache-schemas)
+    directory = None
+    if persistent:
+        directory = os.path.join(get_cache_dir(cache_dir), "checked")
+    return ValidatorRegistry(
+        directory=directory,
+        memoize=memoize,
+        codegen=codegen,
+        codegen_dir=os.path.join(get_cache_dir(cache_dir), "compiled"),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def load_validator(
+    schema: str,
+    *,
+    remote_cache: "RemoteCache",
+    registry: ValidatorRegistry,
+    bundle: t.Optional["Bundle"] = None,
+) -> Validator:
+    # cached per process, so that each worker loads a schema only once
+    from schemalint import remote
+
+    if bundle is not None:
+        # the remote schemas are loaded from the bundle, never access the network
+        if remote.is_remote(schema):
+            loaded = bundle.fetch_json(schema)
+            base = schema
+        else:
+            from dictknife import loading
+
+            loaded = loading.loadfile(schema)
+            base = ""
+        return get_validator(
+            loaded,
+            check_schema=True,
+            registry=registry,
+            resources=bundle.documents,
+            fetch=bundle.fetch_json,
+            base=base,
+        )
+
+    prefetcher = remote.get_prefetcher(remote_cache)
+    if remote.is_remote(schema):
+        loaded = prefetcher.fetch_json(schema)
+        base = schema
+    else:
+        from dictknife import loading
+
+        loaded = loading.loadfile(schema)
+        base = ""
+    # the remote $ref are fetched concurrently, instead of one by one on validation
+    resources = prefetcher.prefetch(loaded, base=base)
+    return get_validator(
+        loaded,
+        check_schema=True,
+        registry=registry,
+        resources=resources,
+        fetch=prefetcher.fetch_json,
+        base=base,
+    )
+
+
+def get_validator(
+    schema: dict,
+    *,
+    check_schema: bool = True,
+    registry: t.Optional[ValidatorRegistry] = None,
+    resources: t.Optional[t.Dict[str, t.Any]] = None,
+    fetch: t.Optional[t.Callable[[str], t.Any]] = None,
+    base: str = "",
+) -> Validator:
+    registry = registry or get_registry()
+    return registry.get(
+        schema,
+        check_schema=check_schema,
+        resources=resources,
+        fetch=fetch,
+        base=base,
+    )
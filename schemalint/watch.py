@@ -0,0 +1,299 @@
+import typing as t
+import os
+import os.path
+import time
+import errno
+import select
+import struct
+import logging
+import functools
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE = 0.15  # seconds
+DEFAULT_INTERVAL = 0.5  # seconds, for polling
+
+# re-linting the root files affected by the changes (of the root files, or the files referenced via $ref).
+# the process is kept running, so the parsed fragments (not changed) and the validators are reused.
+
+
+class Watcher:
+    def watch(self, filenames: t.Iterable[str]) -> None:
+        # replacing the watched files (for a directory, adding or removing a file is a change)
+        raise NotImplementedError("need")
+
+    def wait(self, timeout: t.Optional[float] = None) -> t.Set[str]:
+        # the changed files (empty, on timeout)
+        raise NotImplementedError("need")
+
+    def close(self) -> None:
+        pass
+
+
+class PollingWatcher(Watcher):
+    def __init__(self, *, interval: float = DEFAULT_INTERVAL) -> None:
+        self.interval = interval
+        # filename -> stat key (None, if not found)
+        self.snapshot: t.Dict[str, t.Any] = {}
+
+    def _stat(self, filename: str) -> t.Any:
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def watch(self, filenames: t.Iterable[str]) -> None:
+        self.snapshot = {name: self._stat(name) for name in filenames}
+
+    def wait(self, timeout: t.Optional[float] = None) -> t.Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for name, key in self.snapshot.items():
+                new = self._stat(name)
+                if new != key:
+                    self.snapshot[name] = new
+                    changed.add(name)
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return changed
+            time.sleep(self.interval)
+
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class InotifyWatcher(Watcher):
+    # watching the parent directories (the editors replace the file on saving, via rename)
+    MASK = (
+        IN_MODIFY
+        | IN_ATTRIB
+        | IN_CLOSE_WRITE
+        | IN_MOVED_FROM
+        | IN_MOVED_TO
+        | IN_CREATE
+        | IN_DELETE
+    )
+
+    def __init__(self) -> None:
+        import ctypes
+        import ctypes.util
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.directories: t.Dict[int, str] = {}  # wd -> directory
+        self.filenames: t.Set[str] = set()
+
+    def watch(self, filenames: t.Iterable[str]) -> None:
+        import ctypes
+
+        self.filenames = {os.path.abspath(name) for name in filenames}
+        watched = set(self.directories.values())
+        dirpaths = {
+            name if os.path.isdir(name) else _existing_dir(name)
+            for name in self.filenames
+        }
+        for dirpath in dirpaths - watched:
+            wd = self.libc.inotify_add_watch(
+                self.fd, os.fsencode(dirpath), ctypes.c_uint32(self.MASK)
+            )
+            if wd < 0:
+                err = ctypes.get_errno()
+                logger.info("watch, cannot watch %s (%s)", dirpath, os.strerror(err))
+                continue
+            self.directories[wd] = dirpath
+
+    def wait(self, timeout: t.Optional[float] = None) -> t.Set[str]:
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        for wd, mask, name in self._read():
+            if mask & IN_Q_OVERFLOW:  # the events are lost
+                return set(self.filenames)
+            if mask & IN_IGNORED:  # the directory is removed
+                self.directories.pop(wd, None)
+                continue
+            dirpath = self.directories.get(wd)
+            if dirpath is None:
+                continue
+            path = os.path.join(dirpath, name)
+            if path in self.filenames:
+                changed.add(path)
+            if dirpath in self.filenames and mask & (
+                IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+            ):
+                changed.add(dirpath)
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                # e.g. the directory of the missing file is created
+                changed.update(f for f in self.filenames if f.startswith(path + os.sep))
+        if not self.directories and self.filenames:
+            self.watch(self.filenames)
+        return changed
+
+    def _read(self) -> t.Iterator[t.Tuple[int, int, str]]:
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except OSError as e:
+                if e.errno == errno.EAGAIN:
+                    return
+                raise
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, size = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset : offset + size].rstrip(b"\0"))
+                offset += size
+                yield wd, mask, name
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _existing_dir(filename: str) -> str:
+    # the nearest existing directory (the file, or its directory may not exist yet)
+    dirpath = os.path.dirname(filename)
+    while not os.path.isdir(dirpath) and os.path.dirname(dirpath) != dirpath:
+        dirpath = os.path.dirname(dirpath)
+    return dirpath
+
+
+def get_watcher(*, interval: float = DEFAULT_INTERVAL) -> Watcher:
+    try:
+        return InotifyWatcher()
+    except (OSError, AttributeError, TypeError) as e:  # not linux
+        logger.info("watch, fallback to polling (%r)", e)
+        return PollingWatcher(interval=interval)
+
+
+def watch(
+    patterns: t.Sequence[str],
+    *,
+    run: t.Callable[..., int],
+    printer: t.Optional[t.Callable[[str], None]] = None,
+    watcher: t.Optional[Watcher] = None,
+    debounce: float = DEFAULT_DEBOUNCE,
+    jobs: int = 1,
+    fail_fast: bool = False,
+    **params: t.Any,
+) -> int:
+    from schemalint import remote
+    from schemalint import guess
+    from schemalint.cli import expand_filenames, _run_one
+    from schemalint.deps import DependencyIndex, DEFAULT_INDEX, schema_files
+    from schemalint.validator import load_validator
+
+    if jobs != 1:
+        logger.info("watch, linting in this process (--jobs is ignored)")
+    printer = printer or functools.partial(
+        print, flush=True
+    )  # streaming, even if piped
+    watcher = watcher or get_watcher()
+
+    # in memory, not saved
+    index = DependencyIndex(os.path.join(os.getcwd(), DEFAULT_INDEX))
+    # the local schema files (given by -s, or guessed), the files referenced via $ref
+    # and .schemalint.py. on changes, the cached validators and guesses are cleared
+    schemas: t.Dict[str, t.Set[str]] = {}  # schema -> files
+    configs: t.Set[str] = set()
+
+    def _on_schema(schema: t.Union[None, str, dict]) -> None:
+        if isinstance(schema, str) and not remote.is_remote(schema):
+            if schema not in schemas:
+                schemas[schema] = schema_files(schema)
+
+    roots: t.Dict[str, str] = {}  # abspath -> filename (as given)
+
+    def _lint(filenames: t.Iterable[str]) -> None:
+        for filename in filenames:
+            loaded: t.List[str] = []
+            if params.get("guess_schema"):
+                codepath = guess._find_init_file(
+                    ".schemalint.py", current=os.path.dirname(filename)
+                )
+                if codepath is not None:
+                    configs.add(codepath)
+            try:
+                _run_one(
+                    filename,
+                    run=run,
+                    printer=printer,
+                    on_loaded=loaded.extend,
+                    on_schema=_on_schema,
+                    **params,
+                )
+            except Exception as e:
+                logger.error("watch, lint failed %s (%r)", filename, e)
+            index.update(filename, loaded or [filename])
+
+    def _schema_files() -> t.Set[str]:
+        files = set(configs)
+        for found in schemas.values():
+            files.update(found)
+        return files
+
+    def _sync() -> t.List[str]:
+        # the new root files (found by the glob patterns)
+        found = {os.path.abspath(name): name for name in expand_filenames(patterns)}
+        added = [name for path, name in found.items() if path not in roots]
+        for path in set(roots) - set(found):
+            del roots[path]
+            index.remove(path)
+        roots.update(found)
+        return added
+
+    try:
+        _sync()
+        _lint(roots.values())
+        while True:
+            watched = index.filenames()
+            watched.update(os.path.dirname(path) for path in roots)  # for new files
+            watched.update(_schema_files())
+            watcher.watch(watched)
+
+            changed = watcher.wait()
+            while True:  # e.g. saving several files at once
+                more = watcher.wait(timeout=debounce)
+                if not more:
+                    break
+                changed.update(more)
+            if not changed:
+                continue
+
+            added = _sync()
+            if changed & _schema_files():
+                # the validator is cached by the path of the schema, the guess by .schemalint.py
+                load_validator.cache_clear()
+                guess.clear_cache()
+                schemas.clear()
+                configs.clear()
+                targets = list(roots.values())
+            else:
+                affected = set(index.affected(changed))
+                targets = [name for path, name in roots.items() if path in affected]
+                targets.extend(name for name in added if name not in targets)
+            if targets:
+                logger.info("watch, relinting %s", " ".join(targets))
+                _lint(targets)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()